@@ -0,0 +1,39 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark of the GraphQL document parsing done for each request of GithubGQLCallFactory.
+Compares parsing the query string on every call (gql.gql) with the pre-parsed documents of GithubGQLDocuments.
+
+USAGE
+    python scripts/benchmark_gql_documents.py [--iterations 1000]
+"""
+import argparse
+import sys
+import timeit
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+# pylint: disable-next=wrong-import-position
+import gql  # noqa: E402
+# pylint: disable-next=wrong-import-position
+from sources.factories import GithubGQLDocuments  # noqa: E402
+
+
+def main():
+    """
+        Runs the benchmark for each registered document and prints the mean cost per call.
+    """
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=1000)
+    iterations = parser.parse_args().iterations
+
+    GithubGQLDocuments.preload_documents()
+    print(f"{'document':<35}{'parse (us)':>12}{'cached (us)':>14}")
+    for name, source in GithubGQLDocuments.GITHUB_GQL_SOURCES.items():
+        parse_time = timeit.timeit(lambda source=source: gql.gql(source), number=iterations)
+        cached_time = timeit.timeit(lambda name=name: GithubGQLDocuments.get_document(name), number=iterations)
+        print(f"{name:<35}{parse_time / iterations * 1e6:>12.1f}{cached_time / iterations * 1e6:>14.2f}")
+
+
+if __name__ == "__main__":
+    main()
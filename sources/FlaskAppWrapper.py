@@ -2,17 +2,30 @@
     Thie module has an abstract class to wrap Flask app.
 """
 
+import time
 from abc import ABCMeta
+from flask import g, request
+from sources.utils import Security
+from sources.utils.Metrics import Metrics
+from sources.utils.Profiler import PROFILE_HEADER, Profiler, profile_requested
+from sources.utils.Tracing import SPAN_STATUS_ERROR, open_span, close_span
+import sources.utils.Constants as cst
 
 
 class FlaskAppWrapper(metaclass=ABCMeta):
     """
         Abstract wrapper for Flask App, managing Flask specific configurations.
+        The duration and the status code of the requests are recorded in the metrics, per listener and endpoint.
+        Each request to a registered endpoint is traced in the root span of its flow, and profiled if requested.
     """
 
     def __init__(self, app, **configs):
         self.app = app
         self.configs(**configs)
+        self.__endpoint_listeners = {}
+        self.app.before_request(self.__start_request)
+        self.app.after_request(self.__record_request_metrics)
+        self.app.teardown_request(self.__end_request)
 
     def configs(self, **configs):
         """
@@ -28,8 +41,58 @@ class FlaskAppWrapper(metaclass=ABCMeta):
         """
         if methods is None:
             methods = ['GET']
+        # The listener is the handler itself, or the object of the handler method
+        self.__endpoint_listeners[endpoint_name] = type(getattr(handler, '__self__', handler)).__name__
         self.app.add_url_rule(endpoint, endpoint_name, handler, methods=methods, *args, **kwargs)
 
+    def __start_request(self):
+        """
+            Stores the start time of the request being processed, opens its span and starts its profile.
+        """
+        g.request_start = time.perf_counter()
+        if request.endpoint not in self.__endpoint_listeners:
+            return
+        g.request_span = open_span(f"{self.__endpoint_listeners[request.endpoint]} {request.endpoint}",
+                                   **{"http.method": request.method, "http.route": request.path})
+        # The profile header must carry the admin token, and is propagated to the jobs submitted by the request
+        admin_token = self.app.config.get(cst.APP_CONFIG_TOKEN_ADMIN_TOKEN)
+        if admin_token and Security.validate_header_token(request, PROFILE_HEADER, admin_token):
+            g.profile_requested_token = profile_requested.set(True)
+        g.request_profile = Profiler.get_instance().start()
+
+    def __record_request_metrics(self, response):
+        """
+            Records the duration and the status code of a request to a registered endpoint.
+        """
+        start = g.pop('request_start', None)
+        if start is None or request.endpoint not in self.__endpoint_listeners:
+            return response
+        labels = {"listener": self.__endpoint_listeners[request.endpoint], "endpoint": request.endpoint}
+        metrics = Metrics.get_instance()
+        metrics.observe_histogram("tbtt_http_request_duration_seconds", "Duration of the requests to the app endpoints.",
+                                  labels, time.perf_counter() - start)
+        metrics.increment_counter("tbtt_http_responses_total", "Responses of the app endpoints, per status code.",
+                                  {**labels, "status": str(response.status_code)})
+        span, _ = g.get('request_span', (None, None))
+        if span is not None:
+            span.set_attribute("http.status_code", response.status_code)
+            if response.status_code >= 500:
+                span.status = SPAN_STATUS_ERROR
+        return response
+
+    def __end_request(self, error):
+        """
+            Writes the profile and closes the span of the request, once the request is torn down.
+        """
+        if request.endpoint not in self.__endpoint_listeners:
+            return
+        listener = self.__endpoint_listeners[request.endpoint]
+        Profiler.get_instance().stop(g.pop('request_profile', None), f"{listener}-{request.endpoint}")
+        if 'profile_requested_token' in g:
+            profile_requested.reset(g.pop('profile_requested_token'))
+        span, token = g.pop('request_span', (None, None))
+        close_span(span, token, error)
+
     def run(self, **kwargs):
         """
             Starts the Flask app
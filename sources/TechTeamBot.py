@@ -2,7 +2,8 @@
     This module describes the TechTeamBot class. It is the top-level class of the Tech Team Bot.
 """
 
-import json
+import signal
+import threading
 from pathlib import Path
 from decouple import config
 from sources.FlaskAppWrapper import FlaskAppWrapper
@@ -10,6 +11,12 @@ from sources.listeners.SlackInteractionListener import SlackInteractionListener
 from sources.listeners.SlackCommandListener import SlackCommandListener
 from sources.listeners.GithubWebhookListener import GithubWebhookListener
 from sources.listeners.SupportListener import SupportListener
+from sources.listeners.AdminListener import AdminListener
+from sources.listeners.MetricsListener import MetricsListener
+from sources.factories.GithubGQLCallFactory import GithubGQLCallFactory
+from sources.utils.ConfigRegistry import ConfigRegistry
+from sources.utils.JobJournal import JobJournal
+from sources.utils.WorkerPool import WorkerPool
 import sources.utils.Constants as cst
 
 
@@ -45,6 +52,8 @@ class TechTeamBot(FlaskAppWrapper):
         self.__load_key("TBTT_GITHUB_WEBHOOK_SECRET", cst.APP_CONFIG_TOKEN_GITHUB_WEBHOOK_SECRET)
         self.__load_key("TBTT_GODP_AUTH_TOKEN", cst.APP_CONFIG_TOKEN_GODP_AUTH_TOKEN)
         self.__load_key("TBTT_NOTION_API_KEY", cst.APP_CONFIG_TOKEN_NOTION_API_KEY)
+        # Optional: the administration endpoints are disabled without it
+        self.app.config[cst.APP_CONFIG_TOKEN_ADMIN_TOKEN] = config("TBTT_ADMIN_TOKEN", default=None)
 
     def __setup_slack_interaction_endpoint(self):
         """
@@ -79,10 +88,84 @@ class TechTeamBot(FlaskAppWrapper):
                           handler=support_listener.get_wprocket_ipv4_machine_readable, methods=['GET'])
         self.add_endpoint("/support/wprocket-ips/ipv6", endpoint_name='support_wprocket_ipv6',
                           handler=support_listener.get_wprocket_ipv6_machine_readable, methods=['GET'])
+        self.add_endpoint("/support/wprocket-ips/check", endpoint_name='support_wprocket_ips_check',
+                          handler=support_listener.check_wprocket_ip, methods=['GET'])
+        self.add_endpoint("/support/wprocket-ips/check", endpoint_name='support_wprocket_ips_check_bulk',
+                          handler=support_listener.check_wprocket_ips_bulk, methods=['POST'])
+
+    def __setup_admin_endpoints(self):
+        """
+            Creates the administration endpoints
+        """
+        admin_listener = AdminListener()
+        self.add_endpoint("/admin/config/reload", endpoint_name='admin_config_reload',
+                          handler=admin_listener.reload_config, methods=['POST'])
+        self.add_endpoint("/admin/github/sprints/invalidate", endpoint_name='admin_github_sprints_invalidate',
+                          handler=admin_listener.invalidate_sprint_cache, methods=['POST'])
+        self.add_endpoint("/admin/profiling", endpoint_name='admin_profiling',
+                          handler=admin_listener.get_profiling, methods=['GET'])
+        self.add_endpoint("/admin/profiling", endpoint_name='admin_profiling_update',
+                          handler=admin_listener.set_profiling, methods=['POST'])
+
+    def __setup_metrics_endpoint(self):
+        """
+            Creates the endpoint exposing the metrics of the app
+        """
+        metrics_listener = MetricsListener()
+        self.add_endpoint("/metrics", endpoint_name='metrics', handler=metrics_listener, methods=['GET'])
+
+    def __setup_config_reload(self):
+        """
+            Reloads the configuration files when they are modified, checked every pollIntervalSeconds as set in the
+            "configReload" section of config/app.json, and when the app receives SIGHUP.
+        """
+        poll_interval = self.__app_config.get("configReload", {}).get("pollIntervalSeconds", 0)
+        if poll_interval > 0:
+            ConfigRegistry.start_watching(poll_interval)
+        # Signal handlers can only be set from the main thread
+        if hasattr(signal, 'SIGHUP') and threading.current_thread() is threading.main_thread():
+            signal.signal(signal.SIGHUP, self.__on_sighup)
+
+    def __on_sighup(self, signum, frame):  # pylint: disable=unused-argument
+        """
+            Reloads the configuration in a dedicated thread, as the signal handler interrupts the main thread.
+        """
+        threading.Thread(target=self.__reload_config, name="tbtt-config-reload", daemon=True).start()
+
+    def __reload_config(self):
+        """
+            Reloads the configuration files, and logs the error if they are invalid.
+        """
+        try:
+            ConfigRegistry.reload()
+        except (ValueError, OSError):
+            self.app.logger.exception("Configuration not reloaded.")
+
+    def __replay_pending_jobs(self):
+        """
+            Submits the jobs accepted but not completed before the last stop of the app, then keeps the leases of
+            the jobs of this instance while replaying those of the instances stopped meanwhile.
+            Must be called once the handlers registered their job runners, i.e. after the endpoints setup.
+        """
+        job_journal = JobJournal.get_instance()
+        job_journal.replay_pending_jobs(self.app.app_context())
+        job_journal.start_lease_keeper(self.app.app_context())
+
+    def __warm_up_caches(self):
+        """
+            If enabled in config/app.json, resolves in the background the GitHub IDs of the assignees,
+            so that the first tasks created do not wait for these lookups.
+        """
+        if self.__app_config.get("warmUpGithubUserIds", False):
+            WorkerPool.get_instance().submit('github_user_ids_warm_up', GithubGQLCallFactory().warm_up_user_id_cache,
+                                             app_context=self.app.app_context())
 
     def __load_config(self):
-        with open(Path(__file__).parent.parent / "config" / "app.json", encoding='utf-8') as file_app_config:
-            self.__app_config = json.load(file_app_config)
+        """
+            Checks all configuration files, so that an invalid configuration prevents the app from starting.
+        """
+        ConfigRegistry.validate()
+        self.__app_config = ConfigRegistry.get("app")
 
     def setup(self):
         """
@@ -94,6 +177,11 @@ class TechTeamBot(FlaskAppWrapper):
         self.__setup_slack_command_endpoint()
         self.__setup_github_webhook_endpoint()
         self.__setup_support_enpoints()
+        self.__setup_admin_endpoints()
+        self.__setup_metrics_endpoint()
+        self.__setup_config_reload()
+        self.__replay_pending_jobs()
+        self.__warm_up_caches()
 
     def run(self, **kwargs):
         self.app.run(port=self.__app_config['port'], **kwargs)
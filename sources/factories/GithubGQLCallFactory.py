@@ -2,20 +2,40 @@
     This module defines the factory for GQL requests to Github
 """
 
-import json
+import threading
 from datetime import datetime, timedelta
-from pathlib import Path
 from flask import current_app
+import requests
 import gql
-from gql.transport.requests import RequestsHTTPTransport
+from gql.transport.exceptions import TransportClosed, TransportQueryError, TransportServerError
 import sources.utils.Constants as cst
 from sources.models.CreatedGithubTaskParam import CreatedGithubTaskParam
+from sources.factories import GithubGQLDocuments
+from sources.utils.Metrics import time_outbound_call
+from sources.utils.SharedSessionTransport import SharedSessionTransport
+from sources.utils.GithubRateLimiter import GithubRateLimiter, PRIORITY_HIGH, PRIORITY_LOW
+from sources.utils.ExpiringValue import ExpiringValue
+from sources.utils.TtlCache import TtlCache
+from sources.utils.ConfigRegistry import ConfigRegistry
+
+DEFAULT_SPRINT_CACHE_MAX_TTL_SECONDS = 6 * 3600
+USER_ID_CACHE_MAX_SIZE = 512
+USER_ID_CACHE_TTL_SECONDS = 24 * 3600
+USER_ID_CACHE_NEGATIVE_TTL_SECONDS = 10 * 60
+_USER_ID_CACHE_MISS = object()
 
 
 class GithubGQLCallFactory():
     """
         Class capable of performing GQL request to the Github GQL API.
+        The IDs of users retrieved from their login, and the sprints of the project, are cached and shared by all
+        instances.
+        Requests are sent within the GitHub rate limit tracked by the shared GithubRateLimiter: reads of the update flow
+        are low priority, and are delayed first when the budget runs low.
+        Each thread uses its own GQL session, as a transport keeps the state of its last request.
     """
+    __user_id_cache = TtlCache(USER_ID_CACHE_MAX_SIZE, USER_ID_CACHE_TTL_SECONDS)
+    __sprint_cache = ExpiringValue()
 
     def __init__(self):
         """
@@ -23,10 +43,20 @@ class GithubGQLCallFactory():
         """
         self.github_config = None
         self.__github_access_token = None
+        self.__github_gql_sessions = threading.local()
+        self.rate_limiter = GithubRateLimiter.get_instance()
 
         self.github_gql_url = 'https://api.github.com/graphql'
-        with open(Path(__file__).parent.parent.parent / "config" / "github.json", encoding='utf-8') as file_github_config:
-            self.github_config = json.load(file_github_config)
+        self.github_config = ConfigRegistry.get("github")
+        ConfigRegistry.add_reload_listener(self.__reload_config)
+
+    def __reload_config(self):
+        """
+            Reads the configuration again from the registry, after a reload.
+            The cached sprints depend on the configured sprint field, so they are dropped.
+        """
+        self.github_config = ConfigRegistry.get("github")
+        self.invalidate_sprint_cache()
 
     def __get_github_access_token(self, app_context):
         """
@@ -40,71 +70,161 @@ class GithubGQLCallFactory():
 
     def __get_github_http_transport(self, app_context):
         """
-            Returns a HTTP Transport layer to the Github API.
+            Returns a HTTP Transport layer to the Github API, sending its requests through the shared HTTP session.
         """
         github_access_token = self.__get_github_access_token(app_context)
-        github_http_transport = RequestsHTTPTransport(
-                url=self.github_gql_url, headers={'Authorization': f'Bearer {github_access_token}'},
-                retries=3
+        github_http_transport = SharedSessionTransport(
+                url=self.github_gql_url, headers={'Authorization': f'Bearer {github_access_token}'}
             )
         return github_http_transport
 
-    def __get_github_gql_client(self, app_context):
+    def __get_github_gql_session(self, app_context):
         """
-            Returns the GQL Client to the Github API.
-            If it is not created yet, the method creates it before returning.
+            Returns the GQL session of the current thread to the Github API, kept open for the lifetime of the factory.
+            If it is not created yet, the method creates the client and connects it before returning.
         """
-        github_http_transport = self.__get_github_http_transport(app_context)
-        github_gql_client = gql.Client(transport=github_http_transport, fetch_schema_from_transport=False)
-        return github_gql_client
+        session = getattr(self.__github_gql_sessions, "session", None)
+        if session is None:
+            github_http_transport = self.__get_github_http_transport(app_context)
+            github_gql_client = gql.Client(transport=github_http_transport, fetch_schema_from_transport=False)
+            session = github_gql_client.connect_sync()
+            self.__github_gql_sessions.session = session
+        return session
+
+    def __reset_github_gql_session(self, failed_session):
+        """
+            Closes the GQL session of the current thread after a connection or authentication failure, so that the
+            next request reconnects. The access token is retrieved again from the Flask app configs in case it changed.
+        """
+        try:
+            failed_session.client.close_sync()
+        # pylint: disable-next=broad-exception-caught
+        except Exception:
+            pass
+        self.__github_gql_sessions.session = None
+        self.__github_access_token = None
 
-    def __send_gql_request(self, app_context, query, params):
+    def __send_gql_request(self, app_context, query, params, priority=PRIORITY_HIGH):
         """
             This methods handles sending a GQL request to GitHub through the dedicated HTTP Client.
+            On connection or authentication failure, the session is reset and the request is sent once more.
+            When GitHub rejects the request because of its rate limit, it is sent once more after the limit is lifted.
         """
-        client = self.__get_github_gql_client(app_context)
-        response = client.execute(query, variable_values=params)
-        return response
+        session = self.__get_github_gql_session(app_context)
+        try:
+            return self.__execute(session, query, params, priority)
+        except (TransportServerError, TransportClosed, requests.exceptions.ConnectionError) as error:
+            if isinstance(error, TransportServerError) and error.code in (403, 429) and self.rate_limiter.is_limited():
+                return self.__execute(session, query, params, priority)
+            if isinstance(error, TransportServerError) and error.code not in (401, 403):
+                raise
+            self.__reset_github_gql_session(session)
+        session = self.__get_github_gql_session(app_context)
+        return self.__execute(session, query, params, priority)
+
+    def __execute(self, session, query, params, priority):
+        """
+            Executes a request once allowed by the rate limiter, then records the rate limit state answered by GitHub.
+            The transport belongs to the current thread and is cleared before each request, so the headers read are
+            those of this request, or None if it got no response.
+        """
+        self.rate_limiter.acquire(priority)
+        try:
+            with time_outbound_call("github", GithubGQLDocuments.get_operation_name(query)):
+                return session.execute(query, variable_values=params)
+        finally:
+            self.rate_limiter.update(session.client.transport.response_headers)
 
     def get_user_id_from_login(self, app_context, login):
         """
             Returns the GitHub ID of a user from its GitHub login.
             If it cannot be found or retrieve, returns None
+            IDs are cached. Unknown logins are cached as well, for a shorter time.
         """
-        result = None
+        result = self.__user_id_cache.get(login, _USER_ID_CACHE_MISS)
+        if result is not _USER_ID_CACHE_MISS:
+            return result
 
         query_params = {}
         query_params['login'] = login
-        query = gql.gql(
-            """
-            query userIDfromLogin($login: String!) {
-                user(login: $login) {
-                    id
-                }
-            }
-            """
-        )
-        response = self.__send_gql_request(app_context, query, query_params)
+        query = GithubGQLDocuments.get_document("user_id_from_login")
+        response = self.__send_user_id_request(app_context, query, query_params)
         try:
             # pylint: disable-next=unsubscriptable-object
             result = response['user']['id']
         except TypeError:
             result = None
+        self.__cache_user_id(login, result)
+        return result
+
+    def resolve_user_ids(self, app_context, logins):
+        """
+            Retrieves the GitHub IDs of several users in a single request, and stores them in the cache.
+            Logins already cached are not requested again.
+            Returns a dict login -> ID, with None for the unknown logins.
+        """
+        result = {}
+        missing_logins = []
+        for login in dict.fromkeys(logins):
+            user_id = self.__user_id_cache.get(login, _USER_ID_CACHE_MISS)
+            if user_id is _USER_ID_CACHE_MISS:
+                missing_logins.append(login)
+            else:
+                result[login] = user_id
+        if not missing_logins:
+            return result
+
+        query_params = {f"login{index}": login for index, login in enumerate(missing_logins)}
+        query = GithubGQLDocuments.get_batched_user_id_query(len(missing_logins))
+        response = self.__send_user_id_request(app_context, query, query_params)
+        for index, login in enumerate(missing_logins):
+            user = (response or {}).get(f"user{index}")
+            result[login] = user['id'] if user else None
+            self.__cache_user_id(login, result[login])
         return result
 
+    def warm_up_user_id_cache(self, app_context):
+        """
+            Resolves the IDs of all users of the assigneeList from config/github.json, so that creating a task
+            does not need to look them up.
+        """
+        self.resolve_user_ids(app_context, list(self.github_config['assigneeList'].values()))
+
+    def __send_user_id_request(self, app_context, query, params):
+        """
+            Sends a query retrieving users from their login.
+            GitHub answers unknown logins with NOT_FOUND errors alongside the data of the known ones: in that case,
+            the partial data is returned instead of raising.
+        """
+        try:
+            return self.__send_gql_request(app_context, query, params)
+        except TransportQueryError as error:
+            errors = error.errors or []
+            if errors and all(item.get('type') == 'NOT_FOUND' for item in errors):
+                return error.data
+            raise
+
+    def __cache_user_id(self, login, user_id):
+        """
+            Caches the ID of a user. Unknown logins are cached for a shorter time, as the user may be created later.
+        """
+        if user_id is None:
+            self.__user_id_cache.set(login, None, USER_ID_CACHE_NEGATIVE_TTL_SECONDS)
+        else:
+            self.__user_id_cache.set(login, user_id)
+
+    @classmethod
+    def clear_user_id_cache(cls):
+        """
+            Empties the login -> ID cache shared by all instances.
+        """
+        cls.__user_id_cache.clear()
+
     def set_task_field_value(self, app_context, project_item_id, field_id, value_id):
         """
             Performs a GitHub mutation to assign the given value to the given field for the given task.
         """
-        query = gql.gql(
-            """
-            mutation SetValueToProjectV2TaskField($fieldMutation: UpdateProjectV2ItemFieldValueInput!) {
-                updateProjectV2ItemFieldValue(input: $fieldMutation) {
-                    clientMutationId
-                }
-            }
-        """
-        )
+        query = GithubGQLDocuments.get_document("set_task_field_value")
 
         mutation_param = {}
         mutation_param['clientMutationId'] = 'my_key'
@@ -118,81 +238,110 @@ class GithubGQLCallFactory():
 
         self.__send_gql_request(app_context, query, query_params)
 
-    def set_task_to_current_sprint(self, app_context, project_item_id):
+    def set_task_fields_values(self, app_context, project_item_id, field_values):
         """
-            Performs a GitHub mutation to assign the given task to the current sprint of the project.
+            Performs a single GitHub mutation assigning several fields of the given task.
+            field_values is a list of (field_id, value_id) tuples, as returned by the get_*_field_value methods.
         """
+        if not field_values:
+            return
+        query = GithubGQLDocuments.get_batched_field_value_mutation(len(field_values))
 
+        query_params = {}
+        for index, (field_id, value_id) in enumerate(field_values):
+            mutation_param = {}
+            mutation_param['clientMutationId'] = 'my_key'
+            mutation_param['projectId'] = self.github_config['projectId']
+            mutation_param['itemId'] = project_item_id
+            mutation_param['fieldId'] = field_id
+            mutation_param['value'] = value_id
+            query_params[f'fieldMutation{index}'] = mutation_param
+
+        self.__send_gql_request(app_context, query, query_params)
+
+    def get_current_sprint_field_value(self, app_context):
+        """
+            Returns the (field_id, value_id) assigning a task to the current sprint of the project.
+        """
         iteration_id = self.get_current_sprint_id(app_context)
         if iteration_id is None:
             raise ValueError('Current iteration not found.')
-
-        self.set_task_field_value(
-            app_context,
-            project_item_id,
-            self.github_config['sprintFieldId'],
-            {'iterationId': iteration_id}
-        )
+        return (self.github_config['sprintFieldId'], {'iterationId': iteration_id})
 
     def get_current_sprint_id(self, app_context):
         """
             Returns the GitHub ID of the current sprint iteration for the project.
             To do this, we retrieve all sprints and find the current one by dates.
+            The sprints are cached until the end of the current sprint, and at most sprintCacheMaxTtlSeconds.
+            They are not cached if there is no current or upcoming sprint, or if the GitHub answer cannot be read.
         """
-        query = gql.gql("""
-                    query GetIterations($node_id: ID!) {
-                        node(id: $node_id) {
-                            ... on ProjectV2IterationField {
-                                configuration {
-                                    duration,
-                                    iterations {
-                                        id,
-                                        startDate
-                                    }
-                                }
-                            }
-                        }
-                    }
-                """)
+        now = datetime.now()
+
+        def load_iterations():
+            iterations = self.__get_iterations(app_context)
+            return iterations, self.__get_sprint_cache_expiry(iterations, now)
+
+        iterations = self.__sprint_cache.get(now, load_iterations)
+
+        for iteration_id, start_date, end_date in iterations:
+            if start_date <= now < end_date:
+                return iteration_id
+        return None
+
+    def __get_iterations(self, app_context):
+        """
+            Retrieves all sprints of the project as a list of (id, start date, end date).
+            Returns an empty list if the GitHub answer cannot be read.
+        """
+        query = GithubGQLDocuments.get_document("get_iterations")
         query_params = {}
         query_params['node_id'] = self.github_config['sprintFieldId']
         response = self.__send_gql_request(app_context, query, query_params)
 
+        iterations = []
         try:
             # pylint: disable-next=unsubscriptable-object
             duration = response['node']['configuration']['duration']
-            now = datetime.now()
             # pylint: disable-next=unsubscriptable-object
             for iteration in response['node']['configuration']['iterations']:
                 start_date = datetime.strptime(iteration['startDate'], "%Y-%m-%d")
-                end_date = start_date + timedelta(days=duration)
-                if start_date <= now < end_date:
-                    return iteration['id']
+                iterations.append((iteration['id'], start_date, start_date + timedelta(days=duration)))
         except KeyError:
+            return []
+        return iterations
+
+    def __get_sprint_cache_expiry(self, iterations, now):
+        """
+            Returns when cached sprints must be retrieved again: at the next sprint boundary (end of the current sprint,
+            or start of the next one if there is no current sprint), and at most after the maximum TTL.
+            Returns None if there is no current or upcoming sprint.
+        """
+        boundaries = [end_date if start_date <= now else start_date
+                      for _, start_date, end_date in iterations if now < end_date]
+        if not boundaries:
             return None
-        return None
+        max_ttl = self.github_config.get('sprintCacheMaxTtlSeconds', DEFAULT_SPRINT_CACHE_MAX_TTL_SECONDS)
+        return min(*boundaries, now + timedelta(seconds=max_ttl))
 
-    def set_task_to_initial_status(self, app_context, project_item_id):
+    @classmethod
+    def invalidate_sprint_cache(cls):
         """
-            Performs a GitHub mutation to assign initial status to the task.
+            Drops the cached sprints, so that the next call to get_current_sprint_id retrieves them from GitHub.
         """
-        self.set_task_field_value(
-            app_context,
-            project_item_id,
-            self.github_config['statusFieldId'],
-            {'singleSelectOptionId': self.github_config['initialStatusValue']}
-        )
+        cls.__sprint_cache.clear()
 
-    def set_task_to_dev_team_escalation_type(self, app_context, project_item_id):
+    def get_initial_status_field_value(self):
         """
-            Performs a GitHub mutation to assign the type dev-team-escalation
+            Returns the (field_id, value_id) assigning the initial status to a task.
         """
-        self.set_task_field_value(
-            app_context,
-            project_item_id,
-            self.github_config['typeFieldId'],
-            {'singleSelectOptionId': self.github_config['dev-team-escalationStatusValue']}
-        )
+        return (self.github_config['statusFieldId'], {'singleSelectOptionId': self.github_config['initialStatusValue']})
+
+    def get_dev_team_escalation_type_field_value(self):
+        """
+            Returns the (field_id, value_id) assigning the type dev-team-escalation to a task.
+        """
+        return (self.github_config['typeFieldId'],
+                {'singleSelectOptionId': self.github_config['dev-team-escalationStatusValue']})
 
     def create_github_task(self, app_context, mutation_param):
         """
@@ -212,21 +361,7 @@ class GithubGQLCallFactory():
         if 'body' not in mutation_param:
             raise TypeError('Missing body in task_params')
 
-        query = gql.gql(
-            """
-            mutation CreateProjectV2Task($task: AddProjectV2DraftIssueInput!) {
-                addProjectV2DraftIssue(input: $task) {
-                    projectItem {
-                        id
-                        databaseId
-                        project {
-                            number
-                        }
-                    }
-                }
-            }
-        """
-        )
+        query = GithubGQLDocuments.get_document("create_github_task")
 
         mutation_param['clientMutationId'] = 'my_key'
         mutation_param['projectId'] = self.github_config['projectId']
@@ -249,59 +384,16 @@ class GithubGQLCallFactory():
             project_item = None
         return project_item
 
-    def get_dev_team_escalation_item_update(self, app_context, node_id):
-        """
-            Retrieves information on the project item relevant for the dev-team-escalation update flow
-        """
-        query = gql.gql("""
-                    query GetProjectItemForUpdate($node_id: ID!) {
-                        node(id: $node_id) {
-                            ... on ProjectV2Item {
-                                databaseId
-                                column: fieldValueByName(name: "Status") {
-                                    ... on ProjectV2ItemFieldSingleSelectValue {
-                                    name
-                                    }
-                                }
-                                draftIssue: content {
-                                    ... on DraftIssue {
-                                        assignees(first: 20) {
-                                            nodes {
-                                                login
-                                            }
-                                        }
-                                    }
-                                }
-                            }
-                        }
-                    }
-                """)
-        query_params = {}
-        query_params['node_id'] = node_id
-        response = self.__send_gql_request(app_context, query, query_params)
-        # pylint: disable-next=unsubscriptable-object
-        return response["node"]
-
     def get_project_item_for_update(self, app_context, node_id):
         """
-            Retrieves information on the project item relevant for the handler to select what flow to perform.
-            Currently returned: "Type" custom SingleSelect field
-        """
-        query = gql.gql("""
-                    query GetProjectItemForUpdate($node_id: ID!) {
-                        node(id: $node_id) {
-                            ... on ProjectV2Item {
-                                typeField: fieldValueByName(name: "Type") {
-                                    ... on ProjectV2ItemFieldSingleSelectValue {
-                                    name
-                                    }
-                                }
-                            }
-                        }
-                    }
-                """)
+            Retrieves in a single request the information on the project item needed by the handler to select what flow
+            to perform, and by the flows themselves.
+            Currently returned: databaseId, "Type" and "Status" (as column) SingleSelect fields, and the assignees of
+            the draft issue (as draftIssue)
+        """
+        query = GithubGQLDocuments.get_document("project_item_for_update")
         query_params = {}
         query_params['node_id'] = node_id
-        response = self.__send_gql_request(app_context, query, query_params)
+        response = self.__send_gql_request(app_context, query, query_params, PRIORITY_LOW)
         # pylint: disable-next=unsubscriptable-object
         return response["node"]
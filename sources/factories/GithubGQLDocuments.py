@@ -0,0 +1,132 @@
+"""
+    This module stores the GraphQL documents sent to the Github GQL API, and parses each of them only once.
+"""
+
+from functools import lru_cache
+import gql
+
+GITHUB_GQL_SOURCES = {
+    "user_id_from_login": """
+        query userIDfromLogin($login: String!) {
+            user(login: $login) {
+                id
+            }
+        }
+    """,
+    "set_task_field_value": """
+        mutation SetValueToProjectV2TaskField($fieldMutation: UpdateProjectV2ItemFieldValueInput!) {
+            updateProjectV2ItemFieldValue(input: $fieldMutation) {
+                clientMutationId
+            }
+        }
+    """,
+    "get_iterations": """
+        query GetIterations($node_id: ID!) {
+            node(id: $node_id) {
+                ... on ProjectV2IterationField {
+                    configuration {
+                        duration,
+                        iterations {
+                            id,
+                            startDate
+                        }
+                    }
+                }
+            }
+        }
+    """,
+    "create_github_task": """
+        mutation CreateProjectV2Task($task: AddProjectV2DraftIssueInput!) {
+            addProjectV2DraftIssue(input: $task) {
+                projectItem {
+                    id
+                    databaseId
+                    project {
+                        number
+                    }
+                }
+            }
+        }
+    """,
+    "project_item_for_update": """
+        query GetProjectItemForUpdate($node_id: ID!) {
+            node(id: $node_id) {
+                ... on ProjectV2Item {
+                    databaseId
+                    typeField: fieldValueByName(name: "Type") {
+                        ... on ProjectV2ItemFieldSingleSelectValue {
+                            name
+                        }
+                    }
+                    column: fieldValueByName(name: "Status") {
+                        ... on ProjectV2ItemFieldSingleSelectValue {
+                            name
+                        }
+                    }
+                    draftIssue: content {
+                        ... on DraftIssue {
+                            assignees(first: 20) {
+                                nodes {
+                                    login
+                                }
+                            }
+                        }
+                    }
+                }
+            }
+        }
+    """
+}
+
+
+@lru_cache(maxsize=None)
+def get_batched_field_value_mutation(count):
+    """
+        Returns the parsed mutation updating count fields of a project item in a single request.
+        Each update is aliased field<i> and takes its input from the variable $fieldMutation<i>.
+    """
+    variables = ", ".join(f"$fieldMutation{index}: UpdateProjectV2ItemFieldValueInput!" for index in range(count))
+    updates = "\n".join(
+        f"field{index}: updateProjectV2ItemFieldValue(input: $fieldMutation{index}) {{ clientMutationId }}"
+        for index in range(count))
+    return gql.gql(f"mutation SetValuesToProjectV2TaskFields({variables}) {{\n{updates}\n}}")
+
+
+@lru_cache(maxsize=None)
+def get_batched_user_id_query(count):
+    """
+        Returns the parsed query retrieving the ID of count users from their login in a single request.
+        Each user is aliased user<i> and its login is taken from the variable $login<i>.
+    """
+    variables = ", ".join(f"$login{index}: String!" for index in range(count))
+    users = "\n".join(f"user{index}: user(login: $login{index}) {{ id }}" for index in range(count))
+    return gql.gql(f"query userIDsFromLogins({variables}) {{\n{users}\n}}")
+
+
+@lru_cache(maxsize=None)
+def get_document(name):
+    """
+        Returns the parsed GraphQL document registered under name.
+        Documents are parsed and validated on first use, then served from memory.
+        Raises KeyError if no document is registered under name.
+    """
+    return gql.gql(GITHUB_GQL_SOURCES[name])
+
+
+def get_operation_name(document):
+    """
+        Returns the name of the first named operation of a parsed document, or "anonymous".
+    """
+    for definition in getattr(document, 'definitions', ()):
+        name = getattr(definition, 'name', None)
+        if name is not None:
+            return name.value
+    return "anonymous"
+
+
+def preload_documents():
+    """
+        Parses all registered documents, to avoid paying the parsing cost during the first requests.
+    """
+    for name in GITHUB_GQL_SOURCES:
+        get_document(name)
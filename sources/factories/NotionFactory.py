@@ -2,12 +2,12 @@
     This module defines the factory for Notion API
 """
 from datetime import date
-import json
-from pathlib import Path
-import requests
 from flask import current_app
 import sources.utils.Constants as cst
+from sources.utils.HttpClient import HttpClient
 from sources.models.GithubReleaseParam import GithubReleaseParam
+from sources.utils.ConfigRegistry import ConfigRegistry
+from sources.utils.Metrics import time_outbound_call
 
 
 class NotionFactory():
@@ -15,13 +15,21 @@ class NotionFactory():
         Class managing the API for Notion
 
     """
-    def __init__(self):
+    def __init__(self, http_session=None):
         """
             The factory instanciates the objects it needed to complete the processing of the request.
+            Calls to the Notion API go through http_session, the shared pooled session by default.
         """
         self.api_key = None
-        with open(Path(__file__).parent.parent.parent / "config" / "notion.json", encoding='utf-8') as file_notion_config:
-            self.notion_config = json.load(file_notion_config)
+        self.http_session = http_session if http_session is not None else HttpClient.get_session()
+        self.notion_config = ConfigRegistry.get("notion")
+        ConfigRegistry.add_reload_listener(self.__reload_config)
+
+    def __reload_config(self):
+        """
+            Reads the configuration again from the registry, after a reload.
+        """
+        self.notion_config = ConfigRegistry.get("notion")
 
     def _get_notion_api_key(self, app_context):
         """
@@ -49,12 +57,13 @@ class NotionFactory():
             'children': children
         }
 
-        response = requests.post(
-            'https://api.notion.com/v1/pages',
-            headers=headers,
-            json=data,
-            timeout=3000
-        )
+        with time_outbound_call("notion", "pages.create"):
+            response = self.http_session.post(
+                'https://api.notion.com/v1/pages',
+                headers=headers,
+                json=data,
+                timeout=3000
+            )
 
         if response.status_code != 200:
             error_message = f"Notion API could not create the DB row. Response code: {response.status_code}. Error message: "
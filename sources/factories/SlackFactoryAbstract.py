@@ -5,6 +5,9 @@
 from abc import ABCMeta
 from flask import current_app
 import sources.utils.Constants as cst
+from sources.utils.HttpClient import HttpClient
+from sources.utils.Metrics import time_outbound_call
+from sources.utils.SlackRateLimiter import SlackRateLimiter
 
 
 class SlackFactoryAbstract(metaclass=ABCMeta):
@@ -12,12 +15,26 @@ class SlackFactoryAbstract(metaclass=ABCMeta):
         Class managing the business logic related to Github ProjectV2 items
 
     """
-    def __init__(self):
+    def __init__(self, http_session=None):
         """
             The handler instanciates the objects it needed to complete the processing of the request.
+            Calls to the Slack API go through http_session, the shared pooled session by default,
+            and are scheduled by the shared Slack rate limiter.
         """
         self.__slack_bot_user_token = None
         self.__slack_user_token = None
+        self.http_session = http_session if http_session is not None else HttpClient.get_session()
+        self.rate_limiter = SlackRateLimiter.get_instance()
+
+    def _post(self, method, **kwargs):
+        """
+            Sends a POST request to the Slack Web API method, within its rate limit, and returns the response.
+            Requests rejected with a 429 are sent again after the Retry-After delay.
+        """
+        def send():
+            with time_outbound_call("slack", method):
+                return self.http_session.post(**kwargs)
+        return self.rate_limiter.call(method, send)
 
     def _get_slack_bot_user_token(self, app_context):
         """
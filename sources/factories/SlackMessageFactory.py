@@ -1,10 +1,9 @@
 """
     This module defines the factory for Slack messages (DM, public, etc.)
 """
-import json
-from pathlib import Path
-import requests
 from sources.factories.SlackFactoryAbstract import SlackFactoryAbstract
+from sources.utils.ConfigRegistry import ConfigRegistry
+from sources.utils.Metrics import time_outbound_call
 
 
 class SlackMessageFactory(SlackFactoryAbstract):
@@ -12,18 +11,24 @@ class SlackMessageFactory(SlackFactoryAbstract):
         Class managing the business logic related to Github ProjectV2 items
 
     """
-    def __init__(self):
+    def __init__(self, http_session=None):
         """
             The handler instanciates the objects it needed to complete the processing of the request.
         """
-        SlackFactoryAbstract.__init__(self)
-        with open(Path(__file__).parent.parent.parent / "config" / "slack.json", encoding='utf-8') as file_slack_config:
-            self.slack_config = json.load(file_slack_config)
+        SlackFactoryAbstract.__init__(self, http_session)
+        self.slack_config = ConfigRegistry.get("slack")
+        ConfigRegistry.add_reload_listener(self.__reload_config)
 
         self.post_message_url = 'https://slack.com/api/chat.postMessage'
         self.update_message_url = 'https://slack.com/api/chat.update'
         self.search_message_url = 'https://slack.com/api/search.messages'
 
+    def __reload_config(self):
+        """
+            Reads the configuration again from the registry, after a reload.
+        """
+        self.slack_config = ConfigRegistry.get("slack")
+
     def post_message(self, app_context, channel, text, blocks=None):
         """
             Sends a message 'text' to the 'channel' as the app.
@@ -37,9 +42,9 @@ class SlackMessageFactory(SlackFactoryAbstract):
         if blocks is not None:
             request_open_view_payload['blocks'] = blocks
 
-        result = requests.post(url=self.post_message_url,
-                               headers=request_open_view_header,
-                               json=request_open_view_payload, timeout=3000)
+        result = self._post('chat.postMessage', url=self.post_message_url,
+                            headers=request_open_view_header,
+                            json=request_open_view_payload, timeout=3000)
         if result is None:
             raise ValueError('Slack post message failed.')
         result_json = result.json()
@@ -57,9 +62,15 @@ class SlackMessageFactory(SlackFactoryAbstract):
         request_open_view_payload['channel'] = channel
         request_open_view_payload['text'] = text
         request_open_view_payload['thread_ts'] = thread_ts
-        requests.post(url=self.post_message_url,
-                      headers=request_open_view_header,
-                      json=request_open_view_payload, timeout=3000)
+        result = self._post('chat.postMessage', url=self.post_message_url,
+                            headers=request_open_view_header,
+                            json=request_open_view_payload, timeout=3000)
+        if result is None:
+            raise ValueError('Slack post reply failed.')
+        result_json = result.json()
+        if result_json["ok"] is False:
+            raise ValueError('Slack post reply was not completed.')
+        return result_json
 
     def edit_message(self, app_context, channel, thread_ts, text):
         """
@@ -71,9 +82,29 @@ class SlackMessageFactory(SlackFactoryAbstract):
         request_open_view_payload['channel'] = channel
         request_open_view_payload['text'] = text
         request_open_view_payload['ts'] = thread_ts
-        requests.post(url=self.update_message_url,
-                      headers=request_open_view_header,
-                      json=request_open_view_payload, timeout=3000)
+        result = self._post('chat.update', url=self.update_message_url,
+                            headers=request_open_view_header,
+                            json=request_open_view_payload, timeout=3000)
+        if result is None:
+            raise ValueError('Slack edit message failed.')
+        result_json = result.json()
+        if result_json["ok"] is False:
+            raise ValueError('Slack edit message was not completed.')
+        return result_json
+
+    def post_response(self, response_url, text, response_type='ephemeral'):
+        """
+            Sends a message 'text' through the response_url of a Slack command or interaction.
+            Response URLs embed their own authorization, so no token is sent. Only Slack URLs are accepted.
+        """
+        if not response_url.startswith('https://hooks.slack.com/'):
+            raise ValueError('Invalid Slack response URL.')
+        with time_outbound_call("slack", "response_url"):
+            result = self.http_session.post(url=response_url,
+                                            headers={"Content-type": "application/json"},
+                                            json={"response_type": response_type, "text": text}, timeout=3000)
+        if result is None or result.status_code != 200:
+            raise ValueError('Slack response URL post failed.')
 
     def search_message(self, app_context, query, count=None):
         """
@@ -85,9 +116,9 @@ class SlackMessageFactory(SlackFactoryAbstract):
         request_payload['query'] = query
         if count is not None:
             request_payload['count'] = count
-        result = requests.post(url=self.search_message_url,
-                               headers=request_header,
-                               data=request_payload, timeout=3000)
+        result = self._post('search.messages', url=self.search_message_url,
+                            headers=request_header,
+                            data=request_payload, timeout=3000)
         if result is None:
             raise ValueError('Slack search message failed.')
         result_json = result.json()
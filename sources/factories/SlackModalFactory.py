@@ -2,9 +2,8 @@
     This module defines a factory class, able to create Slack modals and open them for the Slack user.
 """
 import json
-from pathlib import Path
-import requests
 from sources.factories.SlackFactoryAbstract import SlackFactoryAbstract
+from sources.utils.ConfigRegistry import ConfigRegistry
 
 
 class SlackModalFactory(SlackFactoryAbstract):
@@ -12,16 +11,25 @@ class SlackModalFactory(SlackFactoryAbstract):
         Class capable of creating and opening modal views for Slack users.
     """
 
-    def __init__(self):
-        SlackFactoryAbstract.__init__(self)
+    def __init__(self, http_session=None):
+        SlackFactoryAbstract.__init__(self, http_session)
         self.open_view_url = 'https://slack.com/api/views.open'
         self.__assignee_list = None
         self.__app_list = None
         self.__env_list = None
+        ConfigRegistry.add_reload_listener(self.__reload_config)
+
+    def __reload_config(self):
+        """
+            Drops the options generated from the configuration, so that they are generated again after a reload.
+        """
+        self.__assignee_list = None
+        self.__app_list = None
+        self.__env_list = None
 
     def __get_assignee_list(self):
         """
-            Generate the list of options for the drop-down select of assignee, from thegithub.json config file.
+            Generate the list of options for the drop-down select of assignee, from the github.json config file.
         """
         if self.__assignee_list is None:
             self.__assignee_list = []
@@ -32,8 +40,7 @@ class SlackModalFactory(SlackFactoryAbstract):
                                             },
                                             "value": "no-assignee"
                                         })
-            with open(Path(__file__).parent.parent.parent / "config" / "github.json", encoding='utf-8') as file_github_config:
-                github_config = json.load(file_github_config)
+            github_config = ConfigRegistry.get("github")
             if "assigneeList" in github_config:
                 for key, value in github_config["assigneeList"].items():
                     self.__assignee_list.append({
@@ -51,8 +58,7 @@ class SlackModalFactory(SlackFactoryAbstract):
         """
         if self.__app_list is None:
             self.__app_list = []
-            with open(Path(__file__).parent.parent.parent / "config" / "apps.json", encoding='utf-8') as file_apps_config:
-                apps_config = json.load(file_apps_config)
+            apps_config = ConfigRegistry.get("apps")
             if "appList" in apps_config:
                 for key, value in apps_config["appList"].items():
                     self.__app_list.append({
@@ -70,8 +76,7 @@ class SlackModalFactory(SlackFactoryAbstract):
         """
         if self.__env_list is None:
             self.__env_list = []
-            with open(Path(__file__).parent.parent.parent / "config" / "apps.json", encoding='utf-8') as file_apps_config:
-                apps_config = json.load(file_apps_config)
+            apps_config = ConfigRegistry.get("apps")
             if "envList" in apps_config:
                 for key, value in apps_config["envList"].items():
                     self.__env_list.append({
@@ -401,4 +406,5 @@ class SlackModalFactory(SlackFactoryAbstract):
         request_open_view_payload = {}
         request_open_view_payload['view'] = view
         request_open_view_payload['trigger_id'] = trigger_id
-        requests.post(url=self.open_view_url, headers=request_open_view_header, json=request_open_view_payload, timeout=3000)
+        self._post('views.open', url=self.open_view_url, headers=request_open_view_header, json=request_open_view_payload,
+                   timeout=3000)
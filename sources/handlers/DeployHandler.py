@@ -2,9 +2,10 @@
     This module defines the handler for deployment with the group.One Deploy Proxy
     This handler is just a API call factory, as there is no special business logic.
 """
-import requests
 from flask import current_app
 import sources.utils.Constants as cst
+from sources.utils.HttpClient import HttpClient
+from sources.utils.Metrics import time_outbound_call
 from sources.models.DeployHandlerParam import DeployHandlerParam
 
 
@@ -13,11 +14,13 @@ class DeployHandler():
         Class managing the interface with group.One Deploy Proxy
 
     """
-    def __init__(self):
+    def __init__(self, http_session=None):
         """
             The handler instanciates the objects it needed to complete the processing of the request.
+            Calls to the GODP API go through http_session, the shared pooled session by default.
         """
         self.__godp_token = None
+        self.http_session = http_session if http_session is not None else HttpClient.get_session()
         self.godp_deploy_url = "https://godp.wp-media.me/v1/deploy"
 
     def _get_godp_token(self, app_context):
@@ -42,9 +45,10 @@ class DeployHandler():
         request_payload['environment'] = task_params.env
         request_payload['ref'] = task_params.commit
 
-        result = requests.post(url=self.godp_deploy_url,
-                               headers=request_header,
-                               json=request_payload, timeout=3000)
+        with time_outbound_call("godp", "deploy"):
+            result = self.http_session.post(url=self.godp_deploy_url,
+                                            headers=request_header,
+                                            json=request_payload, timeout=3000)
         if result is None:
             current_app.logger.error("deploy_commit: GODP call failed.")
             raise ValueError('GODP call failed.')
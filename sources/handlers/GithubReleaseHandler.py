@@ -1,10 +1,10 @@
 """
     This module defines the handler for GitHub Release related logic.
 """
-import json
-from pathlib import Path
 from sources.factories.SlackMessageFactory import SlackMessageFactory
 from sources.factories.NotionFactory import NotionFactory
+from sources.utils.ConfigRegistry import ConfigRegistry
+from sources.utils.SlackRateLimiter import SlackRateLimiter
 
 
 class GithubReleaseHandler():
@@ -18,18 +18,29 @@ class GithubReleaseHandler():
         """
         self.slack_message_factory = SlackMessageFactory()
         self.notion_factory = NotionFactory()
-        with open(Path(__file__).parent.parent.parent / "config" / "github.json", encoding='utf-8') as file_github_config:
-            self.github_config = json.load(file_github_config)
+        self.github_config = ConfigRegistry.get("github")
+        ConfigRegistry.add_reload_listener(self.__reload_config)
 
-    def process_release(self, app_context, release_params):
+    def __reload_config(self):
+        """
+            Reads the configuration again from the registry, after a reload.
+        """
+        self.github_config = ConfigRegistry.get("github")
+
+    def process_release(self, app_context, release_params, notion_url=None, on_created=None):
         """
             Processing method when a github release is released
+            If notion_url is given, the release note was already created by a previous attempt and only the Slack
+            message is sent. Otherwise on_created, if given, is called with the URL of the created release note.
         """
         # Replace the repository name by its readable name
         repository_readable_name = self.github_config["repoNameToReadable"][release_params.repository_name]
         release_params.repository_name = repository_readable_name
         # Create a page in the Notion database
-        notion_url = self.notion_factory.create_release_note(app_context, release_params)
+        if notion_url is None:
+            notion_url = self.notion_factory.create_release_note(app_context, release_params)
+            if on_created is not None:
+                on_created(notion_url)
 
         # Send a message to Slack
         text = "The draft release note for " + repository_readable_name + " " + release_params.version
@@ -39,6 +50,8 @@ class GithubReleaseHandler():
 
         blocks = self.slack_message_factory.get_release_note_review_blocks(text)
 
-        self.slack_message_factory.post_message(app_context,
-                                                self.slack_message_factory.get_channel('ops-deploy'),
-                                                text, blocks)
+        # Only notification of the release: if rate limited, the job can be sent again with the release note
+        with SlackRateLimiter.deferrable():
+            self.slack_message_factory.post_message(app_context,
+                                                    self.slack_message_factory.get_channel('ops-deploy'),
+                                                    text, blocks)
@@ -1,12 +1,14 @@
 """
     This module defines the handler for GitHub task (ProjectV2Item) related logic.
 """
-import json
-from pathlib import Path
 from flask import current_app
 from sources.factories.GithubGQLCallFactory import GithubGQLCallFactory
 from sources.factories.SlackMessageFactory import SlackMessageFactory
 from sources.models.InitGithubTaskParam import InitGithubTaskParam
+from sources.utils.EscalationThreadIndex import EscalationThreadIndex
+from sources.utils.ConfigRegistry import ConfigRegistry
+from sources.utils.SlackRateLimiter import SlackRateLimiter
+from sources.utils.Tracing import traced
 
 
 class GithubTaskHandler():
@@ -20,8 +22,15 @@ class GithubTaskHandler():
         """
         self.github_gql_call_factory = GithubGQLCallFactory()
         self.slack_message_factory = SlackMessageFactory()
-        with open(Path(__file__).parent.parent.parent / "config" / "github.json", encoding='utf-8') as file_github_config:
-            self.github_config = json.load(file_github_config)
+        self.escalation_thread_index = EscalationThreadIndex.get_instance()
+        self.github_config = ConfigRegistry.get("github")
+        ConfigRegistry.add_reload_listener(self.__reload_config)
+
+    def __reload_config(self):
+        """
+            Reads the configuration again from the registry, after a reload.
+        """
+        self.github_config = ConfigRegistry.get("github")
 
     def get_task_link(self, project_number, view_number, item_number):
         """
@@ -41,35 +50,22 @@ class GithubTaskHandler():
 
         return view_number
 
-    def init_github_task(self, app_context, task_params: InitGithubTaskParam):
+    @traced()
+    def init_github_task(self, app_context, task_params: InitGithubTaskParam, project_item=None, on_created=None):
         """
             Create a GitHub task in the configured project according to the task parameters.
             To do so, a GQL Mutation is requested to the GitHub API.
+            If project_item is given, the task was already created by a previous attempt and only the following steps
+            are run. Otherwise on_created, if given, is called with the created task before the notifications.
 
             task_params
                 - title (Mandatory): Title of the task
                 - body (Mandatory): Description of the task
         """
-        mutation_param = {}
-        # Check mandatory parameters
-        if task_params.title is None:
-            raise TypeError('Missing title in task_params')
-        mutation_param['title'] = task_params.title
-
-        if task_params.body is None:
-            raise TypeError('Missing body in task_params')
-        mutation_param['body'] = task_params.body
-
-        # Check optional parameters
-
-        assignee_id = None
-        if 'no-assignee' != task_params.assignee:
-            assignee_id = self.github_gql_call_factory.get_user_id_from_login(app_context, task_params.assignee)
-        if assignee_id is not None:
-            mutation_param['assigneeIds'] = [assignee_id]
-
-        # Create the task and retrieve its ID
-        project_item = self.github_gql_call_factory.create_github_task(app_context, mutation_param)
+        if project_item is None:
+            project_item = self.create_github_task(app_context, task_params)
+            if project_item is not None and on_created is not None:
+                on_created(project_item)
 
         if project_item is not None:
 
@@ -80,19 +76,14 @@ class GithubTaskHandler():
                     self.get_board_view(task_params.flow),
                     project_item.item_database_id
                     )
-                self.slack_message_factory.post_message(app_context, task_params.initiator, text)
+                # First notification of the created task: if rate limited, the job can be sent again with the task
+                with SlackRateLimiter.deferrable():
+                    self.slack_message_factory.post_message(app_context, task_params.initiator, text)
 
-            # Set the task to Todo
-            self.github_gql_call_factory.set_task_to_initial_status(app_context, project_item.item_id)
-
-            if task_params.handle_immediately:
-                # Set the task to the current sprint
-                self.github_gql_call_factory.set_task_to_current_sprint(app_context, project_item.item_id)
+            # Set the task fields in a single mutation: Todo, current sprint if needed, and type
+            self.set_task_initial_fields(app_context, project_item.item_id, task_params)
 
             if 'dev-team-escalation' == task_params.flow:
-                # Set the issue type
-                self.github_gql_call_factory.set_task_to_dev_team_escalation_type(app_context, project_item.item_id)
-
                 # Send message on Slack channel
                 main_text = f"{task_params.title} by <@{task_params.initiator}>: " + self.get_task_link(
                     project_item.project_number,
@@ -104,10 +95,62 @@ class GithubTaskHandler():
 
                 # Add details of the escalation in the thread
                 if thread is not None:
+                    self.escalation_thread_index.record(project_item.item_id, project_item.item_database_id,
+                                                        thread["channel"], thread["ts"],
+                                                        thread.get("message", {}).get("text", main_text))
                     detail_text = f"{task_params.body}"
                     self.slack_message_factory.post_reply(app_context,
                                                           thread["channel"], thread["ts"], detail_text)
 
+    def create_github_task(self, app_context, task_params: InitGithubTaskParam):
+        """
+            Creates the GitHub task of the task parameters, and returns it as a CreatedGithubTaskParam, or None.
+        """
+        mutation_param = {}
+        # Check mandatory parameters
+        if task_params.title is None:
+            raise TypeError('Missing title in task_params')
+        mutation_param['title'] = task_params.title
+
+        if task_params.body is None:
+            raise TypeError('Missing body in task_params')
+        mutation_param['body'] = task_params.body
+
+        # Check optional parameters
+
+        assignee_id = None
+        if 'no-assignee' != task_params.assignee:
+            assignee_id = self.github_gql_call_factory.get_user_id_from_login(app_context, task_params.assignee)
+        if assignee_id is not None:
+            mutation_param['assigneeIds'] = [assignee_id]
+
+        # Create the task and retrieve its ID
+        return self.github_gql_call_factory.create_github_task(app_context, mutation_param)
+
+    @traced()
+    def set_task_initial_fields(self, app_context, project_item_id, task_params: InitGithubTaskParam):
+        """
+            Sets the fields of a newly created task in one request: initial status, current sprint if the task
+            must be handled immediately, and type for the dev-team-escalation flow.
+            If the current sprint cannot be found, the other fields are still set, then the ValueError is raised.
+        """
+        field_values = [self.github_gql_call_factory.get_initial_status_field_value()]
+
+        sprint_error = None
+        if task_params.handle_immediately:
+            try:
+                field_values.append(self.github_gql_call_factory.get_current_sprint_field_value(app_context))
+            except ValueError as error:
+                sprint_error = error
+
+        if 'dev-team-escalation' == task_params.flow:
+            field_values.append(self.github_gql_call_factory.get_dev_team_escalation_type_field_value())
+
+        self.github_gql_call_factory.set_task_fields_values(app_context, project_item_id, field_values)
+        if sprint_error is not None:
+            raise sprint_error
+
+    @traced()
     def process_update(self, app_context, node_id):
         """
             Processing method when a project item is updated.
@@ -120,17 +163,18 @@ class GithubTaskHandler():
         if (project_item_details["typeField"]
            and project_item_details["typeField"]["name"]
            and project_item_details["typeField"]["name"] == 'dev-team-escalation'):
-            self.dev_team_escalation_update(app_context, node_id)
+            self.dev_team_escalation_update(app_context, node_id, project_item_details)
         else:
             app_context.push()
             current_app.logger.info("GitHubTaskHandler.process_update: No corresponding flow.")
 
-    def dev_team_escalation_update(self, app_context, node_id):
+    @traced()
+    def dev_team_escalation_update(self, app_context, node_id, project_item_details):
         """
             Perform the Slack update of a dev-team-escalation following an update of the GitHub draft issue
+            project_item_details is the result of get_project_item_for_update for the node_id.
         """
         # Get assignee, status, itemID
-        project_item_details = self.github_gql_call_factory.get_dev_team_escalation_item_update(app_context, node_id)
         project_item_status = project_item_details["column"]["name"]
         # Concatenate assignee logins
         project_item_assignees = ''
@@ -140,24 +184,51 @@ class GithubTaskHandler():
         else:
             project_item_assignees = 'No one.'
 
-        # Search for Slack thread based on channel, author and itemId part of the GitHub link
-        query = 'itemId=' + str(project_item_details["databaseId"]) + ' in:wpmedia_dev-team-escalation from:tbtt'
-        found_slack_messages = self.slack_message_factory.search_message(app_context, query)
-        slack_thread = found_slack_messages["messages"]["matches"][0]
-        # Maybe update the thread parent
-        old_parent_message_split = slack_thread["text"].splitlines(False)
-        new_parent_message = old_parent_message_split[0]
-        new_parent_message += '\n' + 'Status: ' + project_item_status + '\n'
-        new_parent_message += 'Assignees: ' + project_item_assignees
-        if slack_thread["text"] != new_parent_message:
-            self.slack_message_factory.edit_message(app_context, slack_thread["channel"]["id"],
-                                                    slack_thread["ts"], new_parent_message)
-
+        # The search and the edit can be sent again with the job if rate limited, but not the reply once edited
+        with SlackRateLimiter.deferrable():
+            slack_thread = self.get_escalation_thread(app_context, node_id, project_item_details["databaseId"])
+            # Maybe update the thread parent
+            old_parent_message_split = slack_thread["text"].splitlines(False)
+            new_parent_message = old_parent_message_split[0]
+            new_parent_message += '\n' + 'Status: ' + project_item_status + '\n'
+            new_parent_message += 'Assignees: ' + project_item_assignees
+            # The text is updated in the index first, so that a single update edits the message and replies
+            edited = (slack_thread["text"] != new_parent_message and
+                      self.escalation_thread_index.update_text(node_id, new_parent_message, slack_thread["text"]))
+            if edited:
+                try:
+                    self.slack_message_factory.edit_message(app_context, slack_thread["channel"],
+                                                            slack_thread["ts"], new_parent_message)
+                except Exception:
+                    self.escalation_thread_index.update_text(node_id, slack_thread["text"], new_parent_message)
+                    raise
+
+        if edited:
             # Post Slack message in the thread
             thread_response = 'This escalation is now ' + project_item_status
             thread_response += ' and currently assigned to: ' + project_item_assignees
             self.slack_message_factory.post_reply(app_context,
-                                                  slack_thread["channel"]["id"], slack_thread["ts"], thread_response)
+                                                  slack_thread["channel"], slack_thread["ts"], thread_response)
         else:
             app_context.push()
-            current_app.logger.info("dev_team_escalation_update: Next message identical to the current one.")
+            current_app.logger.info("dev_team_escalation_update: Next message identical to the current one, or already sent.")
+
+    @traced()
+    def get_escalation_thread(self, app_context, node_id, database_id):
+        """
+            Returns the Slack thread of a dev-team-escalation as a dict with channel, ts and text of the parent message.
+            The thread is read from the escalation thread index. If it is not indexed, for instance for escalations
+            created before the index existed, it is searched on Slack and then added to the index.
+        """
+        slack_thread = self.escalation_thread_index.get(node_id)
+        if slack_thread is not None:
+            return slack_thread
+
+        # Search for Slack thread based on channel, author and itemId part of the GitHub link
+        query = 'itemId=' + str(database_id) + ' in:wpmedia_dev-team-escalation from:tbtt'
+        found_slack_messages = self.slack_message_factory.search_message(app_context, query)
+        found_message = found_slack_messages["messages"]["matches"][0]
+        slack_thread = {"channel": found_message["channel"]["id"], "ts": found_message["ts"], "text": found_message["text"]}
+        self.escalation_thread_index.record(node_id, database_id,
+                                            slack_thread["channel"], slack_thread["ts"], slack_thread["text"])
+        return slack_thread
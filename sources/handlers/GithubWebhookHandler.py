@@ -1,19 +1,30 @@
 """
     This module defines the handler for GitHub task (ProjectV2Item) related logic.
 """
-import json
-from threading import Thread
-from pathlib import Path
+from dataclasses import asdict
 from flask import current_app
 from sources.handlers.GithubTaskHandler import GithubTaskHandler
 from sources.handlers.GithubReleaseHandler import GithubReleaseHandler
 from sources.models.GithubReleaseParam import GithubReleaseParam
+from sources.utils.GithubRateLimiter import GithubRateLimitedError
+from sources.utils.JobJournal import JobJournal
+from sources.utils.SlackRateLimiter import SlackRateLimitedError
+from sources.utils.TtlCache import TtlCache
+from sources.utils.ConfigRegistry import ConfigRegistry
+
+DEFAULT_DELIVERY_CACHE_SIZE = 2048
+DEFAULT_DELIVERY_CACHE_TTL_SECONDS = 3600
+DEFAULT_PROJECT_ITEM_DEBOUNCE_SECONDS = 5
 
 
 class GithubWebhookHandler():
     """
         Class managing the business logic related to Github Webhooks
-
+        Deliveries already received, identified by their X-GitHub-Delivery header, are ignored.
+        Project item updates are debounced: the job processing an item starts after a debounce window, and
+        the updates of the item received meanwhile are coalesced with it, as the job reads the latest state of the item.
+        A single job at a time processes an item: updates received while it runs are processed by a new job submitted
+        when it is done.
     """
     def __init__(self):
         """
@@ -21,27 +32,55 @@ class GithubWebhookHandler():
         """
         self.github_project_item_handler = GithubTaskHandler()
         self.github_release_handler = GithubReleaseHandler()
-        with open(Path(__file__).parent.parent.parent / "config" / "github.json", encoding='utf-8') as file_github_config:
-            self.github_config = json.load(file_github_config)
+        self.job_journal = JobJournal.get_instance()
+        self.job_journal.register_runner('github_project_item_update', self.process_project_item_update_job)
+        self.job_journal.register_runner('github_release', self.process_release_job)
+        self.github_config = ConfigRegistry.get("github")
+        ConfigRegistry.add_reload_listener(self.__reload_config)
+        webhooks_config = ConfigRegistry.get("app").get("githubWebhooks", {})
+        self.__deliveries = TtlCache(webhooks_config.get("deliveryCacheSize", DEFAULT_DELIVERY_CACHE_SIZE),
+                                     webhooks_config.get("deliveryCacheTtlSeconds", DEFAULT_DELIVERY_CACHE_TTL_SECONDS))
+        self.project_item_debounce_seconds = webhooks_config.get("projectItemDebounceSeconds",
+                                                                 DEFAULT_PROJECT_ITEM_DEBOUNCE_SECONDS)
+        # Items with a pending or running job, with whether they were updated since the job started.
+        # Marks expire like delivery IDs, so that a lost job does not block its item.
+        self.__pending_project_items = TtlCache(self.__deliveries.max_size, self.__deliveries.ttl)
+
+    def __reload_config(self):
+        """
+            Reads the configuration again from the registry, after a reload.
+        """
+        self.github_config = ConfigRegistry.get("github")
 
-    def process(self, payload_json):
+    def process(self, payload_json, delivery_id=None):
         """
             Method called to process a rGithub webhook. It identifies the callback assigned to the webhook type
             and routes the request according to it to the right callback method.
+            delivery_id is the X-GitHub-Delivery header: a delivery already processed is ignored.
         """
-        if "projects_v2_item" in payload_json:
-            self.project_v2_item_update_callback(payload_json)
-        elif "release" in payload_json:
-            self.release_callback(payload_json)
-        else:
-            raise ValueError('Unknown webhook payload.')
+        if delivery_id is not None and not self.__deliveries.add(delivery_id, True):
+            current_app.logger.info("GithubWebhookHandler: Delivery %s already received.", delivery_id)
+            return {}
+        try:
+            if "projects_v2_item" in payload_json:
+                self.project_v2_item_update_callback(payload_json)
+            elif "release" in payload_json:
+                self.release_callback(payload_json)
+            else:
+                raise ValueError('Unknown webhook payload.')
+        except Exception:
+            # The delivery was not processed: let GitHub redeliver it
+            if delivery_id is not None:
+                self.__deliveries.delete(delivery_id)
+            raise
         return {}
 
     def project_v2_item_update_callback(self, payload_json):
         """
             Callback for webhooks linked to a project V2 item update.
             Filter out irrelevant webhooks.
-            Retrieve the node_id of the updated item and start a dedicated thread to handle the udpate
+            Retrieve the node_id of the updated item and submit a journaled job to handle the udpate,
+            delayed by the debounce window unless a job is already pending for the item.
         """
         # Keep only update actions
         if "action" not in payload_json or "edited" != payload_json["action"]:
@@ -54,16 +93,55 @@ class GithubWebhookHandler():
             return
 
         node_id = payload_json["projects_v2_item"]["node_id"]
-        thread = Thread(target=self.github_project_item_handler.process_update, kwargs={
-            "app_context": current_app.app_context(), "node_id": node_id})
-        current_app.logger.info("project_v2_item_update_callback: Starting processing thread...")
-        thread.start()
+        if (self.__pending_project_items.replace(node_id, True) or
+           not self.__pending_project_items.add(node_id, False)):
+            current_app.logger.info("project_v2_item_update_callback: Update coalesced with the pending job.")
+            return
+        current_app.logger.info("project_v2_item_update_callback: Submitting processing job...")
+        self.__submit_project_item_job(current_app.app_context(), node_id, self.project_item_debounce_seconds)
+
+    def __submit_project_item_job(self, app_context, node_id, delay):
+        """
+            Submits the job processing a project item marked as pending. The item is released if the submission fails.
+        """
+        try:
+            self.job_journal.submit(app_context, 'github_project_item_update', {"node_id": node_id}, delay=delay)
+        except Exception:
+            self.__release_project_item(node_id)
+            raise
+
+    def __release_project_item(self, node_id):
+        """
+            Marks a project item as having no pending job anymore: its next update will be submitted.
+        """
+        self.__pending_project_items.delete(node_id)
+
+    def process_project_item_update_job(self, app_context, node_id):
+        """
+            Runner of the journaled github_project_item_update jobs.
+            The item stays marked while it is processed, so that no other job processes it at the same time. If it was
+            updated meanwhile, a new job is submitted once the processing is done.
+            If the GitHub rate limit delays the read, or the Slack rate limit delays the edit of the thread, the job is
+            submitted again after the wait instead of holding the worker.
+        """
+        # Also marks the items of jobs replayed from the journal, which were not marked by this process
+        self.__pending_project_items.set(node_id, False)
+        try:
+            self.github_project_item_handler.process_update(app_context, node_id)
+        except (GithubRateLimitedError, SlackRateLimitedError) as error:
+            self.__submit_project_item_job(app_context, node_id, error.wait)
+            return
+        except Exception:
+            self.__release_project_item(node_id)
+            raise
+        if self.__pending_project_items.pop(node_id, False) and self.__pending_project_items.add(node_id, False):
+            self.__submit_project_item_job(app_context, node_id, self.project_item_debounce_seconds)
 
     def release_callback(self, payload_json):
         """
             Callback for webhooks linked to a Github release.
             Filter out irrelevant webhooks.
-            Retrieve the relevant data in paylaod and start a thread for further processing
+            Retrieve the relevant data in paylaod and submit a journaled job for further processing
         """
         # Keep only released actions
         if "action" not in payload_json or "released" != payload_json["action"]:
@@ -79,7 +157,23 @@ class GithubWebhookHandler():
         body = payload_json["release"]["body"]
 
         release_params = GithubReleaseParam(repository_name, version, body)
-        thread = Thread(target=self.github_release_handler.process_release, kwargs={
-            "app_context": current_app.app_context(), "release_params": release_params})
-        current_app.logger.info("release_callback: Starting processing thread...")
-        thread.start()
+        current_app.logger.info("release_callback: Submitting processing job...")
+        self.job_journal.submit(current_app.app_context(), 'github_release', asdict(release_params))
+
+    def process_release_job(self, app_context, notion_url=None, **params):
+        """
+            Runner of the journaled github_release jobs: rebuilds the release parameters from the journal.
+            The created release note is stored in the journal before the Slack message. If the Slack rate limit delays
+            the message, the job is submitted again after the wait instead of holding the worker.
+        """
+        try:
+            self.github_release_handler.process_release(app_context, GithubReleaseParam(**params), notion_url,
+                                                        self.__checkpoint_release_note)
+        except SlackRateLimitedError as error:
+            self.job_journal.resubmit(app_context, delay=error.wait)
+
+    def __checkpoint_release_note(self, notion_url):
+        """
+            Stores the release note created by the running github_release job in the journal.
+        """
+        self.job_journal.checkpoint(notion_url=notion_url)
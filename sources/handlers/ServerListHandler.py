@@ -1,9 +1,52 @@
 """
     This module defines the handler for logic related to listing server IPs.
 """
+import csv
+import hashlib
+import io
+import json
+import threading
 import requests
 from sources.factories.SlackMessageFactory import SlackMessageFactory
-from sources.utils import Duplication
+from sources.models.IpListSnapshot import IpListSnapshot
+from sources.utils import IpAddress
+from sources.utils.IpRangeIndex import IpRangeIndex
+from sources.utils.CachedHttpResource import CachedHttpResource, UnexpectedStatusError
+from sources.utils.HttpClient import HttpClient
+from sources.utils.ConfigRegistry import ConfigRegistry
+
+DEFAULT_CLOUDFLARE_IPS_TTL_SECONDS = 3600
+DEFAULT_CLOUDFLARE_IPS_STALE_SECONDS = 86400
+
+# Services of WP Rocket calling or called by the websites: (service, URL, source of its IPs)
+WP_ROCKET_SERVICES = [
+    ("license", "https://wp-rocket.me", "cloudflare"),
+    ("cpcss", "https://cpcss.wp-rocket.me", "groupone"),
+    ("rucss", None, "groupone"),
+    ("dynamic_lists", "https://b.rucss.wp-rocket.me", "groupone"),
+    ("rocketcdn", "https://rocketcdn.me/api/", "groupone")
+]
+
+# User agents of the WP Rocket SaaS (RUCSS)
+WP_ROCKET_SAAS_USER_AGENTS = [
+    # pylint: disable-next=line-too-long
+    "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/131.0.0.0 Safari/537.36 (compatible; WP-Rocket-SaaS/1.0; +https://wp-rocket.me/bot/)",  # noqa
+    # pylint: disable-next=line-too-long
+    "Mozilla/5.0 (Linux; Android 13; Pixel 5) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/131.0.0.0 Mobile Safari/537.36 (compatible; WP-Rocket-SaaS/1.0; +https://wp-rocket.me/bot/)"  # noqa
+]
+
+# Representations of the IP lists, and the IP families they contain
+IP_LIST_FAMILIES = {
+    "human_readable": ("ipv4", "ipv6"),
+    "ipv4": ("ipv4",),
+    "ipv6": ("ipv6",)
+}
+
+
+class IpSourceUnavailableError(Exception):
+    """
+        Raised when a source list of IPs cannot be retrieved and no list was retrieved before.
+    """
 
 
 class ServerListHandler():
@@ -11,11 +54,30 @@ class ServerListHandler():
         Class managing the business logic related to listing servers WP Media uses.
 
     """
-    def __init__(self):
+    def __init__(self, http_session=None):
         """
             The handler instanciates the objects it needed to complete the processing of the request.
+            Calls to CloudFlare go through http_session, the shared pooled session by default.
+            CloudFlare IP lists are cached according to the "cloudflareIps" section of config/app.json.
+        """
+        self.http_session = http_session if http_session is not None else HttpClient.get_session()
+        self.slack_message_factory = SlackMessageFactory(self.http_session)
+        self.cloudflare_ips_config = ConfigRegistry.get("app").get("cloudflareIps", {})
+        self.__cloudflare_ips = {}
+        self.__snapshot = None
+        self.__snapshot_lock = threading.Lock()
+        ConfigRegistry.add_reload_listener(self.__reload_config)
+
+    def __reload_config(self):
+        """
+            Reads the "cloudflareIps" section of config/app.json again from the registry, after a reload, and applies
+            it to the cached CloudFlare IP lists, which keep their current body.
         """
-        self.slack_message_factory = SlackMessageFactory()
+        self.cloudflare_ips_config = ConfigRegistry.get("app").get("cloudflareIps", {})
+        for cloudflare_ips in list(self.__cloudflare_ips.values()):
+            cloudflare_ips.ttl = self.cloudflare_ips_config.get("ttlSeconds", DEFAULT_CLOUDFLARE_IPS_TTL_SECONDS)
+            cloudflare_ips.stale_ttl = self.cloudflare_ips_config.get("staleWhileRevalidateSeconds",
+                                                                      DEFAULT_CLOUDFLARE_IPS_STALE_SECONDS)
 
     def get_cloudflare_proxy_ipv4(self):
         """
@@ -34,17 +96,38 @@ class ServerListHandler():
     def get_cloudflare_proxy_ips(self, ip_version):
         """
             Retrieves the list of IP matching ip_version used by CloudFlare and returns it as a string, one IP per line.
-            If an error occurs, it is returned.
+            The list is served from memory and refreshed in the background once expired. If CloudFlare cannot be
+            reached, the last list retrieved is returned. If no list could ever be retrieved, the error is returned.
         """
-        url = 'https://www.cloudflare.com/ips-' + ip_version + '/'
         try:
-            response = requests.get(url, timeout=5)
+            return self.__get_cloudflare_ip_list(ip_version)
+        except IpSourceUnavailableError as error:
+            return f"Error: {error}"
+
+    def __get_cloudflare_ip_list(self, ip_version):
+        """
+            Returns the list of IP matching ip_version used by CloudFlare as a string, one IP per line.
+            Raises IpSourceUnavailableError if no list could ever be retrieved.
+        """
+        try:
+            body = self.__get_cloudflare_ips_resource(ip_version).get()
         except requests.exceptions.RequestException as error:
-            return f"Error: Unable to reach CloudFlare. Error: {error}"
-        if response.status_code == 200:
-            ip_list = response.text.strip().split('\n')
-            return '\n'.join(ip_list) + '\n'
-        return f"Error: Unable to fetch CloudFlare IPs. Status code: {response.status_code}"
+            raise IpSourceUnavailableError(f"Unable to reach CloudFlare. Error: {error}") from error
+        except UnexpectedStatusError as error:
+            raise IpSourceUnavailableError(f"Unable to fetch CloudFlare IPs. Status code: {error.status_code}") from error
+        ip_list = body.strip().split('\n')
+        return '\n'.join(ip_list) + '\n'
+
+    def __get_cloudflare_ips_resource(self, ip_version):
+        """
+            Returns the cached CloudFlare IP list matching ip_version, creating it on first use.
+        """
+        if ip_version not in self.__cloudflare_ips:
+            self.__cloudflare_ips[ip_version] = CachedHttpResource(
+                'https://www.cloudflare.com/ips-' + ip_version + '/', self.http_session,
+                self.cloudflare_ips_config.get("ttlSeconds", DEFAULT_CLOUDFLARE_IPS_TTL_SECONDS),
+                self.cloudflare_ips_config.get("staleWhileRevalidateSeconds", DEFAULT_CLOUDFLARE_IPS_STALE_SECONDS))
+        return self.__cloudflare_ips[ip_version]
 
     def get_groupone_ipv4(self):
         """
@@ -87,83 +170,153 @@ class ServerListHandler():
         groupone_ips += "2a02:2350:4:200::/55\n"  # ipv6 k8spods CPH3
         return groupone_ips
 
+    def get_wp_rocket_ips_snapshot(self):
+        """
+            Returns the snapshot of the lists of IPs used by WP Rocket in all their representations.
+            The representations are rendered again only when one of the source lists changed.
+            Raises IpSourceUnavailableError if a source list cannot be retrieved, so that no incomplete list is served.
+        """
+        sources = {
+            "cloudflare_ipv4": self.__get_cloudflare_ip_list('v4'),
+            "cloudflare_ipv6": self.__get_cloudflare_ip_list('v6'),
+            "groupone_ipv4": self.get_groupone_ipv4(),
+            "groupone_ipv6": self.get_groupone_ipv6()
+        }
+        version = hashlib.sha256(json.dumps(sources, sort_keys=True).encode('utf-8')).hexdigest()[:32]
+        with self.__snapshot_lock:
+            if self.__snapshot is None or self.__snapshot.version != version:
+                source_networks = self.__get_wp_rocket_ip_networks(sources)
+                ipv4_networks = IpAddress.collapse_ip_networks(source_networks["cloudflare"]["ipv4"]
+                                                               + source_networks["groupone"]["ipv4"])
+                ipv6_networks = IpAddress.collapse_ip_networks(source_networks["cloudflare"]["ipv6"]
+                                                               + source_networks["groupone"]["ipv6"])
+                self.__snapshot = IpListSnapshot(version, self.__render_wp_rocket_ips_human_readable(sources),
+                                                 IpAddress.format_ip_networks(ipv4_networks),
+                                                 IpAddress.format_ip_networks(ipv6_networks),
+                                                 IpRangeIndex(ipv4_networks, ipv6_networks),
+                                                 self.__render_wp_rocket_ips_structured(source_networks))
+            return self.__snapshot
+
+    def check_wp_rocket_ips(self, ips):
+        """
+            Checks whether each IP address of the list is used by WP Rocket.
+            Returns a list with, for each address, the result of IpRangeIndex.lookup.
+        """
+        ip_range_index = self.get_wp_rocket_ips_snapshot().ip_range_index
+        return [ip_range_index.lookup(ip) for ip in ips]
+
     def generate_wp_rocket_ips_human_readable(self):
         """
             Generates a text list of all IPs used by WP Rocket, human readable
         """
+        return self.get_wp_rocket_ips_snapshot().human_readable
+
+    def generate_wp_rocket_ipv4_machine_readable(self):
+        """
+            List all IPv4 used for WP Rocket, machine readable with one IP per line and no text
+        """
+        return self.get_wp_rocket_ips_snapshot().ipv4
+
+    def generate_wp_rocket_ipv6_machine_readable(self):
+        """
+            List all IPv6 used for WP Rocket, machine readable with one IP per line and no text
+        """
+        return self.get_wp_rocket_ips_snapshot().ipv6
+
+    def __render_wp_rocket_ips_human_readable(self, sources):
+        """
+            Renders the text list of all IPs used by WP Rocket, human readable, from the source lists
+        """
         text = "List of IPs used for WP Rocket:\n\n"
 
         text += "License validation/activation, update check, plugin information:\n"
         # Defined in https://gitlab.one.com/systems/group.one-authdns/-/blob/main/octodns/wp-rocket.me.yaml?ref_type=heads
         text += "https://wp-rocket.me\n"
-        text += self.get_cloudflare_proxy_ipv4()
-        text += self.get_cloudflare_proxy_ipv6()
+        text += sources["cloudflare_ipv4"]
+        text += sources["cloudflare_ipv6"]
         text += "\n"
 
         text += "Load CSS Asynchronously:\n"
         # Defined in https://gitlab.one.com/systems/group.one-authdns/-/blob/main/octodns/wp-rocket.me.yaml?ref_type=heads
         text += "https://cpcss.wp-rocket.me\n"
-        text += self.get_groupone_ipv4()
-        text += self.get_groupone_ipv6()
+        text += sources["groupone_ipv4"]
+        text += sources["groupone_ipv6"]
         text += "\n"
 
         text += "Remove Unused CSS:\n"
         # SaaS CNAME in https://gitlab.one.com/systems/group.one-authdns/-/blob/main/octodns/wp-rocket.me.yaml?ref_type=heads
-        text += self.get_groupone_ipv4()
-        text += self.get_groupone_ipv6()
+        text += sources["groupone_ipv4"]
+        text += sources["groupone_ipv6"]
         # SaaS User Agents
         text += "User Agents:\n"
-        # pylint: disable-next=line-too-long
-        text += "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/131.0.0.0 Safari/537.36 (compatible; WP-Rocket-SaaS/1.0; +https://wp-rocket.me/bot/)\n" # noqa
-        text += "\n"
-
-        # pylint: disable-next=line-too-long
-        text += "Mozilla/5.0 (Linux; Android 13; Pixel 5) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/131.0.0.0 Mobile Safari/537.36 (compatible; WP-Rocket-SaaS/1.0; +https://wp-rocket.me/bot/)\n" # noqa
-        text += "\n"
+        for user_agent in WP_ROCKET_SAAS_USER_AGENTS:
+            text += user_agent + "\n"
+            text += "\n"
 
         text += "Dynamic exclusions and inclusions:\n"
         # Defined in https://gitlab.one.com/systems/group.one-authdns/-/blob/main/octodns/wp-rocket.me.yaml?ref_type=heads
         text += "https://b.rucss.wp-rocket.me\n"
-        text += self.get_groupone_ipv4()
-        text += self.get_groupone_ipv6()
+        text += sources["groupone_ipv4"]
+        text += sources["groupone_ipv6"]
         text += "\n"
 
         text += "RocketCDN subscription:\n"
         text += "https://rocketcdn.me/api/\n"
-        text += self.get_groupone_ipv4()
-        text += self.get_groupone_ipv6()
+        text += sources["groupone_ipv4"]
+        text += sources["groupone_ipv6"]
 
         return text
 
-    def generate_wp_rocket_ipv4_machine_readable(self):
+    def __get_wp_rocket_ip_networks(self, sources):
         """
-            List all IPv4 used for WP Rocket, machine readable with one IP per line and no text
+            Returns the IPv4 and IPv6 networks of each source list, as {source: {family: networks}}.
+            Overlapping and adjacent ranges are merged, and the lists are sorted so that they only change when the
+            sources change. Raises IpSourceUnavailableError if a source list contains lines that are not IPs.
         """
-        text = ""
-        # CloudFlare proxy
-        text += self.get_cloudflare_proxy_ipv4()
-        # group.One
-        text += self.get_groupone_ipv4()
-
-        deduplicated_text = Duplication.remove_duplicated_lines(text)
-        return deduplicated_text
+        source_networks = {}
+        for source in ("cloudflare", "groupone"):
+            ipv4_networks, ipv6_networks, invalid_lines = IpAddress.parse_ip_networks(sources[source + "_ipv4"]
+                                                                                      + sources[source + "_ipv6"])
+            if invalid_lines:
+                raise IpSourceUnavailableError(f"Invalid lines in the {source} list: {', '.join(invalid_lines[:5])}")
+            source_networks[source] = {
+                "ipv4": IpAddress.collapse_ip_networks(ipv4_networks),
+                "ipv6": IpAddress.collapse_ip_networks(ipv6_networks)
+            }
+        return source_networks
 
-    def generate_wp_rocket_ipv6_machine_readable(self):
+    def __render_wp_rocket_ips_structured(self, source_networks):
         """
-            List all IPv6 used for WP Rocket, machine readable with one IP per line and no text
+            Renders the IPs used by WP Rocket grouped by service, source and family, in the JSON and CSV formats.
+            Returns a dict (representation, format) -> rendered text, each representation keeping only its families.
         """
-        text = ""
-        # CloudFlare proxy
-        text += self.get_cloudflare_proxy_ipv6()
-        # group.One
-        text += self.get_groupone_ipv6()
+        source_ips = {source: {family: IpAddress.format_ip_networks(networks).splitlines()
+                               for family, networks in families.items()}
+                      for source, families in source_networks.items()}
 
-        deduplicated_text = Duplication.remove_duplicated_lines(text)
-        return deduplicated_text
+        renderings = {}
+        for representation, families in IP_LIST_FAMILIES.items():
+            services = []
+            csv_text = io.StringIO()
+            csv_writer = csv.writer(csv_text, lineterminator="\n")
+            csv_writer.writerow(["service", "url", "source", "family", "ip"])
+            for service, url, source in WP_ROCKET_SERVICES:
+                services.append({"service": service, "url": url, "source": source,
+                                 "ips": {family: source_ips[source][family] for family in families}})
+                if service == "rucss":
+                    services[-1]["userAgents"] = WP_ROCKET_SAAS_USER_AGENTS
+                for family in families:
+                    csv_writer.writerows([service, url or "", source, family, ip] for ip in source_ips[source][family])
+            renderings[(representation, "json")] = json.dumps({"services": services})
+            renderings[(representation, "csv")] = csv_text.getvalue()
+        return renderings
 
     def send_wp_rocket_ips_to_slack(self, app_context, slack_user):
         """
-            List all IPs used for WP Rocket and sends it in a Slack DM
+            List all IPs used for WP Rocket and sends it in a Slack DM, or the error if a source list is unavailable
         """
-        text = self.generate_wp_rocket_ips_human_readable()
+        try:
+            text = self.generate_wp_rocket_ips_human_readable()
+        except IpSourceUnavailableError as error:
+            text = f"Error: {error}"
         self.slack_message_factory.post_message(app_context, slack_user, text)
@@ -3,7 +3,6 @@
 """
 
 
-from threading import Thread
 from flask import current_app
 from sources.factories.SlackModalFactory import SlackModalFactory
 from sources.handlers.ServerListHandler import ServerListHandler
@@ -25,6 +24,7 @@ class SlackCommandHandler():
         """
             Method called to process a request of type "command". It identifies the callback assigned to the Slack command
             and routes the request according to it to the right callback method.
+            It runs in a job of the worker pool submitted by SlackDispatchHandler, so the callbacks do their work directly.
         """
 
         # Retrieve the shortcut callback
@@ -43,15 +43,12 @@ class SlackCommandHandler():
     def dev_team_escalation_command_callback(self, payload_json):
         """
             Callback method to process the Slack command "/dev-team-escalation"
-            A modal should be opened for the user. A dedicated thread is started to create this modal.
+            A modal is opened for the user.
         """
         trigger_id = payload_json['trigger_id']
 
-        current_app.logger.info("dev_team_escalation_command_callback: Starting processing thread...")
-        thread = Thread(
-            target=self.slack_modal_factory.dev_team_escalation_modal, kwargs={
-                "app_context": current_app.app_context(), "trigger_id": trigger_id})
-        thread.start()
+        current_app.logger.info("dev_team_escalation_command_callback: Opening modal...")
+        self.slack_modal_factory.dev_team_escalation_modal(current_app.app_context(), trigger_id)
 
     def wp_rocket_ips_command_callback(self, payload_json):
         """
@@ -59,11 +56,8 @@ class SlackCommandHandler():
         """
         initiator = payload_json["user_id"]
 
-        current_app.logger.info("wp_rocket_ips_command_callback: Starting processing thread...")
-        thread = Thread(
-            target=self.server_list_handler.send_wp_rocket_ips_to_slack, kwargs={
-                "app_context": current_app.app_context(), "slack_user": initiator})
-        thread.start()
+        current_app.logger.info("wp_rocket_ips_command_callback: Sending IPs...")
+        self.server_list_handler.send_wp_rocket_ips_to_slack(current_app.app_context(), initiator)
 
     def deploy_manager_command_callback(self, payload_json):
         """
@@ -71,8 +65,5 @@ class SlackCommandHandler():
         """
         trigger_id = payload_json['trigger_id']
 
-        current_app.logger.info("deploy_manager_command_callback: Starting processing thread...")
-        thread = Thread(
-            target=self.slack_modal_factory.deploy_manager_modal, kwargs={
-                "app_context": current_app.app_context(), "trigger_id": trigger_id})
-        thread.start()
+        current_app.logger.info("deploy_manager_command_callback: Opening modal...")
+        self.slack_modal_factory.deploy_manager_modal(current_app.app_context(), trigger_id)
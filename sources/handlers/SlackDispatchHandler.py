@@ -0,0 +1,48 @@
+"""
+    This module defines the handler deferring the processing of Slack requests to the worker pool.
+"""
+
+from flask import current_app
+from sources.factories.SlackMessageFactory import SlackMessageFactory
+from sources.utils.WorkerPool import WorkerPool
+
+
+class SlackDispatchHandler():
+    """
+        Class running the processing of Slack requests in the worker pool, so that listeners can acknowledge them
+        right after the signature validation and the payload parsing.
+        Results and errors of the processing are posted back to the user through the response_url of the payload,
+        when there is one. Otherwise, errors are only logged.
+    """
+
+    def __init__(self):
+        """
+            The handler instanciates the objects it needed to complete the processing of the request.
+        """
+        self.slack_message_factory = SlackMessageFactory()
+        self.worker_pool = WorkerPool.get_instance()
+
+    def dispatch(self, job_type, process, payload_json):
+        """
+            Submits process(payload_json) to the worker pool. Must be called within the Flask app context.
+            Raises WorkerPoolSaturatedError if the worker pool does not accept the job.
+        """
+        self.worker_pool.submit(job_type, self.process_deferred, app_context=current_app.app_context(),
+                                process=process, payload_json=payload_json)
+
+    def process_deferred(self, app_context, process, payload_json):
+        """
+            Runs the processing of a Slack request in a worker thread.
+            A processing result with a "text" is sent to the response_url; errors are reported to the user the same way,
+            then raised again to be logged by the worker pool.
+        """
+        app_context.push()  # The handler runs in a dedicated thread, so Flask app context must be applied.
+        response_url = payload_json.get('response_url')
+        try:
+            result = process(payload_json)
+        except Exception as error:
+            if response_url:
+                self.slack_message_factory.post_response(response_url, f"Sorry, your request failed: {error}")
+            raise
+        if response_url and isinstance(result, dict) and result.get('text'):
+            self.slack_message_factory.post_response(response_url, result['text'])
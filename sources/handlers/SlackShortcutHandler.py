@@ -3,7 +3,6 @@
 """
 
 
-from threading import Thread
 from flask import current_app
 from sources.factories.SlackModalFactory import SlackModalFactory
 
@@ -23,6 +22,7 @@ class SlackShortcutHandler():
         """
             Method called to process a request of type "shortcut". It identifies the callback assigned to the Slack shortcut
             and routes the request according to it to the right callback method.
+            It runs in a job of the worker pool submitted by SlackDispatchHandler, so the callbacks do their work directly.
         """
 
         # Retrieve the shortcut callback
@@ -38,11 +38,8 @@ class SlackShortcutHandler():
     def create_github_task_general_shortcut_callback(self, payload_json):
         """
             Callback method to process the Slack shortcut "github_task_general_shortcut"
-            A modal should be opened for the user. A dedicated thread is started to create this modal.
+            A modal is opened for the user.
         """
         trigger_id = payload_json['trigger_id']
 
-        thread = Thread(
-            target=self.slack_modal_factory.create_github_task_modal, kwargs={
-                "app_context": current_app.app_context(), "trigger_id": trigger_id})
-        thread.start()
+        self.slack_modal_factory.create_github_task_modal(current_app.app_context(), trigger_id)
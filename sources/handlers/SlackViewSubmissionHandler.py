@@ -2,12 +2,16 @@
     This module define the handler for Slack view submission.
 """
 
-from threading import Thread
+from dataclasses import asdict
 from flask import current_app
 from sources.handlers.GithubTaskHandler import GithubTaskHandler
 from sources.handlers.DeployHandler import DeployHandler
+from sources.models.CreatedGithubTaskParam import CreatedGithubTaskParam
 from sources.models.InitGithubTaskParam import InitGithubTaskParam
 from sources.models.DeployHandlerParam import DeployHandlerParam
+from sources.utils.JobJournal import JobJournal
+from sources.utils.SlackRateLimiter import SlackRateLimitedError
+from sources.utils.WorkerPool import WorkerPool
 
 
 class SlackViewSubmissionHandler():
@@ -21,6 +25,9 @@ class SlackViewSubmissionHandler():
         """
         self.github_task_handler = GithubTaskHandler()
         self.deployment_handler = DeployHandler()
+        self.worker_pool = WorkerPool.get_instance()
+        self.job_journal = JobJournal.get_instance()
+        self.job_journal.register_runner('github_task_init', self.init_github_task_job)
 
     def process(self, payload_json):
         """
@@ -44,13 +51,12 @@ class SlackViewSubmissionHandler():
     def create_github_task_modal_submit_callback(self, payload_json):
         """
             Callback method to process a submitted modal "Create GitHub Task".
-            The parameters of the task are extracted from the modal payload. A thread is started to generate the Github task.
+            The parameters of the task are extracted from the modal payload.
+            A journaled job is submitted to generate the Github task.
         """
         task_params = self.create_github_task_modal_retrieve_params(payload_json)
 
-        thread = Thread(target=self.github_task_handler.init_github_task, kwargs={
-            "app_context": current_app.app_context(), "task_params": task_params})
-        thread.start()
+        self.job_journal.submit(current_app.app_context(), 'github_task_init', asdict(task_params))
 
     def create_github_task_modal_retrieve_params(self, payload_json):
         """
@@ -92,12 +98,11 @@ class SlackViewSubmissionHandler():
     def dev_team_escalation_modal_submit_callback(self, payload_json):
         """
             Callback method to process a submitted modal "Create GitHub Task".
-            The parameters of the task are extracted from the modal payload. A thread is started to generate the Github task.
+            The parameters of the task are extracted from the modal payload.
+            A journaled job is submitted to generate the Github task.
         """
         task_params = self.dev_team_escalation_modal_retrieve_params(payload_json)
-        thread = Thread(target=self.github_task_handler.init_github_task, kwargs={
-            "app_context": current_app.app_context(), "task_params": task_params})
-        thread.start()
+        self.job_journal.submit(current_app.app_context(), 'github_task_init', asdict(task_params))
 
     def dev_team_escalation_modal_retrieve_params(self, payload_json):
         """
@@ -133,15 +138,35 @@ class SlackViewSubmissionHandler():
 
         return task_params
 
+    def init_github_task_job(self, app_context, project_item=None, **params):
+        """
+            Runner of the journaled github_task_init jobs: rebuilds the task parameters from the journal.
+            The created task is stored in the journal before the notifications, so that a replayed job does not
+            create it again. If the Slack rate limit delays the first notification, the job is submitted again after
+            the wait instead of holding the worker.
+        """
+        try:
+            self.github_task_handler.init_github_task(app_context, InitGithubTaskParam(**params),
+                                                      CreatedGithubTaskParam(**project_item) if project_item else None,
+                                                      self.__checkpoint_created_task)
+        except SlackRateLimitedError as error:
+            self.job_journal.resubmit(app_context, delay=error.wait)
+
+    def __checkpoint_created_task(self, project_item):
+        """
+            Stores the task created by the running github_task_init job in the journal.
+        """
+        self.job_journal.checkpoint(project_item=asdict(project_item))
+
     def deploy_manager_submit_callback(self, payload_json):
         """
             Callback method to process a submitted modal "Deployment manager".
-            The parameters of the task are extracted from the modal payload. A thread is started to deploy the app.
+            The parameters of the task are extracted from the modal payload.
+            A job is submitted to the worker pool to deploy the app.
         """
         task_params = self.deploy_manager_modal_retrieve_params(payload_json)
-        thread = Thread(target=self.deployment_handler.deploy_commit, kwargs={
-            "app_context": current_app.app_context(), "task_params": task_params})
-        thread.start()
+        self.worker_pool.submit('deploy', self.deployment_handler.deploy_commit,
+                                app_context=current_app.app_context(), task_params=task_params)
 
     def deploy_manager_modal_retrieve_params(self, payload_json):
         """
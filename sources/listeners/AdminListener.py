@@ -0,0 +1,74 @@
+"""
+    This module defines the endpoint handler (called listener) for the administration endpoints.
+"""
+from flask import request, current_app
+from sources.factories.GithubGQLCallFactory import GithubGQLCallFactory
+from sources.utils import Security
+from sources.utils.ConfigRegistry import ConfigRegistry
+from sources.utils.Profiler import Profiler
+import sources.utils.Constants as cst
+
+
+class AdminListener():
+    """
+        Class to define the administration endpoints handler.
+        Requests must carry the TBTT_ADMIN_TOKEN environment variable as bearer token.
+        If the variable is not set, the administration endpoints are disabled.
+    """
+
+    def __check_authorization(self):
+        """
+            Returns an error response if the request is not authorized, None otherwise.
+        """
+        admin_token = current_app.config.get(cst.APP_CONFIG_TOKEN_ADMIN_TOKEN)
+        if not admin_token:
+            return 'Administration endpoints are disabled.', 403
+        if not Security.validate_bearer_token(request, admin_token):
+            return 'Wrong admin token.', 401
+        return None
+
+    def reload_config(self):
+        """
+            Reloads the configuration files. If they are invalid, the current configuration is kept.
+        """
+        error_response = self.__check_authorization()
+        if error_response is not None:
+            return error_response
+        try:
+            reloaded = ConfigRegistry.reload()
+        except (ValueError, OSError) as error:
+            return {"error": str(error)}, 400
+        return {"reloaded": reloaded}, 200
+
+    def invalidate_sprint_cache(self):
+        """
+            Drops the cached sprints of the GitHub project, for instance after the sprints were edited on GitHub.
+        """
+        error_response = self.__check_authorization()
+        if error_response is not None:
+            return error_response
+        GithubGQLCallFactory.invalidate_sprint_cache()
+        return {"invalidated": ["sprints"]}, 200
+
+    def get_profiling(self):
+        """
+            Returns the status of the profiler.
+        """
+        error_response = self.__check_authorization()
+        if error_response is not None:
+            return error_response
+        return Profiler.get_instance().get_status(), 200
+
+    def set_profiling(self):
+        """
+            Enables or disables the profiling of all requests and jobs, from the "enabled" boolean of the JSON body.
+        """
+        error_response = self.__check_authorization()
+        if error_response is not None:
+            return error_response
+        body = request.get_json(silent=True)
+        if not isinstance(body, dict) or not isinstance(body.get("enabled"), bool):
+            return {"error": "The body must be a JSON object with an enabled boolean."}, 400
+        profiler = Profiler.get_instance()
+        profiler.set_enabled(body["enabled"])
+        return profiler.get_status(), 200
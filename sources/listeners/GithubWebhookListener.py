@@ -6,6 +6,7 @@ from flask import request, current_app
 from sources.handlers.GithubWebhookHandler import GithubWebhookHandler
 from sources.utils import Security
 import sources.utils.Constants as cst
+from sources.utils.WorkerPool import WorkerPoolSaturatedError
 
 
 class GithubWebhookListener():
@@ -29,7 +30,7 @@ class GithubWebhookListener():
             self.__github_access_token = current_app.config[cst.APP_CONFIG_TOKEN_GITHUB_WEBHOOK_SECRET]
         return self.__github_access_token
 
-    def __call__(self):
+    def __call__(self):  # pylint: disable=too-many-return-statements
         """
             Method called to process a request on the registered endpoint.
             It is subject to signed authentication.
@@ -47,7 +48,7 @@ class GithubWebhookListener():
         # Route the request to the correct handler
         response_payload = {}
         try:
-            response_payload = self.github_webhook_handler.process(payload_json)
+            response_payload = self.github_webhook_handler.process(payload_json, request.headers.get('X-GitHub-Delivery'))
         # pylint: disable=R0801
         except ValueError as error:
             return str(error), 500
@@ -55,6 +56,8 @@ class GithubWebhookListener():
             return str(error), 500
         except NotImplementedError as error:
             return str(error), 501
+        except WorkerPoolSaturatedError as error:
+            return str(error), 503
         # pylint: disable-next=broad-exception-caught
         except Exception as error:
             return str(error), 500
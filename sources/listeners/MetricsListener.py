@@ -0,0 +1,79 @@
+"""
+    This module defines the endpoint handler (called listener) for the metrics endpoint.
+"""
+import threading
+from flask import make_response
+from sources.utils.GithubRateLimiter import GithubRateLimiter
+from sources.utils.Metrics import Metrics, METRIC_TYPE_COUNTER, METRIC_TYPE_GAUGE
+from sources.utils.SlackRateLimiter import SlackRateLimiter
+from sources.utils.WorkerPool import WorkerPool
+
+SLACK_RATE_LIMITER_COUNTERS = {
+    "calls": ("tbtt_slack_api_calls_total", "Calls to the Slack Web API."),
+    "delayed": ("tbtt_slack_api_delayed_calls_total", "Calls to the Slack Web API delayed by the rate limiter."),
+    "delay_seconds": ("tbtt_slack_api_delay_seconds_total", "Time the calls to the Slack Web API were delayed."),
+    "rate_limited": ("tbtt_slack_api_rate_limited_total", "Calls to the Slack Web API answered with a 429."),
+    "deferred": ("tbtt_slack_api_deferred_calls_total", "Calls to the Slack Web API deferred to a new job.")
+}
+
+GITHUB_RATE_LIMIT_METRICS = {
+    "limit": ("tbtt_github_rate_limit", METRIC_TYPE_GAUGE, "GitHub GraphQL API rate limit, in points per hour."),
+    "remaining": ("tbtt_github_rate_limit_remaining", METRIC_TYPE_GAUGE, "GitHub GraphQL API points remaining."),
+    "reset_at": ("tbtt_github_rate_limit_reset_timestamp_seconds", METRIC_TYPE_GAUGE,
+                 "Time the GitHub GraphQL API points are reset."),
+    "throttled": ("tbtt_github_throttled_requests_total", METRIC_TYPE_COUNTER,
+                  "GitHub GraphQL requests delayed by the rate limiter."),
+    "throttle_seconds": ("tbtt_github_throttle_seconds_total", METRIC_TYPE_COUNTER,
+                         "Time the GitHub GraphQL requests were delayed."),
+    "secondary_rate_limited": ("tbtt_github_secondary_rate_limited_total", METRIC_TYPE_COUNTER,
+                               "GitHub GraphQL responses asking to retry later.")
+}
+
+
+class MetricsListener():
+    """
+        Class to define the metrics endpoint handler. It is callable and called when the right url is used.
+        It returns the metrics of the app in the Prometheus text exposition format.
+    """
+
+    def __call__(self):
+        """
+            Renders the recorded metrics, and the current state of the worker pool and the rate limiters.
+        """
+        response = make_response(Metrics.get_instance().render(self.collect()), 200)
+        response.content_type = 'text/plain; version=0.0.4; charset=utf-8'
+        return response
+
+    def collect(self):
+        """
+            Returns the metrics read from the components, as (name, type, documentation, labels, value) tuples.
+        """
+        collected = [("tbtt_threads", METRIC_TYPE_GAUGE, "Number of threads of the app.", {}, threading.active_count())]
+        collected.extend(self.__collect_worker_pool())
+        for method, stats in SlackRateLimiter.get_instance().get_stats().items():
+            for key, (name, documentation) in SLACK_RATE_LIMITER_COUNTERS.items():
+                collected.append((name, METRIC_TYPE_COUNTER, documentation, {"method": method}, stats[key]))
+        github_stats = GithubRateLimiter.get_instance().get_stats()
+        for key, (name, metric_type, documentation) in GITHUB_RATE_LIMIT_METRICS.items():
+            if github_stats[key] is not None:
+                collected.append((name, metric_type, documentation, {}, github_stats[key]))
+        return collected
+
+    def __collect_worker_pool(self):
+        """
+            Returns the sizing, queue length and in-flight jobs of the worker pool.
+        """
+        stats = WorkerPool.get_instance().get_stats()
+        collected = [
+            ("tbtt_worker_pool_max_workers", METRIC_TYPE_GAUGE, "Number of worker threads.", {}, stats["max_workers"]),
+            ("tbtt_worker_pool_queue_depth", METRIC_TYPE_GAUGE, "Capacity of the job queue.", {}, stats["queue_depth"]),
+            ("tbtt_worker_pool_queue_length", METRIC_TYPE_GAUGE, "Jobs waiting for a worker.", {}, stats["queue_length"]),
+            ("tbtt_worker_pool_active_workers", METRIC_TYPE_GAUGE, "Workers running a job.", {}, stats["in_flight"])
+        ]
+        for job_type, count in stats["in_flight_by_type"].items():
+            collected.append(("tbtt_worker_pool_in_flight_jobs", METRIC_TYPE_GAUGE, "Jobs running, per job type.",
+                              {"job_type": job_type}, count))
+        for job_type, count in stats["held_back_by_type"].items():
+            collected.append(("tbtt_worker_pool_held_back_jobs", METRIC_TYPE_GAUGE,
+                              "Jobs waiting for their job type limit, per job type.", {"job_type": job_type}, count))
+        return collected
@@ -5,6 +5,8 @@
 from flask_slacksigauth import slack_sig_auth
 from flask import request
 from sources.handlers.SlackCommandHandler import SlackCommandHandler
+from sources.handlers.SlackDispatchHandler import SlackDispatchHandler
+from sources.utils.WorkerPool import WorkerPoolSaturatedError
 
 
 class SlackCommandListener():
@@ -17,23 +19,25 @@ class SlackCommandListener():
             The listener instanciates the handlers it will pass the request to so that it is processed.
         """
         self.slack_command_handler = SlackCommandHandler()
+        self.slack_dispatch_handler = SlackDispatchHandler()
 
     @slack_sig_auth
     def __call__(self):
         """
             Method called to process a request on the registered endpoint.
             It is subject to signed authentication.
-            The method extracts the payload and route it to the correct handler.
+            The method extracts the payload and acknowledges it right away, the command being processed by the worker
+            pool. Processing errors are sent to the user through the response_url of the command.
             This method catches errors and manages their mapping to HTTP error codes.
         """
 
         # Retrieve the payload of the POST request
         payload_json = request.form.to_dict()
 
-        # Route the request to the correct handler
+        # Defer the routing and processing of the command
         response_payload = {}
         try:
-            response_payload = self.slack_command_handler.process(payload_json)
+            self.slack_dispatch_handler.dispatch('slack_command', self.slack_command_handler.process, payload_json)
         # pylint: disable=R0801
         except ValueError as error:
             return str(error), 500
@@ -41,6 +45,8 @@ class SlackCommandListener():
             return str(error), 500
         except NotImplementedError as error:
             return str(error), 501
+        except WorkerPoolSaturatedError as error:
+            return str(error), 503
         # pylint: disable-next=broad-exception-caught
         except Exception as error:
             return str(error), 500
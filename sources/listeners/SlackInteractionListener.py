@@ -9,6 +9,8 @@ from flask import request, current_app
 from sources.handlers.SlackShortcutHandler import SlackShortcutHandler
 from sources.handlers.SlackViewSubmissionHandler import SlackViewSubmissionHandler
 from sources.handlers.SlackBlockActionHandler import SlackBlockActionHandler
+from sources.handlers.SlackDispatchHandler import SlackDispatchHandler
+from sources.utils.WorkerPool import WorkerPoolSaturatedError
 
 
 class SlackInteractionListener():
@@ -23,6 +25,7 @@ class SlackInteractionListener():
         self.slack_shortcut_handler = SlackShortcutHandler()
         self.slack_view_submission_handler = SlackViewSubmissionHandler()
         self.slack_block_action_handler = SlackBlockActionHandler()
+        self.slack_dispatch_handler = SlackDispatchHandler()
 
     @slack_sig_auth
     def __call__(self):
@@ -30,6 +33,8 @@ class SlackInteractionListener():
             Method called to process a request on the registered endpoint.
             It is subject to signed authentication.
             The method extracts the payload and route it to the correct handler.
+            View submissions are processed right away, as their response drives the modal. Shortcuts and block actions
+            are acknowledged right away and processed by the worker pool.
             This method catches errors and manages their mapping to HTTP error codes.
         """
 
@@ -44,11 +49,10 @@ class SlackInteractionListener():
                 current_app.logger.info("SlackInteractionListener: Processing view submission...")
                 response_payload = self.slack_view_submission_handler.process(payload_json)
             elif 'shortcut' == payload_type:
-                current_app.logger.info("SlackInteractionListener: Processing shortcut submission...")
-                response_payload = self.slack_shortcut_handler.process(payload_json)
+                self.slack_dispatch_handler.dispatch('slack_shortcut', self.slack_shortcut_handler.process, payload_json)
             elif 'block_actions' == payload_type:
-                current_app.logger.info("SlackInteractionListener: Processing block action submission...")
-                response_payload = self.slack_block_action_handler.process(payload_json)
+                self.slack_dispatch_handler.dispatch('slack_block_action', self.slack_block_action_handler.process,
+                                                     payload_json)
             else:
                 raise ValueError('Unknown payload type.')
         # pylint: disable=R0801
@@ -58,6 +62,8 @@ class SlackInteractionListener():
             return str(error), 500
         except NotImplementedError as error:
             return str(error), 501
+        except WorkerPoolSaturatedError as error:
+            return str(error), 503
         # pylint: disable-next=broad-exception-caught
         except Exception as error:
             return str(error), 500
@@ -2,12 +2,27 @@
     This module defines the endpoint handler (called listener) for the Support team endpoints.
 """
 
-from sources.handlers.ServerListHandler import ServerListHandler
+from flask import request, make_response
+from sources.handlers.ServerListHandler import IpSourceUnavailableError, ServerListHandler
+from sources.utils.ConfigRegistry import ConfigRegistry
+
+DEFAULT_CACHE_MAX_AGE_SECONDS = 300
+DEFAULT_MAX_BULK_CHECK_IPS = 10000
+
+OUTPUT_FORMAT_MIMETYPES = {
+    "json": "application/json",
+    "csv": "text/csv"
+}
 
 
 class SupportListener():
     """
         Class to define the support endpoints handler. It is callable and called when the right url is used.
+        Responses carry an ETag and a Cache-Control header, and requests with a matching If-None-Match get a 304.
+        If a source list of IPs is unavailable, the lists and checks return a 503, without these headers so that it is
+        not cached.
+        The IP lists are returned as text by default, or in the format given by the "format" query parameter:
+        json or csv.
     """
 
     def __init__(self):
@@ -15,24 +30,91 @@ class SupportListener():
             The listener instanciates the handlers it will pass the request to so that it is processed.
         """
         self.server_list_handler = ServerListHandler()
+        self.cache_max_age = DEFAULT_CACHE_MAX_AGE_SECONDS
+        self.max_bulk_check_ips = DEFAULT_MAX_BULK_CHECK_IPS
+        self.__reload_config()
+        ConfigRegistry.add_reload_listener(self.__reload_config)
+
+    def __reload_config(self):
+        """
+            Reads the "supportEndpoints" section of config/app.json again from the registry, after a reload.
+        """
+        support_config = ConfigRegistry.get("app").get("supportEndpoints", {})
+        self.cache_max_age = support_config.get("cacheMaxAgeSeconds", DEFAULT_CACHE_MAX_AGE_SECONDS)
+        self.max_bulk_check_ips = support_config.get("maxBulkCheckIps", DEFAULT_MAX_BULK_CHECK_IPS)
+
+    def __get_snapshot_response(self, representation):
+        """
+            Builds the response serving a representation of the current IP list snapshot, or a 304 if the client
+            already has it.
+        """
+        output_format = request.args.get('format', 'text')
+        if output_format != 'text' and output_format not in OUTPUT_FORMAT_MIMETYPES:
+            return {"error": f"Unknown format {output_format}. Available formats: text, json, csv."}, 400
+        try:
+            snapshot = self.server_list_handler.get_wp_rocket_ips_snapshot()
+        except IpSourceUnavailableError as error:
+            return {"error": str(error)}, 503
+        etag = snapshot.get_etag(representation, output_format)
+        if request.if_none_match.contains(etag):
+            response = make_response('', 304)
+        else:
+            response = make_response(snapshot.get_rendering(representation, output_format), 200)
+            if output_format in OUTPUT_FORMAT_MIMETYPES:
+                response.mimetype = OUTPUT_FORMAT_MIMETYPES[output_format]
+        response.set_etag(etag)
+        response.cache_control.public = True
+        response.cache_control.max_age = self.cache_max_age
+        return response
 
     def get_wprocket_ips_human_readable(self):
         """
             Method generating the list of IPs used by WP Rocket and returning it in a list as a string.
         """
-        response_payload = self.server_list_handler.generate_wp_rocket_ips_human_readable()
-        return response_payload, 200
+        return self.__get_snapshot_response("human_readable")
 
     def get_wprocket_ipv4_machine_readable(self):
         """
             Method generating the list of IPv4 used by WP Rocket and returning it as a machine readable string
         """
-        response_payload = self.server_list_handler.generate_wp_rocket_ipv4_machine_readable()
-        return response_payload, 200
+        return self.__get_snapshot_response("ipv4")
 
     def get_wprocket_ipv6_machine_readable(self):
         """
             Method generating the list of IPv4 used by WP Rocket and returning it as a machine readable string
         """
-        response_payload = self.server_list_handler.generate_wp_rocket_ipv6_machine_readable()
-        return response_payload, 200
+        return self.__get_snapshot_response("ipv6")
+
+    def check_wprocket_ip(self):
+        """
+            Method checking whether the IP address given as "ip" query parameter is used by WP Rocket.
+        """
+        ip_uut = request.args.get('ip', '').strip()
+        if not ip_uut:
+            return {"error": "Missing ip parameter."}, 400
+        try:
+            return self.server_list_handler.check_wp_rocket_ips([ip_uut])[0], 200
+        except IpSourceUnavailableError as error:
+            return {"error": str(error)}, 503
+
+    def check_wprocket_ips_bulk(self):
+        """
+            Method checking whether each IP address of the request body is used by WP Rocket.
+            The body is either a JSON object {"ips": [...]}, a JSON list, or plain text with one IP per line.
+        """
+        payload = request.get_json(silent=True)
+        if payload is None:
+            ips = request.get_data(as_text=True).splitlines()
+        elif isinstance(payload, dict):
+            ips = payload.get("ips")
+        else:
+            ips = payload
+        if not isinstance(ips, list) or not all(isinstance(ip, str) for ip in ips):
+            return {"error": "The body must be a list of IP addresses."}, 400
+        ips = [ip for ip in ips if ip.strip()]
+        if len(ips) > self.max_bulk_check_ips:
+            return {"error": f"At most {self.max_bulk_check_ips} IP addresses can be checked at once."}, 413
+        try:
+            return {"results": self.server_list_handler.check_wp_rocket_ips(ips)}, 200
+        except IpSourceUnavailableError as error:
+            return {"error": str(error)}, 503
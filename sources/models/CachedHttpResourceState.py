@@ -0,0 +1,18 @@
+"""
+    Defines a dataclass for the state of a CachedHttpResource
+"""
+
+from dataclasses import dataclass
+
+
+@dataclass
+class CachedHttpResourceState:
+    """
+        Dataclass for the last body fetched, its validators, when it was fetched or revalidated,
+        and whether a background refresh is pending
+    """
+    body: str = None
+    etag: str = None
+    last_modified: str = None
+    fetched_at: float = None
+    refreshing: bool = False
@@ -0,0 +1,40 @@
+"""
+    Defines a dataclass for the rendered lists of IPs used by WP Rocket
+"""
+
+from dataclasses import dataclass, field
+from sources.utils.IpRangeIndex import IpRangeIndex
+
+
+@dataclass(frozen=True)
+class IpListSnapshot:
+    """
+        Dataclass for the representations of the IPs used by WP Rocket, rendered from a given state of their sources.
+        version is a hash of the sources: it changes whenever one of the lists changes.
+        ip_range_index indexes the ranges of the lists, to check whether an IP is used by WP Rocket.
+        renderings holds the representations in the structured formats, by (representation, format).
+    """
+    version: str
+    human_readable: str
+    ipv4: str
+    ipv6: str
+    ip_range_index: IpRangeIndex = field(default=None, compare=False)
+    renderings: dict = field(default_factory=dict, compare=False)
+
+    def get_rendering(self, representation, output_format="text"):
+        """
+            Returns a representation ("human_readable", "ipv4" or "ipv6") of this snapshot in the output format
+            ("text", "json" or "csv"). Raises KeyError for unknown representations or formats.
+        """
+        if output_format == "text":
+            return getattr(self, representation)
+        return self.renderings[(representation, output_format)]
+
+    def get_etag(self, representation, output_format="text"):
+        """
+            Returns the entity tag of a representation ("human_readable", "ipv4" or "ipv6") of this snapshot,
+            in the output format.
+        """
+        if output_format == "text":
+            return f"{self.version}-{representation}"
+        return f"{self.version}-{representation}-{output_format}"
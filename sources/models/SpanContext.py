@@ -0,0 +1,14 @@
+"""
+    Defines a dataclass for the identifiers of a tracing span
+"""
+
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True)
+class SpanContext:
+    """
+        Dataclass for the ID of a span and the ID of the trace it belongs to
+    """
+    trace_id: str
+    span_id: str
@@ -0,0 +1,111 @@
+"""
+    This module defines an in-memory cache of a remote text resource, refreshed with conditional requests.
+"""
+import logging
+import threading
+import time
+from sources.models.CachedHttpResourceState import CachedHttpResourceState
+from sources.utils.Metrics import time_outbound_call
+from sources.utils.WorkerPool import WorkerPool, WorkerPoolSaturatedError
+
+logger = logging.getLogger(__name__)
+
+
+class UnexpectedStatusError(Exception):
+    """
+        Raised when the remote resource answers with a status code other than 200 or 304.
+    """
+    def __init__(self, url, status_code):
+        super().__init__(f"Unexpected status code {status_code} for {url}.")
+        self.status_code = status_code
+
+
+class CachedHttpResource():
+    """
+        Keeps the body of a remote resource in memory.
+        - Within ttl seconds after it was fetched, the cached body is returned without any request.
+        - Up to stale_ttl seconds more, the cached body is returned and refreshed by a background job.
+        - Afterwards, the resource is fetched again before returning.
+        Refreshes send the ETag and Last-Modified validators of the cached body, so that an unchanged resource is
+        answered with a 304 and only extends the cached body freshness.
+        If a refresh fails, the last body fetched successfully is returned. Errors are raised only when nothing was
+        ever fetched: requests exceptions, or UnexpectedStatusError.
+    """
+
+    def __init__(self, url, http_session, ttl, stale_ttl=0, worker_pool=None):  # pylint: disable=too-many-arguments
+        self.url = url
+        self.http_session = http_session
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.__worker_pool = worker_pool
+        self.__state = CachedHttpResourceState()
+        self.__lock = threading.Lock()
+
+    def get(self):
+        """
+            Returns the body of the resource, from memory whenever possible.
+        """
+        with self.__lock:
+            body = self.__state.body
+            age = None if self.__state.fetched_at is None else time.monotonic() - self.__state.fetched_at
+        if age is not None and age < self.ttl:
+            return body
+        if age is not None and age < self.ttl + self.stale_ttl:
+            self.__refresh_in_background()
+            return body
+        try:
+            return self.refresh()
+        except Exception as error:  # pylint: disable=broad-exception-caught
+            if body is None:
+                raise
+            logger.warning("CachedHttpResource: Refresh of %s failed, last known body returned. %s", self.url, error)
+            return body
+
+    def refresh(self):
+        """
+            Fetches the resource with a conditional request, stores it and returns the up-to-date body.
+        """
+        with self.__lock:
+            headers = {}
+            if self.__state.etag is not None:
+                headers['If-None-Match'] = self.__state.etag
+            if self.__state.last_modified is not None:
+                headers['If-Modified-Since'] = self.__state.last_modified
+        with time_outbound_call("http_resource", self.url):
+            response = self.http_session.get(self.url, headers=headers, timeout=5)
+        with self.__lock:
+            if response.status_code == 304 and self.__state.body is not None:
+                self.__state.fetched_at = time.monotonic()
+                return self.__state.body
+            if response.status_code != 200:
+                raise UnexpectedStatusError(self.url, response.status_code)
+            self.__state = CachedHttpResourceState(response.text, response.headers.get('ETag'),
+                                                   response.headers.get('Last-Modified'), time.monotonic(),
+                                                   self.__state.refreshing)
+            return self.__state.body
+
+    def __refresh_in_background(self):
+        """
+            Submits a refresh of the resource to the worker pool, unless one is already pending.
+        """
+        with self.__lock:
+            if self.__state.refreshing:
+                return
+            self.__state.refreshing = True
+        if self.__worker_pool is None:
+            self.__worker_pool = WorkerPool.get_instance()
+        try:
+            self.__worker_pool.submit('http_resource_refresh', self.__background_refresh)
+        except WorkerPoolSaturatedError:
+            with self.__lock:
+                self.__state.refreshing = False
+
+    def __background_refresh(self):
+        """
+            Refreshes the resource from a worker thread. On failure, the stale body keeps being served.
+        """
+        try:
+            self.refresh()
+        finally:
+            with self.__lock:
+                self.__state.refreshing = False
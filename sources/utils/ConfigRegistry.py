@@ -0,0 +1,243 @@
+"""
+    This module defines the registry loading the JSON configuration files of the app.
+"""
+import inspect
+import json
+import logging
+import threading
+import time
+import weakref
+from pathlib import Path
+from types import MappingProxyType
+
+CONFIG_DIR = Path(__file__).parent.parent.parent / "config"
+
+logger = logging.getLogger(__name__)
+
+# Expected keys of each configuration file: key -> (type, required)
+CONFIG_SCHEMAS = {
+    "app": {
+        "port": (int, True),
+        "warmUpGithubUserIds": (bool, False),
+        "configReload": (dict, False),
+        "cloudflareIps": (dict, False),
+        "supportEndpoints": (dict, False),
+        "slackRateLimits": (dict, False),
+        "githubRateLimit": (dict, False),
+        "githubWebhooks": (dict, False),
+        "escalationThreadIndex": (dict, False),
+        "jobJournal": (dict, False),
+        "tracing": (dict, False),
+        "profiling": (dict, False),
+        "workerPool": (dict, False)
+    },
+    "github": {
+        "projectId": (str, True),
+        "sprintFieldId": (str, True),
+        "sprintCacheMaxTtlSeconds": (int, False),
+        "assigneeList": (dict, True),
+        "statusFieldId": (str, True),
+        "initialStatusValue": (str, True),
+        "typeFieldId": (str, True),
+        "dev-team-escalationStatusValue": (str, True),
+        "board_views": (dict, True),
+        "repoNameToReadable": (dict, True)
+    },
+    "slack": {
+        "dev-team-escalation-channel": (str, True),
+        "engineering-service-team-channel": (str, True),
+        "release-channel": (str, True),
+        "ops-channel": (str, True),
+        "ops-deploy-channel": (str, True)
+    },
+    "apps": {
+        "appList": (dict, True),
+        "envList": (dict, True)
+    },
+    "notion": {
+        "release-note-db-id": (str, True)
+    }
+}
+
+
+def freeze(value):
+    """
+        Returns a read-only copy of a parsed JSON value: objects become MappingProxyType and arrays become tuples.
+    """
+    if isinstance(value, dict):
+        return MappingProxyType({key: freeze(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return tuple(freeze(item) for item in value)
+    return value
+
+
+def is_of_type(value, expected_type):
+    """
+        Returns True if a frozen JSON value has the expected type. Objects are checked with dict, and booleans are not
+        accepted as int.
+    """
+    if expected_type is dict:
+        return isinstance(value, MappingProxyType)
+    if isinstance(value, bool):
+        return expected_type is bool
+    return isinstance(value, expected_type)
+
+
+def check_configs(configs):
+    """
+        Checks the configurations, given as a dict name -> frozen content, against CONFIG_SCHEMAS.
+        Raises ValueError listing all the missing or invalid keys.
+    """
+    errors = []
+    for name, schema in CONFIG_SCHEMAS.items():
+        config = configs[name]
+        for key, (expected_type, required) in schema.items():
+            if key not in config:
+                if required:
+                    errors.append(f"{name}.json: missing key {key}")
+                continue
+            if not is_of_type(config[key], expected_type):
+                errors.append(f"{name}.json: {key} must be of type {expected_type.__name__}")
+    if errors:
+        raise ValueError("Invalid configuration: " + "; ".join(errors))
+
+
+class ConfigRegistry():
+    """
+        Loads each configuration file of the config folder once, and shares it as a read-only mapping
+        with all handlers, factories and utilities.
+        The configuration can be reloaded while the app runs: the files are read and validated again, then replace
+        the loaded ones at once, and the components notified through their reload listener refresh their derived data.
+    """
+    __configs = {}
+    __mtimes = {}
+    __listeners = []
+    __lock = threading.Lock()
+    __reload_lock = threading.Lock()
+    __watcher = None
+
+    @staticmethod
+    def __read(name):
+        """
+            Reads and freezes config/<name>.json. Returns its content and its modification time.
+        """
+        path = CONFIG_DIR / f"{name}.json"
+        mtime = path.stat().st_mtime_ns
+        with open(path, encoding='utf-8') as file_config:
+            return freeze(json.load(file_config)), mtime
+
+    @classmethod
+    def get(cls, name):
+        """
+            Returns the read-only content of config/<name>.json. The file is read on first use only.
+            Raises FileNotFoundError if the file does not exist.
+        """
+        with cls.__lock:
+            if name not in cls.__configs:
+                cls.__configs[name], cls.__mtimes[name] = cls.__read(name)
+            return cls.__configs[name]
+
+    @classmethod
+    def validate(cls):
+        """
+            Loads all configuration files and checks them against CONFIG_SCHEMAS.
+            Raises ValueError listing all the missing or invalid keys.
+        """
+        check_configs({name: cls.get(name) for name in CONFIG_SCHEMAS})
+
+    @classmethod
+    def add_reload_listener(cls, listener):
+        """
+            Registers listener() to be called after each reload.
+            Bound methods are referenced weakly, so that registering does not keep their object alive.
+        """
+        reference = weakref.WeakMethod(listener) if inspect.ismethod(listener) else lambda: listener
+        with cls.__lock:
+            cls.__listeners = [item for item in cls.__listeners if item() is not None] + [reference]
+
+    @classmethod
+    def reload(cls):
+        """
+            Reads again all configuration files, validates them and replaces the loaded configuration at once,
+            then calls the reload listeners. Returns the names of the reloaded files.
+            Raises ValueError or OSError, and keeps the current configuration, if the files are invalid or missing.
+        """
+        with cls.__reload_lock:
+            with cls.__lock:
+                names = sorted(set(cls.__configs) | set(CONFIG_SCHEMAS))
+            configs = {}
+            mtimes = {}
+            for name in names:
+                configs[name], mtimes[name] = cls.__read(name)
+            check_configs(configs)
+            with cls.__lock:
+                cls.__configs = configs
+                cls.__mtimes = mtimes
+                listeners = [item() for item in cls.__listeners]
+            for listener in listeners:
+                if listener is None:
+                    continue
+                try:
+                    listener()
+                # pylint: disable-next=broad-exception-caught
+                except Exception:
+                    logger.exception("ConfigRegistry: Reload listener failed.")
+        logger.info("ConfigRegistry: Configuration reloaded.")
+        return names
+
+    @classmethod
+    def start_watching(cls, interval):
+        """
+            Starts a background thread reloading the configuration when a loaded file is modified,
+            checked every interval seconds. An invalid configuration is logged and reloaded once fixed.
+        """
+        with cls.__lock:
+            if cls.__watcher is not None:
+                return
+            cls.__watcher = threading.Thread(target=cls.__watch, args=(interval,), name="tbtt-config-watcher",
+                                             daemon=True)
+            cls.__watcher.start()
+
+    @classmethod
+    def __watch(cls, interval):
+        """
+            Watcher thread loop.
+        """
+        failed_mtimes = None
+        while True:
+            time.sleep(interval)
+            current_mtimes = cls.__stat_loaded_files()
+            with cls.__lock:
+                loaded_mtimes = dict(cls.__mtimes)
+            if current_mtimes in (loaded_mtimes, failed_mtimes):
+                continue
+            try:
+                cls.reload()
+                failed_mtimes = None
+            except (ValueError, OSError):
+                logger.exception("ConfigRegistry: Modified configuration not reloaded.")
+                failed_mtimes = current_mtimes
+
+    @classmethod
+    def __stat_loaded_files(cls):
+        """
+            Returns the current modification times of the loaded files, None for missing files.
+        """
+        with cls.__lock:
+            names = list(cls.__mtimes)
+        mtimes = {}
+        for name in names:
+            try:
+                mtimes[name] = (CONFIG_DIR / f"{name}.json").stat().st_mtime_ns
+            except OSError:
+                mtimes[name] = None
+        return mtimes
+
+    @classmethod
+    def clear(cls):
+        """
+            Drops the loaded files, so that they are read again on next use.
+        """
+        with cls.__lock:
+            cls.__configs.clear()
+            cls.__mtimes.clear()
@@ -9,3 +9,4 @@ APP_CONFIG_TOKEN_GITHUB_ACCESS_TOKEN = 'GITHUB_ACCESS_TOKEN'
 APP_CONFIG_TOKEN_GITHUB_WEBHOOK_SECRET = 'GITHUB_WEBHOOK_SECRET'
 APP_CONFIG_TOKEN_GODP_AUTH_TOKEN = 'GODP_AUTH_TOKEN'
 APP_CONFIG_TOKEN_NOTION_API_KEY = 'NOTION_API_KEY'
+APP_CONFIG_TOKEN_ADMIN_TOKEN = 'ADMIN_TOKEN'
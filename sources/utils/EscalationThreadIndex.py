@@ -0,0 +1,97 @@
+"""
+    This module defines the persistent index of the Slack threads of the dev-team-escalation tasks.
+"""
+import sqlite3
+import threading
+import time
+from contextlib import closing
+from pathlib import Path
+from sources.utils.ConfigRegistry import ConfigRegistry
+
+DEFAULT_INDEX_PATH = "data/escalation_threads.sqlite3"
+
+
+class EscalationThreadIndex():
+    """
+        SQLite index mapping a GitHub project item to the Slack thread posted for it: channel, ts and current text of
+        the parent message.
+        It avoids searching Slack messages each time the project item is updated. The index is meant to be on the
+        storage shared by all the instances of the app, along with the job journal.
+        Use EscalationThreadIndex.get_instance() to retrieve the index shared by all handlers.
+    """
+    __instance = None
+    __instance_lock = threading.Lock()
+
+    def __init__(self, path):
+        """
+            Creates the index database at path if it does not exist yet.
+        """
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with closing(self.__connect()) as connection:
+            with connection:
+                connection.execute("""
+                    CREATE TABLE IF NOT EXISTS escalation_threads (
+                        node_id TEXT PRIMARY KEY,
+                        database_id INTEGER,
+                        channel TEXT NOT NULL,
+                        ts TEXT NOT NULL,
+                        text TEXT NOT NULL,
+                        updated_at REAL NOT NULL
+                    )
+                """)
+
+    @classmethod
+    def get_instance(cls):
+        """
+            Returns the index shared by the app.
+            If not created yet, it is created from the "escalationThreadIndex" section of config/app.json.
+            A relative path is resolved from the root of the app.
+        """
+        with cls.__instance_lock:
+            if cls.__instance is None:
+                root_dir = Path(__file__).parent.parent.parent
+                index_config = ConfigRegistry.get("app").get("escalationThreadIndex", {})
+                cls.__instance = cls(root_dir / index_config.get("path", DEFAULT_INDEX_PATH))
+            return cls.__instance
+
+    def __connect(self):
+        """
+            Opens a new connection to the index. Connections are not shared between threads.
+        """
+        return sqlite3.connect(self.path, timeout=10)
+
+    def record(self, node_id, database_id, channel, thread_ts, text):  # pylint: disable=too-many-arguments
+        """
+            Stores the Slack thread of a project item, replacing any previous one.
+        """
+        with closing(self.__connect()) as connection:
+            with connection:
+                connection.execute(
+                    "INSERT OR REPLACE INTO escalation_threads (node_id, database_id, channel, ts, text, updated_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (node_id, database_id, channel, thread_ts, text, time.time()))
+
+    def get(self, node_id):
+        """
+            Returns the Slack thread of a project item as a dict with channel, ts and text, or None if not indexed.
+        """
+        with closing(self.__connect()) as connection:
+            row = connection.execute("SELECT channel, ts, text FROM escalation_threads WHERE node_id = ?",
+                                     (node_id,)).fetchone()
+        if row is None:
+            return None
+        return {"channel": row[0], "ts": row[1], "text": row[2]}
+
+    def update_text(self, node_id, text, expected_text):
+        """
+            Stores the new text of the parent message of a project item thread, only if its stored text is still
+            expected_text. The instances sharing the index agree this way on which one edits the message.
+            Returns True if the text was updated.
+        """
+        with closing(self.__connect()) as connection:
+            with connection:
+                cursor = connection.execute(
+                    "UPDATE escalation_threads SET text = ?, updated_at = ? WHERE node_id = ? AND text = ?",
+                    (text, time.time(), node_id, expected_text))
+        return cursor.rowcount == 1
@@ -0,0 +1,38 @@
+"""
+    This module defines a thread-safe holder of a single value valid until an expiry date.
+"""
+import threading
+
+
+class ExpiringValue():
+    """
+        Holds a value loaded on demand, until the expiry date returned by its loader.
+        Concurrent callers wait for the value being loaded instead of loading it again.
+    """
+
+    def __init__(self):
+        self.__value = None
+        self.__expiry = None
+        self.__lock = threading.Lock()
+
+    def get(self, now, load):
+        """
+            Returns the held value if it has not expired at now.
+            Otherwise calls load(), which returns (value, expiry), and holds the value until expiry. A None expiry means
+            the value is not held, and is loaded again on next call.
+        """
+        with self.__lock:
+            if self.__expiry is not None and now < self.__expiry:
+                return self.__value
+            value, expiry = load()
+            self.__value = value if expiry is not None else None
+            self.__expiry = expiry
+            return value
+
+    def clear(self):
+        """
+            Drops the held value, so that it is loaded again on next call.
+        """
+        with self.__lock:
+            self.__value = None
+            self.__expiry = None
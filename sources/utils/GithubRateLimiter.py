@@ -0,0 +1,124 @@
+"""
+    This module defines the tracker of the GitHub GraphQL API rate limit, throttling the requests when it runs low.
+"""
+import logging
+import threading
+import time
+from collections.abc import Mapping
+from sources.utils.ConfigRegistry import ConfigRegistry
+
+PRIORITY_HIGH = "high"
+PRIORITY_LOW = "low"
+DEFAULT_LOW_PRIORITY_THRESHOLD = 500
+
+logger = logging.getLogger(__name__)
+
+
+class GithubRateLimitedError(Exception):
+    """
+        Raised instead of waiting when a low priority request must wait for the rate limit.
+        wait is the number of seconds after which the request can be sent again.
+    """
+
+    def __init__(self, wait):
+        super().__init__(f"GitHub rate limit low, request delayed by {wait} seconds.")
+        self.wait = wait
+
+
+class GithubRateLimiter():
+    """
+        Keeps track of the rate limit budget reported by GitHub in the headers of its responses.
+        Low priority requests are rejected until the budget resets when the remaining points drop below a threshold,
+        so that the remaining budget is kept for high priority ones, like task creations. Their jobs are submitted
+        again after the wait instead of holding a worker.
+        High priority requests wait when the budget is exhausted, or when a secondary rate limit asks to retry later.
+        Use GithubRateLimiter.get_instance() to retrieve the tracker shared by all factories.
+    """
+    __instance = None
+    __instance_lock = threading.Lock()
+
+    def __init__(self, low_priority_threshold=DEFAULT_LOW_PRIORITY_THRESHOLD):
+        self.low_priority_threshold = low_priority_threshold
+        self.__budget = {"limit": None, "remaining": None, "used": None, "reset_at": None}
+        self.__retry_at = 0
+        self.__stats = {"throttled": 0, "throttle_seconds": 0.0, "secondary_rate_limited": 0}
+        self.__lock = threading.Lock()
+
+    @classmethod
+    def get_instance(cls):
+        """
+            Returns the tracker shared by the app.
+            If not created yet, it is created from the "githubRateLimit" section of config/app.json.
+        """
+        with cls.__instance_lock:
+            if cls.__instance is None:
+                limit_config = ConfigRegistry.get("app").get("githubRateLimit", {})
+                cls.__instance = cls(limit_config.get("lowPriorityThreshold", DEFAULT_LOW_PRIORITY_THRESHOLD))
+            return cls.__instance
+
+    def update(self, headers):
+        """
+            Records the rate limit state from the x-ratelimit-* and Retry-After headers of a GitHub response.
+            Missing or invalid headers are ignored.
+        """
+        if not isinstance(headers, Mapping):
+            return
+        try:
+            limit = int(headers["x-ratelimit-limit"])
+            remaining = int(headers["x-ratelimit-remaining"])
+            used = int(headers.get("x-ratelimit-used", limit - remaining))
+            reset_at = int(headers["x-ratelimit-reset"])
+        except (KeyError, TypeError, ValueError):
+            limit = None
+        try:
+            retry_after = float(headers["Retry-After"])
+        except (KeyError, TypeError, ValueError):
+            retry_after = None
+
+        with self.__lock:
+            if limit is not None:
+                self.__budget = {"limit": limit, "remaining": remaining, "used": used, "reset_at": reset_at}
+            if retry_after is not None:
+                self.__stats["secondary_rate_limited"] += 1
+                self.__retry_at = max(self.__retry_at, time.time() + retry_after)
+
+    def __get_wait(self, priority, now):
+        """
+            Returns the number of seconds a request of the given priority must wait. The lock must be held.
+        """
+        wait = self.__retry_at - now
+        remaining, reset_at = self.__budget["remaining"], self.__budget["reset_at"]
+        if remaining is not None and reset_at > now:
+            if remaining <= 0 or (priority == PRIORITY_LOW and remaining < self.low_priority_threshold):
+                wait = max(wait, reset_at - now)
+        return max(wait, 0)
+
+    def is_limited(self):
+        """
+            Returns True if the budget is exhausted, or if GitHub asked to retry later.
+        """
+        with self.__lock:
+            return self.__get_wait(PRIORITY_HIGH, time.time()) > 0
+
+    def acquire(self, priority=PRIORITY_HIGH):
+        """
+            Waits until a high priority request can be sent.
+            Low priority requests do not wait: GithubRateLimitedError is raised if they cannot be sent yet.
+        """
+        with self.__lock:
+            wait = self.__get_wait(priority, time.time())
+            if wait > 0:
+                self.__stats["throttled"] += 1
+                self.__stats["throttle_seconds"] += wait
+        if wait > 0:
+            logger.warning("GithubRateLimiter: %s priority request delayed by %s seconds.", priority, wait)
+            if priority == PRIORITY_LOW:
+                raise GithubRateLimitedError(wait)
+            time.sleep(wait)
+
+    def get_stats(self):
+        """
+            Returns the last rate limit state reported by GitHub, and the throttling statistics.
+        """
+        with self.__lock:
+            return {**self.__budget, **self.__stats}
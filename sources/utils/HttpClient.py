@@ -0,0 +1,47 @@
+"""
+    This module provides the HTTP session shared by the factories for outbound API calls.
+"""
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+from decouple import config
+from sources.utils.Tracing import record_response_status
+
+DEFAULT_POOL_CONNECTIONS = 10
+DEFAULT_POOL_MAXSIZE = 16
+
+
+class HttpClient():
+    """
+        Holds a single requests.Session so that keep-alive connections are reused across calls and threads.
+        The session keeps one connection pool per host. Its sizing can be set with the environment variables:
+            - TBTT_HTTP_POOL_CONNECTIONS: number of hosts with a cached connection pool
+            - TBTT_HTTP_POOL_MAXSIZE: maximum number of connections kept alive per host
+    """
+    __session = None
+    __session_lock = threading.Lock()
+
+    @classmethod
+    def get_session(cls):
+        """
+            Returns the shared session. If not created yet, the method creates it before returning.
+        """
+        with cls.__session_lock:
+            if cls.__session is None:
+                cls.__session = cls.create_session(
+                    config("TBTT_HTTP_POOL_CONNECTIONS", default=DEFAULT_POOL_CONNECTIONS, cast=int),
+                    config("TBTT_HTTP_POOL_MAXSIZE", default=DEFAULT_POOL_MAXSIZE, cast=int))
+            return cls.__session
+
+    @staticmethod
+    def create_session(pool_connections, pool_maxsize):
+        """
+            Creates a session with connection pools of the given size mounted for HTTP and HTTPS.
+            The status codes of the responses are added to the current trace span.
+        """
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize)
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        session.hooks['response'].append(record_response_status)
+        return session
@@ -1,7 +1,7 @@
 """
     Utility functions to handle IP Addresses.
 """
-from ipaddress import ip_address, IPv4Address
+from ipaddress import ip_address, ip_network, collapse_addresses, IPv4Address, IPv4Network
 
 IP_ADDRESS_IPV4 = "IPv4"
 IP_ADDRESS_IPV6 = "IPv6"
@@ -15,3 +15,45 @@ def valid_ip_address(ip_uut: str) -> str:
         return IP_ADDRESS_IPV4 if isinstance(ip_address(ip_uut), IPv4Address) else IP_ADDRESS_IPV6
     except ValueError:
         return "Invalid"
+
+
+def parse_ip_networks(text: str) -> tuple:
+    """
+        Parses a multi-line string of IP addresses and CIDR ranges, one per line, in a single pass.
+        Returns the tuple (IPv4 networks, IPv6 networks, invalid lines). Empty lines are ignored.
+        Addresses are returned as single-host networks, and host bits of ranges are ignored.
+    """
+    ipv4_networks = []
+    ipv6_networks = []
+    invalid_lines = []
+    for line in text.splitlines():
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            network = ip_network(line, strict=False)
+        except ValueError:
+            invalid_lines.append(line)
+            continue
+        if isinstance(network, IPv4Network):
+            ipv4_networks.append(network)
+        else:
+            ipv6_networks.append(network)
+    return ipv4_networks, ipv6_networks, invalid_lines
+
+
+def collapse_ip_networks(networks: list) -> list:
+    """
+        Merges the duplicated, overlapping and adjacent networks of a single IP version.
+        The returned list is sorted by network address.
+    """
+    return list(collapse_addresses(networks))
+
+
+def format_ip_networks(networks: list) -> str:
+    """
+        Formats networks as a multi-line string, one per line with a trailing line break.
+        Single-host networks are written as plain addresses.
+    """
+    lines = [str(network.network_address) if network.num_addresses == 1 else str(network) for network in networks]
+    return "".join(line + "\n" for line in lines)
@@ -0,0 +1,57 @@
+"""
+    This module defines a sorted-interval index answering whether IP addresses belong to a set of ranges.
+"""
+from bisect import bisect_right
+from ipaddress import ip_address, IPv4Address
+from sources.utils import IpAddress
+
+
+class IpRangeIndex():
+    """
+        Index of IPv4 and IPv6 ranges, kept as sorted non-overlapping intervals of integers per IP version.
+        Each lookup is a binary search, in O(log n) for n ranges.
+    """
+
+    def __init__(self, ipv4_networks, ipv6_networks):
+        """
+            Builds the index from the networks of each IP version. Networks are collapsed first.
+        """
+        self.__intervals = {
+            IpAddress.IP_ADDRESS_IPV4: self.__build_intervals(ipv4_networks),
+            IpAddress.IP_ADDRESS_IPV6: self.__build_intervals(ipv6_networks)
+        }
+
+    @staticmethod
+    def __build_intervals(networks):
+        """
+            Returns the (starts, ends, networks) lists of the collapsed networks, sorted by start address.
+        """
+        collapsed_networks = IpAddress.collapse_ip_networks(networks)
+        starts = [int(network.network_address) for network in collapsed_networks]
+        ends = [int(network.broadcast_address) for network in collapsed_networks]
+        return starts, ends, collapsed_networks
+
+    def lookup(self, ip_uut: str) -> dict:
+        """
+            Checks whether an IP address belongs to one of the indexed ranges.
+            Returns a dict with the address, its version ("IPv4", "IPv6" or "Invalid"), whether it is listed and
+            the range containing it, if any.
+        """
+        ip_uut = ip_uut.strip()
+        result = {"ip": ip_uut, "version": "Invalid", "listed": False, "range": None}
+        # Same classification as IpAddress.valid_ip_address, parsing the address only once
+        try:
+            parsed_address = ip_address(ip_uut)
+        except ValueError:
+            return result
+        if isinstance(parsed_address, IPv4Address):
+            result["version"] = IpAddress.IP_ADDRESS_IPV4
+        else:
+            result["version"] = IpAddress.IP_ADDRESS_IPV6
+        starts, ends, networks = self.__intervals[result["version"]]
+        address = int(parsed_address)
+        position = bisect_right(starts, address) - 1
+        if position >= 0 and address <= ends[position]:
+            result["listed"] = True
+            result["range"] = str(networks[position])
+        return result
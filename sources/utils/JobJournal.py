@@ -0,0 +1,323 @@
+"""
+    This module defines the persistent journal of the background jobs accepted by the app.
+"""
+import contextvars
+import json
+import logging
+import secrets
+import socket
+import sqlite3
+import threading
+import time
+from contextlib import closing
+from pathlib import Path
+from sources.utils.WorkerPool import WorkerPool, WorkerPoolSaturatedError
+from sources.utils.ConfigRegistry import ConfigRegistry
+
+DEFAULT_JOURNAL_PATH = "data/job_journal.sqlite3"
+DEFAULT_RETENTION_DAYS = 7
+DEFAULT_LEASE_SECONDS = 60
+
+JOB_STATUS_PENDING = "pending"
+JOB_STATUS_DONE = "done"
+JOB_STATUS_FAILED = "failed"
+
+# ID of the journaled job running in the current context
+current_job_id = contextvars.ContextVar("tbtt_current_job_id", default=None)
+
+logger = logging.getLogger(__name__)
+
+
+class JobJournal():
+    """
+        SQLite journal recording each job before it is submitted to the worker pool.
+        Jobs are marked done or failed once executed, so that jobs still pending when the app stops are replayed
+        at the next start.
+        The journal can be shared by several instances of the app. Each pending job is leased by the instance that
+        recorded or replayed it, which renews the lease while it runs. Only the jobs whose lease expired, i.e. whose
+        instance stopped, are replayed, by the first instance claiming them.
+        Each job type must have a runner registered, called with the app context and the recorded parameters.
+        Use JobJournal.get_instance() to retrieve the journal shared by all handlers.
+    """
+    __instance = None
+    __instance_lock = threading.Lock()
+
+    def __init__(self, path, worker_pool=None, retention_days=DEFAULT_RETENTION_DAYS,
+                 lease_seconds=DEFAULT_LEASE_SECONDS):
+        """
+            Creates the journal database at path if it does not exist yet.
+        """
+        self.path = Path(path)
+        self.retention_days = retention_days
+        self.lease_seconds = lease_seconds
+        self.worker_pool = worker_pool if worker_pool is not None else WorkerPool.get_instance()
+        # Unique per process, as a restarted container keeps its host name
+        self.owner = f"{socket.gethostname()}-{secrets.token_hex(4)}"
+        self.__runners = {}
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with closing(self.__connect()) as connection:
+            with connection:
+                connection.execute("""
+                    CREATE TABLE IF NOT EXISTS jobs (
+                        id INTEGER PRIMARY KEY AUTOINCREMENT,
+                        job_type TEXT NOT NULL,
+                        params TEXT NOT NULL,
+                        status TEXT NOT NULL,
+                        error TEXT,
+                        created_at REAL NOT NULL,
+                        updated_at REAL NOT NULL,
+                        owner TEXT,
+                        lease_expires_at REAL NOT NULL DEFAULT 0
+                    )
+                """)
+                # Journals created before the leases
+                columns = [row[1] for row in connection.execute("PRAGMA table_info(jobs)")]
+                if "owner" not in columns:
+                    connection.execute("ALTER TABLE jobs ADD COLUMN owner TEXT")
+                    connection.execute("ALTER TABLE jobs ADD COLUMN lease_expires_at REAL NOT NULL DEFAULT 0")
+
+    @classmethod
+    def get_instance(cls):
+        """
+            Returns the journal shared by the app.
+            If not created yet, it is created from the "jobJournal" section of config/app.json.
+            A relative path is resolved from the root of the app.
+        """
+        with cls.__instance_lock:
+            if cls.__instance is None:
+                root_dir = Path(__file__).parent.parent.parent
+                journal_config = ConfigRegistry.get("app").get("jobJournal", {})
+                cls.__instance = cls(root_dir / journal_config.get("path", DEFAULT_JOURNAL_PATH),
+                                     retention_days=journal_config.get("retentionDays", DEFAULT_RETENTION_DAYS),
+                                     lease_seconds=journal_config.get("leaseSeconds", DEFAULT_LEASE_SECONDS))
+            return cls.__instance
+
+    def __connect(self):
+        """
+            Opens a new connection to the journal. Connections are not shared between threads.
+        """
+        return sqlite3.connect(self.path, timeout=10)
+
+    def register_runner(self, job_type, runner):
+        """
+            Registers the callable executing the jobs of job_type: runner(app_context, **params)
+        """
+        self.__runners[job_type] = runner
+
+    def record(self, job_type, params):
+        """
+            Stores a new pending job, leased by this instance, and returns its ID. params must be JSON serializable.
+        """
+        now = time.time()
+        with closing(self.__connect()) as connection:
+            with connection:
+                cursor = connection.execute(
+                    "INSERT INTO jobs (job_type, params, status, created_at, updated_at, owner, lease_expires_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (job_type, json.dumps(params), JOB_STATUS_PENDING, now, now, self.owner, now + self.lease_seconds))
+                return cursor.lastrowid
+
+    def claim(self, job_id):
+        """
+            Leases a pending job to this instance if its lease expired. Returns True if the job was claimed,
+            False if it is done, failed, or leased by a running instance.
+        """
+        now = time.time()
+        with closing(self.__connect()) as connection:
+            with connection:
+                cursor = connection.execute(
+                    "UPDATE jobs SET owner = ?, lease_expires_at = ? "
+                    "WHERE id = ? AND status = ? AND lease_expires_at <= ?",
+                    (self.owner, now + self.lease_seconds, job_id, JOB_STATUS_PENDING, now))
+                return cursor.rowcount == 1
+
+    def __release(self, job_id):
+        """
+            Gives up the lease of a pending job, so that it can be claimed again.
+        """
+        with closing(self.__connect()) as connection:
+            with connection:
+                connection.execute("UPDATE jobs SET lease_expires_at = 0 WHERE id = ? AND owner = ?",
+                                   (job_id, self.owner))
+
+    def renew_leases(self):
+        """
+            Extends the lease of the pending jobs of this instance. Must be called more often than lease_seconds.
+        """
+        with closing(self.__connect()) as connection:
+            with connection:
+                connection.execute("UPDATE jobs SET lease_expires_at = ? WHERE owner = ? AND status = ?",
+                                   (time.time() + self.lease_seconds, self.owner, JOB_STATUS_PENDING))
+
+    def __set_status(self, job_id, status, error=None):
+        """
+            Updates the status of a recorded job.
+        """
+        with closing(self.__connect()) as connection:
+            with connection:
+                connection.execute("UPDATE jobs SET status = ?, error = ?, updated_at = ? WHERE id = ?",
+                                   (status, error, time.time(), job_id))
+
+    def mark_done(self, job_id):
+        """
+            Marks a job as successfully executed.
+        """
+        self.__set_status(job_id, JOB_STATUS_DONE)
+
+    def mark_failed(self, job_id, error):
+        """
+            Marks a job as executed with an error. Failed jobs are not replayed.
+        """
+        self.__set_status(job_id, JOB_STATUS_FAILED, error)
+
+    def checkpoint(self, **values):
+        """
+            Adds values to the recorded parameters of the job running in the current context, so that a replay of
+            the job receives them and can skip the steps already done. Does nothing outside of a journaled job.
+        """
+        job_id = current_job_id.get()
+        if job_id is None:
+            return
+        with closing(self.__connect()) as connection:
+            with connection:
+                params = json.loads(connection.execute("SELECT params FROM jobs WHERE id = ?", (job_id,)).fetchone()[0])
+                connection.execute("UPDATE jobs SET params = ?, updated_at = ? WHERE id = ?",
+                                   (json.dumps({**params, **values}), time.time(), job_id))
+
+    def resubmit(self, app_context, delay=0):
+        """
+            Submits the job running in the current context again as a new job, with its recorded parameters including
+            the checkpointed values, after delay seconds. The running job is done once its runner returns.
+        """
+        job_id = current_job_id.get()
+        if job_id is None:
+            raise ValueError("No journaled job running.")
+        with closing(self.__connect()) as connection:
+            job_type, params = connection.execute("SELECT job_type, params FROM jobs WHERE id = ?",
+                                                  (job_id,)).fetchone()
+        return self.submit(app_context, job_type, json.loads(params), delay=delay)
+
+    def get_pending_jobs(self):
+        """
+            Returns the list of (job_id, job_type, params) of the jobs not executed yet, oldest first.
+        """
+        with closing(self.__connect()) as connection:
+            rows = connection.execute("SELECT id, job_type, params FROM jobs WHERE status = ? ORDER BY id",
+                                      (JOB_STATUS_PENDING,)).fetchall()
+        return [(job_id, job_type, json.loads(params)) for job_id, job_type, params in rows]
+
+    def purge(self):
+        """
+            Deletes the executed jobs older than the retention period.
+        """
+        limit = time.time() - self.retention_days * 86400
+        with closing(self.__connect()) as connection:
+            with connection:
+                connection.execute("DELETE FROM jobs WHERE status != ? AND updated_at < ?", (JOB_STATUS_PENDING, limit))
+
+    def submit(self, app_context, job_type, params, delay=0):
+        """
+            Records the job in the journal, then submits it to the worker pool.
+            If the worker pool is saturated, the job is marked failed, so that it is not replayed, and
+            WorkerPoolSaturatedError is raised for the caller to retry.
+            If delay is set, the job is submitted to the worker pool after delay seconds, from a timer thread.
+        """
+        if job_type not in self.__runners:
+            raise ValueError(f"No runner registered for job type {job_type}.")
+        job = (self.record(job_type, params), job_type, params)
+        if delay > 0:
+            self.__schedule_recorded_job(app_context, job, delay)
+            return job[0]
+        try:
+            self.__submit_recorded_job(app_context, job)
+        except WorkerPoolSaturatedError as error:
+            self.mark_failed(job[0], str(error))
+            raise
+        return job[0]
+
+    def __schedule_recorded_job(self, app_context, job, delay):
+        """
+            Submits an already recorded job (job_id, job_type, params) to the worker pool after delay seconds, from
+            the current context.
+        """
+        timer = threading.Timer(delay, contextvars.copy_context().run,
+                                args=(self.__submit_delayed_job, app_context, job, delay))
+        timer.daemon = True
+        timer.start()
+
+    def __submit_delayed_job(self, app_context, job, delay):
+        """
+            Submits a delayed job when its timer expires.
+            If the worker pool is saturated, the submission is tried again after another delay.
+        """
+        try:
+            self.__submit_recorded_job(app_context, job)
+        except WorkerPoolSaturatedError:
+            logger.warning("JobJournal: Worker pool saturated, job %s delayed again.", job[0])
+            self.__schedule_recorded_job(app_context, job, delay)
+
+    def __submit_recorded_job(self, app_context, job):
+        """
+            Submits an already recorded job (job_id, job_type, params) to the worker pool.
+        """
+        job_id, job_type, params = job
+        self.worker_pool.submit(job_type, self.__run_job, app_context=app_context,
+                                job_id=job_id, job_type=job_type, params=params)
+
+    def __run_job(self, app_context, job_id, job_type, params):
+        """
+            Runs a job in a worker thread and stores its outcome in the journal.
+        """
+        token = current_job_id.set(job_id)
+        try:
+            self.__runners[job_type](app_context, **params)
+        except Exception as error:
+            self.mark_failed(job_id, str(error))
+            raise
+        finally:
+            current_job_id.reset(token)
+        self.mark_done(job_id)
+
+    def replay_pending_jobs(self, app_context):
+        """
+            Submits again the pending jobs whose lease expired, left by a stopped instance of the app.
+            Jobs without registered runner, or not accepted by a saturated worker pool, are left pending.
+        """
+        self.purge()
+        replayed = 0
+        for job in self.get_pending_jobs():
+            if job[1] not in self.__runners:
+                logger.warning("JobJournal: No runner registered for pending job %s of type %s.", job[0], job[1])
+                continue
+            if not self.claim(job[0]):
+                continue
+            try:
+                self.__submit_recorded_job(app_context, job)
+            except WorkerPoolSaturatedError:
+                self.__release(job[0])
+                logger.warning("JobJournal: Worker pool saturated, remaining pending jobs not replayed.")
+                break
+            replayed += 1
+        logger.info("JobJournal: %s pending jobs replayed.", replayed)
+        return replayed
+
+    def start_lease_keeper(self, app_context):
+        """
+            Starts a background thread renewing the leases of this instance, and replaying the jobs of the stopped
+            instances once their lease expired, every third of lease_seconds.
+        """
+        threading.Thread(target=self.__keep_leases, args=(app_context,), name="tbtt-journal-lease-keeper",
+                         daemon=True).start()
+
+    def __keep_leases(self, app_context):
+        """
+            Lease keeper thread loop.
+        """
+        while True:
+            time.sleep(self.lease_seconds / 3)
+            try:
+                self.renew_leases()
+                self.replay_pending_jobs(app_context)
+            # pylint: disable-next=broad-exception-caught
+            except Exception:
+                logger.exception("JobJournal: Leases not renewed.")
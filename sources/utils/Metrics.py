@@ -0,0 +1,157 @@
+"""
+    This module defines the in-memory metrics of the app, exposed in the Prometheus text format.
+"""
+import copy
+import threading
+import time
+from contextlib import contextmanager
+from sources.utils.Tracing import start_span
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+METRIC_TYPE_COUNTER = "counter"
+METRIC_TYPE_GAUGE = "gauge"
+METRIC_TYPE_HISTOGRAM = "histogram"
+
+
+def format_labels(labels, extra_label=None):
+    """
+        Formats a tuple of (name, value) labels as {name="value",...}, escaping the values.
+    """
+    if extra_label is not None:
+        labels = labels + (extra_label,)
+    if not labels:
+        return ""
+    formatted = (f'{name}="{escape_label_value(value)}"' for name, value in labels)
+    return "{" + ",".join(formatted) + "}"
+
+
+def escape_label_value(value):
+    """
+        Escapes a label value as required by the text exposition format.
+    """
+    return str(value).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+def format_value(value):
+    """
+        Formats a sample value, integers without decimals.
+    """
+    if isinstance(value, float) and not value.is_integer():
+        return repr(value)
+    return str(int(value))
+
+
+class Metrics():
+    """
+        Registry of the counters and histograms of the app, with their samples per label set.
+        Gauges and statistics kept by the components themselves are not stored: they are read when rendering.
+        Use Metrics.get_instance() to retrieve the registry shared by the app.
+    """
+    __instance = None
+    __instance_lock = threading.Lock()
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.__families = {}
+        self.__lock = threading.Lock()
+
+    @classmethod
+    def get_instance(cls):
+        """
+            Returns the metrics registry shared by the app.
+        """
+        with cls.__instance_lock:
+            if cls.__instance is None:
+                cls.__instance = cls()
+            return cls.__instance
+
+    def __get_samples(self, name, metric_type, documentation):
+        """
+            Returns the samples of a metric, per label set, creating the metric on first use. The lock must be held.
+        """
+        if name not in self.__families:
+            self.__families[name] = (metric_type, documentation, {})
+        return self.__families[name][2]
+
+    def increment_counter(self, name, documentation, labels=None, value=1):
+        """
+            Adds value to the counter name, for the given labels dict.
+        """
+        key = tuple(sorted((labels or {}).items()))
+        with self.__lock:
+            samples = self.__get_samples(name, METRIC_TYPE_COUNTER, documentation)
+            samples[key] = samples.get(key, 0) + value
+
+    def observe_histogram(self, name, documentation, labels, value):
+        """
+            Records an observation of the histogram name, for the given labels dict.
+        """
+        key = tuple(sorted((labels or {}).items()))
+        with self.__lock:
+            samples = self.__get_samples(name, METRIC_TYPE_HISTOGRAM, documentation)
+            if key not in samples:
+                samples[key] = [[0] * len(self.buckets), 0.0, 0]
+            bucket_counts, _, _ = sample = samples[key]
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    bucket_counts[index] += 1
+            sample[1] += value
+            sample[2] += 1
+
+    def render(self, collected=()):
+        """
+            Returns all metrics in the Prometheus text exposition format.
+            collected is an iterable of (name, type, documentation, labels dict, value) read from the components
+            at rendering time.
+        """
+        with self.__lock:
+            families = copy.deepcopy(self.__families)
+        for name, metric_type, documentation, labels, value in collected:
+            if name not in families:
+                families[name] = (metric_type, documentation, {})
+            families[name][2][tuple(sorted(labels.items()))] = value
+
+        lines = []
+        for name, (metric_type, documentation, samples) in sorted(families.items()):
+            lines.append(f"# HELP {name} {documentation}")
+            lines.append(f"# TYPE {name} {metric_type}")
+            for key, sample in sorted(samples.items()):
+                if metric_type == METRIC_TYPE_HISTOGRAM:
+                    lines.extend(self.__render_histogram(name, key, sample))
+                else:
+                    lines.append(f"{name}{format_labels(key)} {format_value(sample)}")
+        return "\n".join(lines) + "\n"
+
+    def __render_histogram(self, name, key, sample):
+        """
+            Returns the cumulative bucket, sum and count lines of a histogram sample.
+        """
+        bucket_counts, total, count = sample
+        lines = [f"{name}_bucket{format_labels(key, ('le', bound))} {bucket_count}"
+                 for bound, bucket_count in zip(self.buckets, bucket_counts)]
+        lines.append(f"{name}_bucket{format_labels(key, ('le', '+Inf'))} {count}")
+        lines.append(f"{name}_sum{format_labels(key)} {format_value(total)}")
+        lines.append(f"{name}_count{format_labels(key)} {count}")
+        return lines
+
+
+@contextmanager
+def time_outbound_call(service, method):
+    """
+        Measures the duration of a call to an external service, and counts the calls raising an error.
+        The call is traced in a span, yielded to the caller.
+    """
+    metrics = Metrics.get_instance()
+    labels = {"service": service, "method": method}
+    start = time.perf_counter()
+    try:
+        with start_span(f"{service} {method}", **{"outbound.service": service, "outbound.method": method}) as span:
+            yield span
+    except Exception:
+        metrics.increment_counter("tbtt_outbound_call_errors_total",
+                                  "Calls to external services that raised an error.", labels)
+        raise
+    finally:
+        metrics.observe_histogram("tbtt_outbound_call_duration_seconds",
+                                  "Duration of the calls to external services.", labels, time.perf_counter() - start)
@@ -0,0 +1,112 @@
+"""
+    This module defines the opt-in profiler of the requests and background jobs of the app.
+"""
+import contextvars
+import cProfile
+import logging
+import re
+import threading
+import time
+from pathlib import Path
+from sources.utils.ConfigRegistry import ConfigRegistry
+
+DEFAULT_PROFILE_DIRECTORY = "data/profiles"
+DEFAULT_MAX_FILES = 100
+
+PROFILE_HEADER = "X-TBTT-Profile"
+
+# Set for the requests carrying the profile header, and copied into the jobs they submit
+profile_requested = contextvars.ContextVar("tbtt_profile_requested", default=False)
+
+logger = logging.getLogger(__name__)
+
+
+class Profiler():
+    """
+        Runs the requests to the listeners and the background jobs under cProfile, and writes their statistics as
+        pstats files to a directory, keeping only the max_files most recent ones.
+        Everything is profiled while the profiler is enabled. Otherwise, only the requests carrying the profile header,
+        and the jobs they submit, are profiled.
+        Use Profiler.get_instance() to retrieve the profiler shared by the app.
+    """
+    __instance = None
+    __instance_lock = threading.Lock()
+
+    def __init__(self, directory, enabled=False, max_files=DEFAULT_MAX_FILES):
+        self.directory = Path(directory)
+        self.max_files = max_files
+        self.__enabled = enabled
+        self.__lock = threading.Lock()
+
+    @classmethod
+    def get_instance(cls):
+        """
+            Returns the profiler shared by the app.
+            If not created yet, it is created from the "profiling" section of config/app.json.
+            A relative directory is resolved from the root of the app.
+        """
+        with cls.__instance_lock:
+            if cls.__instance is None:
+                root_dir = Path(__file__).parent.parent.parent
+                profiling_config = ConfigRegistry.get("app").get("profiling", {})
+                cls.__instance = cls(root_dir / profiling_config.get("directory", DEFAULT_PROFILE_DIRECTORY),
+                                     profiling_config.get("enabled", False),
+                                     profiling_config.get("maxFiles", DEFAULT_MAX_FILES))
+            return cls.__instance
+
+    def set_enabled(self, enabled):
+        """
+            Enables or disables the profiling of all requests and jobs.
+        """
+        with self.__lock:
+            self.__enabled = enabled
+        logger.warning("Profiler: Profiling %s.", "enabled" if enabled else "disabled")
+
+    def get_status(self):
+        """
+            Returns whether the profiler is enabled, its directory and the number of profiles it contains.
+        """
+        with self.__lock:
+            enabled = self.__enabled
+        return {"enabled": enabled, "directory": str(self.directory), "profiles": len(self.__list_profiles())}
+
+    def start(self):
+        """
+            Starts profiling the current thread if the profiler is enabled or the profile header was received.
+            Returns the profile to give to stop, or None if the thread is not profiled.
+        """
+        with self.__lock:
+            enabled = self.__enabled
+        if not enabled and not profile_requested.get():
+            return None
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError:
+            # Another profiler is already active
+            logger.warning("Profiler: Profiling not started, another profiler is active.")
+            return None
+        return profile
+
+    def stop(self, profile, name):
+        """
+            Stops a profile returned by start, and writes its statistics to <timestamp>-<name>.prof.
+        """
+        if profile is None:
+            return
+        profile.disable()
+        safe_name = re.sub(r'[^A-Za-z0-9_.-]+', '_', name)
+        with self.__lock:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            profile.dump_stats(self.directory / f"{time.time_ns()}-{safe_name}.prof")
+            profiles = self.__list_profiles()
+            for path in profiles[:max(len(profiles) - self.max_files, 0)]:
+                path.unlink(missing_ok=True)
+
+    def __list_profiles(self):
+        """
+            Returns the profile files of the directory, the oldest first.
+        """
+        if not self.directory.is_dir():
+            return []
+        return sorted(self.directory.glob("*.prof"))
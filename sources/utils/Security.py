@@ -25,3 +25,24 @@ def validate_github_webhook_signature(payload, secret):
 
     # See if they match
     return hmac.compare_digest(local_signature.hexdigest(), github_signature)
+
+
+def validate_bearer_token(payload, token):
+    """
+        Verification of the "Authorization: Bearer <token>" header of a request.
+    """
+    authorization = payload.headers.get('Authorization', '')
+    scheme, _, received_token = authorization.partition(' ')
+    if scheme != 'Bearer' or not received_token:
+        return False
+    return hmac.compare_digest(received_token.encode(), token.encode())
+
+
+def validate_header_token(payload, header, token):
+    """
+        Verification of a token sent in a custom header of a request.
+    """
+    received_token = payload.headers.get(header, '')
+    if not received_token:
+        return False
+    return hmac.compare_digest(received_token.encode(), token.encode())
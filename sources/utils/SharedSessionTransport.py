@@ -0,0 +1,36 @@
+"""
+    This module defines a GQL transport sending its requests through the shared HTTP session.
+"""
+from gql.transport.exceptions import TransportAlreadyConnected
+from gql.transport.requests import RequestsHTTPTransport
+from sources.utils.HttpClient import HttpClient
+
+
+class SharedSessionTransport(RequestsHTTPTransport):
+    """
+        GQL transport using the session shared by the factories instead of opening its own, so that keep-alive
+        connections are pooled across threads.
+        The transport keeps the state of its last request, so it must not be used by several threads at once.
+        Its response headers are those of the last request only, and are None if that request got no response.
+    """
+
+    def connect(self):
+        """
+            Uses the shared session for the requests of the transport.
+        """
+        if self.session is not None:
+            raise TransportAlreadyConnected("Transport is already connected")
+        self.session = HttpClient.get_session()
+
+    def execute(self, *args, **kwargs):
+        """
+            Clears the headers of the previous response before sending the request.
+        """
+        self.response_headers = None
+        return super().execute(*args, **kwargs)
+
+    def close(self):
+        """
+            Detaches the transport from the shared session, which stays open for the other callers.
+        """
+        self.session = None
@@ -0,0 +1,186 @@
+"""
+    This module defines the rate limiter scheduling the calls to the Slack Web API.
+"""
+import contextvars
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from sources.utils.ConfigRegistry import ConfigRegistry
+
+DEFAULT_PER_MINUTE = 20
+DEFAULT_BURST = 5
+DEFAULT_MAX_RETRIES = 3
+DEFAULT_RETRY_AFTER_SECONDS = 1
+
+# Whether the Slack calls of the current context raise SlackRateLimitedError instead of waiting
+_deferrable = contextvars.ContextVar("tbtt_slack_calls_deferrable", default=False)
+
+logger = logging.getLogger(__name__)
+
+
+class SlackRateLimitedError(Exception):
+    """
+        Raised instead of waiting when a deferrable call must wait for the rate limit of its Slack API method.
+        wait is the number of seconds after which the call can be sent again.
+    """
+
+    def __init__(self, method, wait):
+        super().__init__(f"Slack rate limit reached for {method}, call delayed by {wait} seconds.")
+        self.wait = wait
+
+
+class TokenBucket():
+    """
+        Token bucket allowing rate calls per second on average, and bursts of up to burst calls.
+        Callers reserve a token and wait for it instead of being rejected: the waits are queued in reservation order.
+    """
+
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.burst = burst
+        self.__tokens = burst
+        self.__updated_at = time.monotonic()
+        self.__blocked_until = 0
+        self.__lock = threading.Lock()
+
+    def reserve(self):
+        """
+            Takes a token and returns the number of seconds to wait before using it.
+        """
+        with self.__lock:
+            now = time.monotonic()
+            self.__tokens = min(self.burst, self.__tokens + (now - self.__updated_at) * self.rate)
+            self.__updated_at = now
+            self.__tokens -= 1
+            wait = -self.__tokens / self.rate if self.__tokens < 0 else 0
+            return max(wait, self.__blocked_until - now)
+
+    def cancel(self):
+        """
+            Gives back a reserved token, for a call that is not sent.
+        """
+        with self.__lock:
+            self.__tokens = min(self.burst, self.__tokens + 1)
+
+    def block(self, seconds):
+        """
+            Delays all calls for the given number of seconds, as asked by a Retry-After header.
+        """
+        with self.__lock:
+            self.__blocked_until = max(self.__blocked_until, time.monotonic() + seconds)
+
+
+class SlackRateLimiter():
+    """
+        Schedules the calls to the Slack Web API with a token bucket per API method, sized after the method tier.
+        Calls over the limit are delayed rather than dropped, and 429 responses block the method for Retry-After seconds.
+        Within deferrable(), calls raise SlackRateLimitedError instead of holding the thread, so that a journaled job
+        can be submitted again after the wait.
+        Use SlackRateLimiter.get_instance() to retrieve the rate limiter shared by all factories.
+    """
+    __instance = None
+    __instance_lock = threading.Lock()
+
+    def __init__(self, method_limits=None, default_limit=None, max_retries=DEFAULT_MAX_RETRIES):
+        """
+            Limits are dicts with the number of calls allowed perMinute and the burst size.
+        """
+        self.method_limits = method_limits if method_limits is not None else {}
+        self.default_limit = default_limit if default_limit is not None else {}
+        self.max_retries = max_retries
+        self.__buckets = {}
+        self.__stats = {}
+        self.__lock = threading.Lock()
+
+    @classmethod
+    def get_instance(cls):
+        """
+            Returns the rate limiter shared by the app.
+            If not created yet, it is created from the "slackRateLimits" section of config/app.json.
+        """
+        with cls.__instance_lock:
+            if cls.__instance is None:
+                limits_config = ConfigRegistry.get("app").get("slackRateLimits", {})
+                cls.__instance = cls(limits_config.get("methods", {}), limits_config.get("default", {}),
+                                     limits_config.get("maxRetries", DEFAULT_MAX_RETRIES))
+            return cls.__instance
+
+    def __get_bucket(self, method):
+        """
+            Returns the token bucket of an API method, created on first use.
+        """
+        with self.__lock:
+            if method not in self.__buckets:
+                limit = self.method_limits.get(method, self.default_limit)
+                self.__buckets[method] = TokenBucket(limit.get("perMinute", DEFAULT_PER_MINUTE) / 60,
+                                                     limit.get("burst", DEFAULT_BURST))
+                self.__stats[method] = {"calls": 0, "delayed": 0, "delay_seconds": 0.0, "rate_limited": 0,
+                                        "deferred": 0}
+            return self.__buckets[method]
+
+    def __count(self, method, **deltas):
+        """
+            Adds the deltas to the throttling statistics of an API method.
+        """
+        with self.__lock:
+            for name, delta in deltas.items():
+                self.__stats[method][name] += delta
+
+    @staticmethod
+    @contextmanager
+    def deferrable():
+        """
+            Makes the Slack calls of the block raise SlackRateLimitedError instead of waiting for the rate limit.
+            Only the calls that can be sent again with the rest of the job, without repeating any side effect, should
+            be deferrable.
+        """
+        token = _deferrable.set(True)
+        try:
+            yield
+        finally:
+            _deferrable.reset(token)
+
+    def acquire(self, method):
+        """
+            Waits until a call to the API method is allowed.
+            In a deferrable block, raises SlackRateLimitedError instead of waiting.
+        """
+        bucket = self.__get_bucket(method)
+        wait = bucket.reserve()
+        if wait > 0 and _deferrable.get():
+            bucket.cancel()
+            self.__count(method, deferred=1)
+            raise SlackRateLimitedError(method, wait)
+        if wait > 0:
+            self.__count(method, calls=1, delayed=1, delay_seconds=wait)
+            time.sleep(wait)
+        else:
+            self.__count(method, calls=1)
+
+    def call(self, method, send):
+        """
+            Calls send() once allowed by the limit of the API method, and returns its response.
+            A 429 response blocks the method for its Retry-After delay, then the call is sent again, up to max_retries times.
+            In a deferrable block, SlackRateLimitedError is raised instead of sending the call again.
+        """
+        for attempt in range(self.max_retries + 1):
+            self.acquire(method)
+            response = send()
+            if response is None or response.status_code != 429:
+                return response
+            self.__count(method, rate_limited=1)
+            retry_after = float(response.headers.get("Retry-After", DEFAULT_RETRY_AFTER_SECONDS))
+            self.__get_bucket(method).block(retry_after)
+            if _deferrable.get():
+                raise SlackRateLimitedError(method, retry_after)
+            logger.warning("SlackRateLimiter: %s rate limited, retry %s in %s seconds.", method, attempt + 1, retry_after)
+        return response
+
+    def get_stats(self):
+        """
+            Returns the throttling statistics per API method: calls made, calls delayed, total delay, 429 responses and
+            calls deferred.
+        """
+        with self.__lock:
+            return {method: dict(stats) for method, stats in self.__stats.items()}
@@ -0,0 +1,186 @@
+"""
+    This module defines the in-process tracing of the flows of the app, from the listeners to the external APIs.
+"""
+import contextvars
+import functools
+import json
+import logging
+import secrets
+import threading
+import time
+from contextlib import contextmanager
+from logging.handlers import RotatingFileHandler
+from pathlib import Path
+from sources.models.SpanContext import SpanContext
+from sources.utils.ConfigRegistry import ConfigRegistry
+
+DEFAULT_TRACE_PATH = "data/traces.jsonl"
+DEFAULT_MAX_BYTES = 10 * 1024 * 1024
+DEFAULT_BACKUP_COUNT = 3
+
+SPAN_STATUS_OK = "ok"
+SPAN_STATUS_ERROR = "error"
+
+current_span = contextvars.ContextVar("tbtt_current_span", default=None)
+
+
+class Span():
+    """
+        Timed operation of a trace. A span started while another one is current is its child, and belongs to its trace.
+        context identifies the span, and parent the context of its parent span, if any.
+    """
+
+    def __init__(self, name, parent=None, attributes=None):
+        self.name = name
+        self.context = SpanContext(parent.context.trace_id if parent is not None else secrets.token_hex(16),
+                                   secrets.token_hex(8))
+        self.parent = parent.context if parent is not None else None
+        self.attributes = {"thread.name": threading.current_thread().name, **(attributes or {})}
+        self.status = SPAN_STATUS_OK
+        self.duration = None
+        # Wall clock time for the export, and performance counter for the duration
+        self.__start = (time.time(), time.perf_counter())
+
+    def set_attribute(self, key, value):
+        """
+            Adds an attribute to the span.
+        """
+        self.attributes[key] = value
+
+    def set_error(self, error):
+        """
+            Marks the span as failed by the given exception.
+        """
+        self.status = SPAN_STATUS_ERROR
+        self.attributes["error.type"] = type(error).__name__
+        self.attributes["error.message"] = str(error)
+
+    def finish(self):
+        """
+            Records the duration of the span.
+        """
+        self.duration = time.perf_counter() - self.__start[1]
+
+    def to_dict(self):
+        """
+            Returns the finished span with the field names of OpenTelemetry spans.
+        """
+        start_time_ns = int(self.__start[0] * 1e9)
+        return {
+            "traceId": self.context.trace_id,
+            "spanId": self.context.span_id,
+            "parentSpanId": self.parent.span_id if self.parent is not None else None,
+            "name": self.name,
+            "startTimeUnixNano": start_time_ns,
+            "endTimeUnixNano": start_time_ns + int(self.duration * 1e9),
+            "durationMs": round(self.duration * 1000, 3),
+            "status": self.status,
+            "attributes": self.attributes
+        }
+
+
+class Tracer():
+    """
+        Exports the finished spans as JSON lines to a rotating file.
+        Without path, tracing is disabled and no span is created.
+        Use Tracer.get_instance() to retrieve the tracer shared by the app.
+    """
+    __instance = None
+    __instance_lock = threading.Lock()
+
+    def __init__(self, path=None, max_bytes=DEFAULT_MAX_BYTES, backup_count=DEFAULT_BACKUP_COUNT):
+        self.enabled = path is not None
+        self.__handler = None
+        if self.enabled:
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+            self.__handler = RotatingFileHandler(path, maxBytes=max_bytes, backupCount=backup_count,
+                                                 encoding='utf-8', delay=True)
+
+    @classmethod
+    def get_instance(cls):
+        """
+            Returns the tracer shared by the app.
+            If not created yet, it is created from the "tracing" section of config/app.json.
+            A relative path is resolved from the root of the app.
+        """
+        with cls.__instance_lock:
+            if cls.__instance is None:
+                tracing_config = ConfigRegistry.get("app").get("tracing", {})
+                path = None
+                if tracing_config.get("enabled", False):
+                    path = Path(__file__).parent.parent.parent / tracing_config.get("path", DEFAULT_TRACE_PATH)
+                cls.__instance = cls(path, tracing_config.get("maxBytes", DEFAULT_MAX_BYTES),
+                                     tracing_config.get("backupCount", DEFAULT_BACKUP_COUNT))
+            return cls.__instance
+
+    def export(self, span):
+        """
+            Writes a finished span as a JSON line. Spans are dropped if tracing is disabled.
+        """
+        if self.__handler is not None:
+            self.__handler.handle(logging.makeLogRecord({"msg": json.dumps(span.to_dict(), default=str)}))
+
+
+def open_span(name, **attributes):
+    """
+        Starts a span, child of the current one, and makes it current.
+        Returns the span and the token to give to close_span, or (None, None) if tracing is disabled.
+    """
+    if not Tracer.get_instance().enabled:
+        return None, None
+    span = Span(name, current_span.get(), attributes)
+    return span, current_span.set(span)
+
+
+def close_span(span, token, error=None):
+    """
+        Finishes a span opened with open_span, exports it and restores the previous current span.
+    """
+    if span is None:
+        return
+    if error is not None:
+        span.set_error(error)
+    span.finish()
+    current_span.reset(token)
+    Tracer.get_instance().export(span)
+
+
+@contextmanager
+def start_span(name, **attributes):
+    """
+        Runs the enclosed block in a span, marked as failed if an exception is raised. Yields the span, or None if
+        tracing is disabled.
+    """
+    span, token = open_span(name, **attributes)
+    error = None
+    try:
+        yield span
+    except Exception as raised:
+        error = raised
+        raise
+    finally:
+        close_span(span, token, error)
+
+
+def traced(name=None):
+    """
+        Decorator running each call of the function in a span, named after the function by default.
+    """
+    def decorator(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            with start_span(name or function.__qualname__):
+                return function(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def record_response_status(response, *_args, **_kwargs):
+    """
+        requests response hook adding the status code of the response to the current span.
+    """
+    span = current_span.get()
+    if span is not None:
+        span.set_attribute("http.status_code", response.status_code)
+        if response.status_code >= 400:
+            span.status = SPAN_STATUS_ERROR
@@ -0,0 +1,105 @@
+"""
+    This module defines a thread-safe in-memory cache with a maximum size and expiring entries.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+
+class TtlCache():
+    """
+        Least-recently-used cache whose entries expire after a time-to-live, in seconds.
+        When the cache is full, the least recently used entry is evicted.
+        None is a valid cached value: use the default parameter of get to detect misses.
+    """
+
+    def __init__(self, max_size, ttl):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.__entries = OrderedDict()
+        self.__lock = threading.Lock()
+
+    def get(self, key, default=None):
+        """
+            Returns the value cached for key, or default if it is missing or expired.
+        """
+        with self.__lock:
+            entry = self.__entries.get(key)
+            if entry is None:
+                return default
+            value, expires_at = entry
+            if time.monotonic() >= expires_at:
+                del self.__entries[key]
+                return default
+            self.__entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl=None):
+        """
+            Caches value for key, for ttl seconds or the default TTL of the cache.
+        """
+        with self.__lock:
+            self.__set(key, value, ttl)
+
+    def add(self, key, value, ttl=None):
+        """
+            Caches value for key only if key is missing or expired, atomically.
+            Returns True if the value was added, False if key was already cached.
+        """
+        with self.__lock:
+            entry = self.__entries.get(key)
+            if entry is not None and time.monotonic() < entry[1]:
+                return False
+            self.__set(key, value, ttl)
+            return True
+
+    def replace(self, key, value, ttl=None):
+        """
+            Caches value for key only if key is already cached and not expired, atomically.
+            Returns True if the value was replaced, False if key was missing.
+        """
+        with self.__lock:
+            entry = self.__entries.get(key)
+            if entry is None or time.monotonic() >= entry[1]:
+                return False
+            self.__set(key, value, ttl)
+            return True
+
+    def __set(self, key, value, ttl):
+        """
+            Stores an entry and evicts the least recently used ones beyond max_size. The lock must be held.
+        """
+        if ttl is None:
+            ttl = self.ttl
+        self.__entries[key] = (value, time.monotonic() + ttl)
+        self.__entries.move_to_end(key)
+        while len(self.__entries) > self.max_size:
+            self.__entries.popitem(last=False)
+
+    def delete(self, key):
+        """
+            Removes key from the cache, if present.
+        """
+        with self.__lock:
+            self.__entries.pop(key, None)
+
+    def pop(self, key, default=None):
+        """
+            Removes key from the cache and returns its value, or default if it is missing or expired.
+        """
+        with self.__lock:
+            entry = self.__entries.pop(key, None)
+            if entry is None or time.monotonic() >= entry[1]:
+                return default
+            return entry[0]
+
+    def clear(self):
+        """
+            Removes all entries from the cache.
+        """
+        with self.__lock:
+            self.__entries.clear()
+
+    def __len__(self):
+        with self.__lock:
+            return len(self.__entries)
@@ -0,0 +1,175 @@
+"""
+    This module defines the shared background worker pool running the processing started by the listeners.
+"""
+import collections
+import contextvars
+import logging
+import queue
+import threading
+import time
+from sources.utils.ConfigRegistry import ConfigRegistry
+from sources.utils.Profiler import Profiler
+from sources.utils.Tracing import start_span
+
+DEFAULT_MAX_WORKERS = 8
+DEFAULT_QUEUE_DEPTH = 100
+
+logger = logging.getLogger(__name__)
+
+
+class WorkerPoolSaturatedError(Exception):
+    """
+        Raised when a job is submitted while the worker pool queue is full, including the held back jobs.
+        Listeners map it to a 503 so that the caller can retry later.
+    """
+
+
+class WorkerPool():
+    """
+        Bounded pool of worker threads consuming a bounded job queue.
+        Each job has a type, which can be given a maximum number of concurrent executions. A job whose type is at its
+        limit is held back, without keeping a worker busy, and run by the worker completing a job of its type.
+        Jobs run in a copy of the context they were submitted from, so that their trace span is a child of the
+        span of the submitter.
+        Use WorkerPool.get_instance() to retrieve the pool shared by all handlers.
+    """
+    __instance = None
+    __instance_lock = threading.Lock()
+
+    def __init__(self, max_workers=DEFAULT_MAX_WORKERS, queue_depth=DEFAULT_QUEUE_DEPTH, job_type_limits=None):
+        """
+            Worker threads are not started here, but when the first job is submitted.
+        """
+        if job_type_limits is None:
+            job_type_limits = {}
+        self.max_workers = max_workers
+        self.job_type_limits = dict(job_type_limits)
+        self.__queue = queue.Queue(maxsize=queue_depth)
+        self.__workers = []
+        self.__lock = threading.Lock()
+        self.__in_flight = {}
+        self.__held_back = {}
+
+    @classmethod
+    def get_instance(cls):
+        """
+            Returns the worker pool shared by the app.
+            If not created yet, it is created from the "workerPool" section of config/app.json.
+        """
+        with cls.__instance_lock:
+            if cls.__instance is None:
+                pool_config = ConfigRegistry.get("app").get("workerPool", {})
+                cls.__instance = cls(pool_config.get("maxWorkers", DEFAULT_MAX_WORKERS),
+                                     pool_config.get("queueDepth", DEFAULT_QUEUE_DEPTH),
+                                     pool_config.get("jobTypeLimits", {}))
+            return cls.__instance
+
+    @property
+    def queue_depth(self):
+        """
+            Number of jobs that can wait for a worker, queued or held back.
+        """
+        return self.__queue.maxsize
+
+    def __start_workers(self):
+        """
+            Starts the worker threads if they are not running yet.
+        """
+        with self.__lock:
+            while len(self.__workers) < self.max_workers:
+                worker = threading.Thread(target=self.__work, name=f"tbtt-worker-{len(self.__workers)}", daemon=True)
+                self.__workers.append(worker)
+                worker.start()
+
+    def submit(self, job_type, target, /, **kwargs):
+        """
+            Queues target(**kwargs) for execution by a worker thread.
+            Raises WorkerPoolSaturatedError if the queue is full.
+        """
+        self.__start_workers()
+        try:
+            with self.__lock:
+                if self.__queue.qsize() + sum(len(jobs) for jobs in self.__held_back.values()) >= self.queue_depth:
+                    raise queue.Full()
+                self.__queue.put_nowait((job_type, target, kwargs, contextvars.copy_context(), time.perf_counter()))
+        except queue.Full as error:
+            raise WorkerPoolSaturatedError(f"Worker pool saturated, {job_type} job rejected.") from error
+
+    def __work(self):
+        """
+            Worker thread loop: waits for jobs and runs them, within the concurrency limit of their type.
+            After a job, the worker runs the next held back job of the same type, if any.
+        """
+        while True:
+            job = self.__queue.get()
+            if self.__acquire_slot(job):
+                while job is not None:
+                    self.__execute(job)
+                    job = self.__release_slot(job[0])
+            self.__queue.task_done()
+
+    def __acquire_slot(self, job):
+        """
+            Reserves an execution slot for the type of the job. If the type is at its limit, holds the job back
+            and returns False.
+        """
+        job_type = job[0]
+        with self.__lock:
+            limit = self.job_type_limits.get(job_type)
+            if limit is not None and self.__in_flight.get(job_type, 0) >= limit:
+                self.__held_back.setdefault(job_type, collections.deque()).append(job)
+                return False
+            self.__in_flight[job_type] = self.__in_flight.get(job_type, 0) + 1
+            return True
+
+    def __release_slot(self, job_type):
+        """
+            Returns the next held back job of the type, which keeps the execution slot, or frees the slot.
+        """
+        with self.__lock:
+            held_back = self.__held_back.get(job_type)
+            if held_back:
+                return held_back.popleft()
+            self.__in_flight[job_type] -= 1
+            return None
+
+    def __execute(self, job):
+        """
+            Runs a job in the context it was submitted from, and logs its failure.
+        """
+        job_type, target, kwargs, context, submitted_at = job
+        try:
+            context.run(self.__run, job_type, target, kwargs, time.perf_counter() - submitted_at)
+        # pylint: disable-next=broad-exception-caught
+        except Exception:
+            logger.exception("WorkerPool: %s job failed.", job_type)
+
+    @staticmethod
+    def __run(job_type, target, kwargs, waited):
+        """
+            Runs a job in a span recording its type and the time it waited in the queue, profiled if requested.
+        """
+        profiler = Profiler.get_instance()
+        profile = profiler.start()
+        try:
+            with start_span(f"job {job_type}", **{"job.type": job_type, "job.wait_seconds": round(waited, 6)}):
+                target(**kwargs)
+        finally:
+            profiler.stop(profile, f"job-{job_type}")
+
+    def get_stats(self):
+        """
+            Returns the sizing of the pool, its queue length, and the number of jobs in flight and held back per job type.
+        """
+        with self.__lock:
+            in_flight_by_type = {job_type: count for job_type, count in self.__in_flight.items() if count > 0}
+            held_back_by_type = {job_type: len(jobs) for job_type, jobs in self.__held_back.items() if jobs}
+        return {
+            "max_workers": self.max_workers,
+            "queue_depth": self.queue_depth,
+            "queue_length": self.__queue.qsize(),
+            "in_flight": sum(in_flight_by_type.values()),
+            "in_flight_by_type": in_flight_by_type,
+            "held_back": sum(held_back_by_type.values()),
+            "held_back_by_type": held_back_by_type
+        }
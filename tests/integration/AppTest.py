@@ -3,18 +3,28 @@
 """
 
 from pathlib import Path
+from unittest.mock import patch
 import runpy
 import pytest
+from sources.factories.GithubGQLCallFactory import GithubGQLCallFactory
+from sources.utils.JobJournal import JobJournal
+from tests.utils.TemporaryStorage import temporary_storage
 
 
-def test_main_script():
+@patch.object(JobJournal, "start_lease_keeper")
+@patch.object(GithubGQLCallFactory, "warm_up_user_id_cache")
+def test_main_script(_mock_warm_up, mock_lease_keeper, tmp_path):
     """
         Checks that the main script app.py runs correctly up until starting the Flask app
         (not tested based on the __name__ condition).
         This ensure that the setup is completed without errors.
+        The GitHub user IDs are not resolved, so that no request is left running against GitHub in the background.
+        The app uses an empty job journal and escalation thread index, so that no job of the checkout is replayed.
     """
     try:
-        runpy.run_path(Path(__file__).parent.parent.parent / "app.py")
+        with temporary_storage(tmp_path):
+            runpy.run_path(Path(__file__).parent.parent.parent / "app.py")
     # pylint: disable-next=broad-exception-caught
     except Exception:
         pytest.fail("An error occured while running app.py.")
+    mock_lease_keeper.assert_called_once()
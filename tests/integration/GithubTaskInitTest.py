@@ -5,14 +5,26 @@
 import json
 from pathlib import Path
 from unittest.mock import patch
+import pytest
 from freezegun import freeze_time
 from sources.handlers.GithubTaskHandler import GithubTaskHandler
 from sources.factories.GithubGQLCallFactory import GithubGQLCallFactory
 from sources.models.InitGithubTaskParam import InitGithubTaskParam
+from sources.utils.EscalationThreadIndex import EscalationThreadIndex
 
 # pylint: disable=unused-argument
 
 
+@pytest.fixture(autouse=True)
+def fixture_escalation_thread_index(tmp_path):
+    """
+        Gives each test an empty escalation thread index, instead of the one of the app
+    """
+    escalation_thread_index = EscalationThreadIndex(tmp_path / "escalation_threads.sqlite3")
+    with patch.object(EscalationThreadIndex, "get_instance", return_value=escalation_thread_index):
+        yield
+
+
 def mock_send_gql_request_all_fields(*args, **kwargs):  # noqa: C901
     """
         This is the mock for all send_gql_request for the test_init_github_task_all_fields.
@@ -32,30 +44,36 @@ def mock_send_gql_request_all_fields(*args, **kwargs):  # noqa: C901
             raise ValueError
         if args[2]['task']['assigneeIds'] != ['the_assignee_id']:
             raise ValueError
-        return {'addProjectV2DraftIssue': {'projectItem': {'id': 'the_item_id'}}}
+        return {'addProjectV2DraftIssue': {'projectItem': {'id': 'the_item_id', 'databaseId': 1234,
+                                                           'project': {'number': 104}}}}
 
-    def check_status_request(*args, **kwargs):
+    def check_field_mutation(field_mutation):
         # Those are calls to set fields
-        if 'iterationId' in args[2]['fieldMutation']['value']:
+        with open(Path(__file__).parent.parent.parent / "config" / "github.json", encoding='utf-8') as file_github_config:
+            github_config = json.load(file_github_config)
+        if 'iterationId' in field_mutation['value']:
             # Call to set sprint
-            if args[2]['fieldMutation']['value']['iterationId'] != "8824dd79":
+            if field_mutation['value']['iterationId'] != "8824dd79":
+                raise ValueError
+            if field_mutation['fieldId'] != github_config["sprintFieldId"]:
                 raise ValueError
-            with open(Path(__file__).parent.parent.parent / "config" / "github.json", encoding='utf-8') as file_github_config:
-                github_config = json.load(file_github_config)
-                if args[2]['fieldMutation']['fieldId'] != github_config["sprintFieldId"]:
-                    raise ValueError
 
-        elif 'singleSelectOptionId' in args[2]['fieldMutation']['value']:
+        elif 'singleSelectOptionId' in field_mutation['value']:
             # Call to set status
-            with open(Path(__file__).parent.parent.parent / "config" / "github.json", encoding='utf-8') as file_github_config:
-                github_config = json.load(file_github_config)
-                if args[2]['fieldMutation']['value']['singleSelectOptionId'] != github_config["initialStatusValue"]:
-                    raise ValueError
-                if args[2]['fieldMutation']['fieldId'] != github_config["statusFieldId"]:
-                    raise ValueError
+            if field_mutation['value']['singleSelectOptionId'] != github_config["initialStatusValue"]:
+                raise ValueError
+            if field_mutation['fieldId'] != github_config["statusFieldId"]:
+                raise ValueError
 
         else:
             raise ValueError
+
+    def check_status_request(*args, **kwargs):
+        # All the fields are set in a single batched mutation
+        for key, field_mutation in args[2].items():
+            if not key.startswith('fieldMutation'):
+                raise ValueError
+            check_field_mutation(field_mutation)
         return {}
 
     def check_get_sprints_request(*args, **kwargs):
@@ -70,7 +88,7 @@ def mock_send_gql_request_all_fields(*args, **kwargs):  # noqa: C901
     if 'task' in args[2] and 'title' in args[2]['task'] and 'body' in args[2]['task']:
         return check_task_creation_request(*args, **kwargs)
 
-    if 'fieldMutation' in args[2]:
+    if 'fieldMutation0' in args[2]:
         return check_status_request(*args, **kwargs)
 
     if 'node_id' in args[2]:
@@ -88,8 +106,11 @@ def test_init_github_task_all_fields(mock_sendrequest):
     """
         Test init_github_task with mandatory fields
     """
+    GithubGQLCallFactory.clear_user_id_cache()
+    GithubGQLCallFactory.invalidate_sprint_cache()
     github_task_handler = GithubTaskHandler()
     task_params = InitGithubTaskParam(title="the_title", body="the_body", handle_immediately=True, assignee='the_assignee')
     github_task_handler.init_github_task('app_context', task_params)
 
-    mock_sendrequest.assert_called()
+    # User lookup, task creation, sprint lookup and the batched fields mutation
+    assert mock_sendrequest.call_count == 4
@@ -0,0 +1,115 @@
+"""
+    Unit tests for the AdminListener.py main file
+"""
+from unittest.mock import patch
+from flask import Flask
+from sources.factories.GithubGQLCallFactory import GithubGQLCallFactory
+from sources.listeners.AdminListener import AdminListener
+from sources.utils.ConfigRegistry import ConfigRegistry
+from sources.utils.Profiler import Profiler
+import sources.utils.Constants as cst
+
+# pylint: disable=unused-argument
+
+
+def get_app(admin_token):
+    """
+        Returns a Flask app with the given admin token configured
+    """
+    app = Flask('test')
+    app.config[cst.APP_CONFIG_TOKEN_ADMIN_TOKEN] = admin_token
+    return app
+
+
+@patch.object(ConfigRegistry, "reload", return_value=["app", "github"])
+def test_reload_config(mock_reload):
+    """
+        Test that an authorized request reloads the configuration
+    """
+    with get_app('the_token').test_request_context(headers={'Authorization': 'Bearer the_token'}):
+        response = AdminListener().reload_config()
+    assert response == ({"reloaded": ["app", "github"]}, 200)
+    mock_reload.assert_called_once()
+
+
+@patch.object(ConfigRegistry, "reload", side_effect=ValueError('Invalid configuration'))
+def test_reload_config_invalid(mock_reload):
+    """
+        Test that an invalid configuration is reported as a bad request
+    """
+    with get_app('the_token').test_request_context(headers={'Authorization': 'Bearer the_token'}):
+        response = AdminListener().reload_config()
+    assert response == ({"error": "Invalid configuration"}, 400)
+
+
+@patch.object(ConfigRegistry, "reload")
+def test_reload_config_wrong_token(mock_reload):
+    """
+        Test that a request with a wrong token is rejected
+    """
+    with get_app('the_token').test_request_context(headers={'Authorization': 'Bearer other_token'}):
+        _, status = AdminListener().reload_config()
+    assert status == 401
+    mock_reload.assert_not_called()
+
+
+@patch.object(ConfigRegistry, "reload")
+def test_reload_config_disabled(mock_reload):
+    """
+        Test that the endpoint is disabled when no admin token is configured
+    """
+    with get_app(None).test_request_context(headers={'Authorization': 'Bearer '}):
+        _, status = AdminListener().reload_config()
+    assert status == 403
+    mock_reload.assert_not_called()
+
+
+@patch.object(GithubGQLCallFactory, "invalidate_sprint_cache")
+def test_invalidate_sprint_cache(mock_invalidate):
+    """
+        Test that an authorized request drops the cached sprints, and that a wrong token is rejected
+    """
+    with get_app('the_token').test_request_context(headers={'Authorization': 'Bearer other_token'}):
+        _, status = AdminListener().invalidate_sprint_cache()
+    assert status == 401
+    mock_invalidate.assert_not_called()
+
+    with get_app('the_token').test_request_context(headers={'Authorization': 'Bearer the_token'}):
+        response = AdminListener().invalidate_sprint_cache()
+    assert response == ({"invalidated": ["sprints"]}, 200)
+    mock_invalidate.assert_called_once()
+
+
+def test_set_profiling(tmp_path):
+    """
+        Test that the profiling can be toggled at runtime
+    """
+    profiler = Profiler(tmp_path)
+    with patch.object(Profiler, "get_instance", return_value=profiler):
+        headers = {'Authorization': 'Bearer the_token'}
+        with get_app('the_token').test_request_context(method='POST', json={"enabled": True}, headers=headers):
+            response = AdminListener().set_profiling()
+    assert response == ({"enabled": True, "directory": str(tmp_path), "profiles": 0}, 200)
+    assert profiler.get_status()["enabled"]
+
+
+def test_set_profiling_invalid(tmp_path):
+    """
+        Test that a body without enabled boolean is rejected
+    """
+    profiler = Profiler(tmp_path)
+    with patch.object(Profiler, "get_instance", return_value=profiler):
+        headers = {'Authorization': 'Bearer the_token'}
+        with get_app('the_token').test_request_context(method='POST', json={"enabled": "yes"}, headers=headers):
+            _, status = AdminListener().set_profiling()
+    assert status == 400
+    assert not profiler.get_status()["enabled"]
+
+
+def test_get_profiling_wrong_token():
+    """
+        Test that the profiling status requires the admin token
+    """
+    with get_app('the_token').test_request_context(headers={'Authorization': 'Bearer other_token'}):
+        _, status = AdminListener().get_profiling()
+    assert status == 401
@@ -0,0 +1,95 @@
+"""
+    Unit tests for the CachedHttpResource.py main file
+"""
+from unittest.mock import Mock
+import pytest
+import requests
+from freezegun import freeze_time
+from sources.utils.CachedHttpResource import CachedHttpResource, UnexpectedStatusError
+from tests.utils.SynchronousWorkerPool import SynchronousWorkerPool
+
+
+def mock_response(status_code, text=None, headers=None):
+    """
+        Mocks the response of a requests.Session.get
+    """
+    return Mock(status_code=status_code, text=text, headers=headers if headers is not None else {})
+
+
+def test_get_fresh_from_memory():
+    """
+        Test that the resource is fetched once, then served from memory until it expires
+    """
+    http_session = Mock()
+    http_session.get.return_value = mock_response(200, 'the_body')
+    with freeze_time('2023-07-27 10:00:00') as frozen_time:
+        resource = CachedHttpResource('the_url', http_session, ttl=60)
+        assert resource.get() == 'the_body'
+        frozen_time.tick(30)
+        assert resource.get() == 'the_body'
+        http_session.get.assert_called_once_with('the_url', headers={}, timeout=5)
+        frozen_time.tick(60)
+        resource.get()
+        assert http_session.get.call_count == 2
+
+
+def test_get_stale_refreshed_in_background():
+    """
+        Test that a stale resource is returned right away and refreshed by a background job
+    """
+    http_session = Mock()
+    http_session.get.side_effect = [mock_response(200, 'the_body'), mock_response(200, 'the_new_body')]
+    worker_pool = SynchronousWorkerPool()
+    with freeze_time('2023-07-27 10:00:00') as frozen_time:
+        resource = CachedHttpResource('the_url', http_session, ttl=60, stale_ttl=600, worker_pool=worker_pool)
+        resource.get()
+        frozen_time.tick(120)
+        assert resource.get() == 'the_body'
+        assert worker_pool.submitted_jobs == 1
+        assert resource.get() == 'the_new_body'
+
+
+def test_refresh_conditional_request():
+    """
+        Test that refreshes send the validators of the cached body, and a 304 keeps the cached body
+    """
+    http_session = Mock()
+    http_session.get.side_effect = [
+        mock_response(200, 'the_body', {'ETag': '"the_etag"', 'Last-Modified': 'the_date'}),
+        mock_response(304)
+    ]
+    resource = CachedHttpResource('the_url', http_session, ttl=60)
+    resource.refresh()
+
+    assert resource.refresh() == 'the_body'
+    http_session.get.assert_called_with('the_url', headers={'If-None-Match': '"the_etag"', 'If-Modified-Since': 'the_date'},
+                                        timeout=5)
+
+
+def test_get_last_known_body_on_error():
+    """
+        Test that the last fetched body is returned when CloudFlare cannot be reached or answers with an error
+    """
+    http_session = Mock()
+    http_session.get.side_effect = [mock_response(200, 'the_body'), requests.exceptions.ConnectionError('Down'),
+                                    mock_response(500)]
+    with freeze_time('2023-07-27 10:00:00') as frozen_time:
+        resource = CachedHttpResource('the_url', http_session, ttl=60)
+        resource.get()
+        frozen_time.tick(120)
+        assert resource.get() == 'the_body'
+        assert resource.get() == 'the_body'
+        assert http_session.get.call_count == 3
+
+
+def test_get_error_without_body():
+    """
+        Test that errors are raised when the resource was never fetched
+    """
+    http_session = Mock()
+    http_session.get.return_value = mock_response(404)
+    resource = CachedHttpResource('the_url', http_session, ttl=60)
+
+    with pytest.raises(UnexpectedStatusError) as error:
+        resource.get()
+    assert error.value.status_code == 404
@@ -0,0 +1,148 @@
+"""
+    Unit tests for the ConfigRegistry.py main file
+"""
+import json
+import shutil
+from types import MappingProxyType
+from unittest.mock import patch, mock_open, Mock
+import pytest
+from sources.utils.ConfigRegistry import ConfigRegistry, CONFIG_DIR, CONFIG_SCHEMAS, freeze
+
+
+@pytest.fixture(autouse=True)
+def clear_config_registry():
+    """
+        The registry is shared by the whole app: start and end each test with no file loaded.
+    """
+    ConfigRegistry.clear()
+    yield
+    ConfigRegistry.clear()
+
+
+def test_get_reads_file_once():
+    """
+        Test that a configuration file is read on first use only, and shared afterwards
+    """
+    with patch("builtins.open", new_callable=mock_open, read_data='{"projectId": "the_project_id"}') as mock_file:
+        config_1 = ConfigRegistry.get("github")
+        config_2 = ConfigRegistry.get("github")
+    mock_file.assert_called_once()
+    assert config_1 is config_2
+    assert config_1["projectId"] == "the_project_id"
+
+
+def test_freeze():
+    """
+        Test that frozen configurations cannot be modified, at any depth
+    """
+    config = freeze(json.loads('{"assigneeList": {"name": "login"}, "ips": ["1.2.3.4"]}'))
+    assert isinstance(config["assigneeList"], MappingProxyType)
+    assert config["ips"] == ("1.2.3.4",)
+    with pytest.raises(TypeError):
+        config["assigneeList"]["name"] = "other_login"
+
+
+def test_validate_repository_configuration():
+    """
+        Test that the configuration files of the repository are valid
+    """
+    ConfigRegistry.validate()
+
+
+def test_validate_invalid_configuration():
+    """
+        Test that missing keys and keys of the wrong type are all reported
+    """
+    configs = {
+        "app": freeze({"port": "3000"}),
+        "github": freeze({}),
+        "slack": freeze({}),
+        "apps": freeze({"appList": {}, "envList": []}),
+        "notion": freeze({"release-note-db-id": "the_id"})
+    }
+    with patch.object(ConfigRegistry, "get", side_effect=configs.get):
+        with pytest.raises(ValueError) as error:
+            ConfigRegistry.validate()
+    assert "app.json: port must be of type int" in str(error.value)
+    assert "github.json: missing key projectId" in str(error.value)
+    assert "apps.json: envList must be of type dict" in str(error.value)
+    assert "notion.json" not in str(error.value)
+
+
+@pytest.fixture(name="config_dir")
+def fixture_config_dir(tmp_path):
+    """
+        Copies the configuration files of the repository to a temporary folder used by the registry.
+    """
+    for name in CONFIG_SCHEMAS:
+        shutil.copy(CONFIG_DIR / f"{name}.json", tmp_path / f"{name}.json")
+    with patch("sources.utils.ConfigRegistry.CONFIG_DIR", tmp_path):
+        yield tmp_path
+
+
+def update_config_file(config_dir, name, **values):
+    """
+        Overwrites keys of a configuration file
+    """
+    with open(config_dir / f"{name}.json", encoding='utf-8') as file_config:
+        content = json.load(file_config)
+    content.update(values)
+    with open(config_dir / f"{name}.json", "w", encoding='utf-8') as file_config:
+        json.dump(content, file_config)
+
+
+def test_reload(config_dir):
+    """
+        Test that a reload replaces the configuration and calls the reload listeners
+    """
+    listener = Mock()
+    ConfigRegistry.add_reload_listener(listener)
+    assert ConfigRegistry.get("github")["assigneeList"] != {"name": "new_login"}
+
+    update_config_file(config_dir, "github", assigneeList={"name": "new_login"})
+    reloaded = ConfigRegistry.reload()
+
+    assert "github" in reloaded
+    assert ConfigRegistry.get("github")["assigneeList"] == {"name": "new_login"}
+    listener.assert_called_once()
+
+
+def test_reload_invalid_configuration(config_dir):
+    """
+        Test that an invalid configuration is not loaded, and that the current one is kept
+    """
+    listener = Mock()
+    ConfigRegistry.add_reload_listener(listener)
+    project_id = ConfigRegistry.get("github")["projectId"]
+
+    update_config_file(config_dir, "github", projectId=1234)
+    with pytest.raises(ValueError):
+        ConfigRegistry.reload()
+
+    assert ConfigRegistry.get("github")["projectId"] == project_id
+    listener.assert_not_called()
+
+
+@pytest.mark.usefixtures("config_dir")
+def test_reload_listener_weak_reference():
+    """
+        Test that registering a bound method does not keep its object alive
+    """
+    class Component():
+        """
+            Component refreshing its configuration on reload
+        """
+        reloads = 0
+
+        def reload_config(self):
+            """
+                Counts the reloads
+            """
+            Component.reloads += 1
+
+    component = Component()
+    ConfigRegistry.add_reload_listener(component.reload_config)
+    ConfigRegistry.reload()
+    del component
+    ConfigRegistry.reload()
+    assert Component.reloads == 1
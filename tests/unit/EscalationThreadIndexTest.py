@@ -0,0 +1,39 @@
+"""
+    Unit tests for the EscalationThreadIndex.py main file
+"""
+from sources.utils.EscalationThreadIndex import EscalationThreadIndex
+
+
+def test_record_and_get(tmp_path):
+    """
+        Test that a recorded thread is returned for its node ID, and unknown node IDs return None
+    """
+    escalation_thread_index = EscalationThreadIndex(tmp_path / "index.sqlite3")
+    escalation_thread_index.record('the_node_id', 1234, 'the_channel', 'the_ts', 'the_text')
+
+    assert escalation_thread_index.get('the_node_id') == {"channel": 'the_channel', "ts": 'the_ts', "text": 'the_text'}
+    assert escalation_thread_index.get('other_node_id') is None
+
+
+def test_update_text(tmp_path):
+    """
+        Test that the text of an indexed thread can be updated, and persists across instances
+    """
+    escalation_thread_index = EscalationThreadIndex(tmp_path / "index.sqlite3")
+    escalation_thread_index.record('the_node_id', 1234, 'the_channel', 'the_ts', 'the_text')
+    assert escalation_thread_index.update_text('the_node_id', 'the_new_text', 'the_text')
+
+    assert EscalationThreadIndex(tmp_path / "index.sqlite3").get('the_node_id')['text'] == 'the_new_text'
+
+
+def test_update_text_expected(tmp_path):
+    """
+        Test that the text of an indexed thread is not updated if it is not the expected one anymore
+    """
+    escalation_thread_index = EscalationThreadIndex(tmp_path / "index.sqlite3")
+    escalation_thread_index.record('the_node_id', 1234, 'the_channel', 'the_ts', 'the_text')
+    assert escalation_thread_index.update_text('the_node_id', 'the_new_text', 'the_text')
+
+    assert not EscalationThreadIndex(tmp_path / "index.sqlite3").update_text('the_node_id', 'other_text', 'the_text')
+    assert not escalation_thread_index.update_text('other_node_id', 'the_new_text', 'the_text')
+    assert escalation_thread_index.get('the_node_id')['text'] == 'the_new_text'
@@ -0,0 +1,39 @@
+"""
+    Unit tests for the ExpiringValue.py utility
+"""
+from unittest.mock import Mock
+from sources.utils.ExpiringValue import ExpiringValue
+
+
+def test_get_held_until_expiry():
+    """
+        Test that the value is loaded once, and loaded again once expired
+    """
+    expiring_value = ExpiringValue()
+    load = Mock(side_effect=[('first', 10), ('second', 20)])
+    assert expiring_value.get(0, load) == 'first'
+    assert expiring_value.get(9, load) == 'first'
+    assert expiring_value.get(10, load) == 'second'
+    assert load.call_count == 2
+
+
+def test_get_not_held_without_expiry():
+    """
+        Test that a value loaded without expiry is loaded again on next call
+    """
+    expiring_value = ExpiringValue()
+    load = Mock(side_effect=[([], None), (['sprint'], 10)])
+    assert expiring_value.get(0, load) == []
+    assert expiring_value.get(0, load) == ['sprint']
+
+
+def test_clear():
+    """
+        Test that a cleared value is loaded again
+    """
+    expiring_value = ExpiringValue()
+    load = Mock(return_value=('value', 10))
+    expiring_value.get(0, load)
+    expiring_value.clear()
+    expiring_value.get(0, load)
+    assert load.call_count == 2
@@ -3,11 +3,25 @@
 """
 
 import json
+import threading
 from pathlib import Path
-from unittest.mock import patch, ANY
+from unittest.mock import patch, ANY, call
 import gql
+from graphql import print_ast
+from gql.transport.exceptions import TransportQueryError, TransportServerError
+import pytest
 from freezegun import freeze_time
 from sources.factories.GithubGQLCallFactory import GithubGQLCallFactory
+from sources.utils.GithubRateLimiter import GithubRateLimiter, PRIORITY_LOW
+
+
+@pytest.fixture(autouse=True)
+def clear_caches():
+    """
+        The login -> ID and sprint caches are shared by all factories: start each test with empty caches.
+    """
+    GithubGQLCallFactory.clear_user_id_cache()
+    GithubGQLCallFactory.invalidate_sprint_cache()
 
 # pylint: disable=unused-argument
 
@@ -18,7 +32,7 @@ def mock_send_gql_request_login(*args, **kwargs):
     """
     assert 'app_context' == args[0]
     assert args[2]['login'] == 'the_test_login'
-    assert args[1] == gql.gql(
+    assert print_ast(args[1]) == print_ast(gql.gql(
             """
             query userIDfromLogin($login: String!) {
                 user(login: $login) {
@@ -26,7 +40,7 @@ def mock_send_gql_request_login(*args, **kwargs):
                 }
             }
             """
-        )
+        ))
 
 
 def mock_send_gql_request_set_current_sprint(*args, **kwargs):
@@ -38,7 +52,7 @@ def mock_send_gql_request_set_current_sprint(*args, **kwargs):
     assert args[2]['fieldMutation']['projectId'] == 'the_project_id'
     assert args[2]['fieldMutation']['fieldId'] == 'the_field_id'
     assert args[2]['fieldMutation']['value'] == {'iterationId': 'the_iteration_id'}
-    assert args[1] == gql.gql(
+    assert print_ast(args[1]) == print_ast(gql.gql(
             """
             mutation SetValueToProjectV2TaskField($fieldMutation: UpdateProjectV2ItemFieldValueInput!) {
                 updateProjectV2ItemFieldValue(input: $fieldMutation) {
@@ -46,7 +60,7 @@ def mock_send_gql_request_set_current_sprint(*args, **kwargs):
                 }
             }
         """
-        )
+        ))
 
 
 def mock_send_gql_request_create_task_mandatory(*args, **kwargs):
@@ -56,7 +70,7 @@ def mock_send_gql_request_create_task_mandatory(*args, **kwargs):
     assert 'app_context' == args[0]
     assert args[2]['task']['title'] == 'the_title'
     assert args[2]['task']['body'] == 'the_body'
-    assert args[1] == gql.gql(
+    assert print_ast(args[1]) == print_ast(gql.gql(
             """
             mutation CreateProjectV2Task($task: AddProjectV2DraftIssueInput!) {
                 addProjectV2DraftIssue(input: $task) {
@@ -70,7 +84,7 @@ def mock_send_gql_request_create_task_mandatory(*args, **kwargs):
                 }
             }
         """
-    )
+    ))
     return {"addProjectV2DraftIssue": {"projectItem": {"id": "the_item_id"}}}
 
 
@@ -82,7 +96,7 @@ def mock_send_gql_request_create_task_assignee(*args, **kwargs):
     assert args[2]['task']['title'] == 'the_title'
     assert args[2]['task']['body'] == 'the_body'
     assert args[2]['task']['assigneeIds'] == ['the_user_id']
-    assert args[1] == gql.gql(
+    assert print_ast(args[1]) == print_ast(gql.gql(
             """
             mutation CreateProjectV2Task($task: AddProjectV2DraftIssueInput!) {
                 addProjectV2DraftIssue(input: $task) {
@@ -96,7 +110,7 @@ def mock_send_gql_request_create_task_assignee(*args, **kwargs):
                 }
             }
         """
-    )
+    ))
     return {"addProjectV2DraftIssue": {"projectItem": {"id": "the_item_id"}}}
 
 
@@ -108,7 +122,7 @@ def mock_send_gql_request_create_task_no_assignee(*args, **kwargs):
     assert args[2]['task']['title'] == 'the_title'
     assert args[2]['task']['body'] == 'the_body'
     assert 'assigneeIds' not in args[2]['task']
-    assert args[1] == gql.gql(
+    assert print_ast(args[1]) == print_ast(gql.gql(
             """
             mutation CreateProjectV2Task($task: AddProjectV2DraftIssueInput!) {
                 addProjectV2DraftIssue(input: $task) {
@@ -122,7 +136,7 @@ def mock_send_gql_request_create_task_no_assignee(*args, **kwargs):
                 }
             }
         """
-    )
+    ))
     return {"addProjectV2DraftIssue": {"projectItem": {"id": "the_item_id"}}}
 
 
@@ -154,13 +168,6 @@ def mock_get_user_id_from_login(*args, **kwargs):
     return 'the_user_id'
 
 
-def mock_set_task_to_current_sprint(*args, **kwargs):
-    """
-        Mock for the set_task_to_current_sprint method to check the passed project item
-    """
-    assert 'the_item_id' == args[1]
-
-
 def mock_send_gql_request_get_iterations(*args, **kwargs):
     """
         Mock the send_sql_request to query sprint iterations.
@@ -182,37 +189,99 @@ def test_get_user_id_from_login(mock_sendrequest):
     mock_sendrequest.assert_called_once()
 
 
+@patch.object(GithubGQLCallFactory, "_GithubGQLCallFactory__send_gql_request", return_value={'user': {'id': 'the_id'}})
+def test_get_user_id_from_login_cached(mock_sendrequest):
+    """
+        Test that the ID of a login is requested once, and shared by all factories
+    """
+    assert GithubGQLCallFactory().get_user_id_from_login('app_context', 'the_login') == 'the_id'
+    assert GithubGQLCallFactory().get_user_id_from_login('app_context', 'the_login') == 'the_id'
+    mock_sendrequest.assert_called_once()
+
+
+@patch.object(GithubGQLCallFactory, "_GithubGQLCallFactory__send_gql_request",
+              side_effect=TransportQueryError("Could not resolve to a User", errors=[{'type': 'NOT_FOUND'}],
+                                              data={'user': None}))
+def test_get_user_id_from_login_unknown_cached(mock_sendrequest):
+    """
+        Test that an unknown login returns None, and is not requested again
+    """
+    github_gql_call_factory = GithubGQLCallFactory()
+    assert github_gql_call_factory.get_user_id_from_login('app_context', 'unknown_login') is None
+    assert github_gql_call_factory.get_user_id_from_login('app_context', 'unknown_login') is None
+    mock_sendrequest.assert_called_once()
+
+
+@patch.object(GithubGQLCallFactory, "_GithubGQLCallFactory__send_gql_request",
+              side_effect=TransportQueryError("Something went wrong", errors=[{'type': 'FORBIDDEN'}]))
+def test_get_user_id_from_login_error_not_cached(mock_sendrequest):
+    """
+        Test that errors other than unknown logins are raised and not cached
+    """
+    github_gql_call_factory = GithubGQLCallFactory()
+    for _ in range(2):
+        with pytest.raises(TransportQueryError):
+            github_gql_call_factory.get_user_id_from_login('app_context', 'the_login')
+    assert mock_sendrequest.call_count == 2
+
+
+@patch.object(GithubGQLCallFactory, "_GithubGQLCallFactory__send_gql_request",
+              side_effect=TransportQueryError("Could not resolve to a User", errors=[{'type': 'NOT_FOUND'}],
+                                              data={'user0': {'id': 'id_0'}, 'user1': None}))
+def test_resolve_user_ids(mock_sendrequest):
+    """
+        Test that several logins are resolved in a single aliased query, and then served from the cache
+    """
+    github_gql_call_factory = GithubGQLCallFactory()
+    result = github_gql_call_factory.resolve_user_ids('app_context', ['login_0', 'unknown_login', 'login_0'])
+
+    assert result == {'login_0': 'id_0', 'unknown_login': None}
+    mock_sendrequest.assert_called_once_with('app_context', ANY, {'login0': 'login_0', 'login1': 'unknown_login'})
+    assert 'user1: user(login: $login1)' in print_ast(mock_sendrequest.call_args[0][1])
+
+    assert github_gql_call_factory.get_user_id_from_login('app_context', 'login_0') == 'id_0'
+    assert github_gql_call_factory.get_user_id_from_login('app_context', 'unknown_login') is None
+    mock_sendrequest.assert_called_once()
+
+
+@patch.object(GithubGQLCallFactory, "_GithubGQLCallFactory__send_gql_request")
+def test_warm_up_user_id_cache(mock_sendrequest):
+    """
+        Test that the warm-up resolves the whole assignee list in a single request
+    """
+    github_gql_call_factory = GithubGQLCallFactory()
+    logins = list(github_gql_call_factory.github_config['assigneeList'].values())
+    mock_sendrequest.return_value = {f"user{index}": {'id': f"id_{index}"} for index in range(len(logins))}
+
+    github_gql_call_factory.warm_up_user_id_cache('app_context')
+    assert github_gql_call_factory.get_user_id_from_login('app_context', logins[-1]) == f"id_{len(logins) - 1}"
+    mock_sendrequest.assert_called_once()
+
+
 @patch.object(GithubGQLCallFactory, "get_current_sprint_id", side_effect=mock_get_current_sprint_id)
 @patch.object(GithubGQLCallFactory, "_GithubGQLCallFactory__send_gql_request",
               side_effect=mock_send_gql_request_set_current_sprint)
-def test_set_task_to_current_sprint(mock_sendrequest, mock_getsprint):
+def test_set_task_field_value_current_sprint(mock_sendrequest, mock_getsprint):
     """
-        Test set_task_to_current_sprint with dummy values
+        Test set_task_field_value with the current sprint field value and dummy values
     """
     github_gql_call_factory = GithubGQLCallFactory()
-    github_gql_call_factory.github_config['projectId'] = 'the_project_id'
-    github_gql_call_factory.github_config['sprintFieldId'] = 'the_field_id'
-    github_gql_call_factory.set_task_to_current_sprint('app_context', 'the_project_item_id')
+    github_gql_call_factory.github_config = {**github_gql_call_factory.github_config, 'projectId': 'the_project_id'}
+    github_gql_call_factory.github_config = {**github_gql_call_factory.github_config, 'sprintFieldId': 'the_field_id'}
+    github_gql_call_factory.set_task_field_value('app_context', 'the_project_item_id',
+                                                 *github_gql_call_factory.get_current_sprint_field_value('app_context'))
     mock_sendrequest.assert_called_once()
     mock_getsprint.assert_called_once()
 
 
 @patch.object(GithubGQLCallFactory, "get_current_sprint_id", side_effect=mock_get_current_sprint_id_none)
-@patch.object(GithubGQLCallFactory, "_GithubGQLCallFactory__send_gql_request")
-def test_set_task_to_current_sprint_not_found(mock_sendrequest, mock_getsprint):
+def test_get_current_sprint_field_value_not_found(mock_getsprint):
     """
-        Test set_task_to_current_sprint when the sprint is not found
+        Test get_current_sprint_field_value when the sprint is not found
     """
     github_gql_call_factory = GithubGQLCallFactory()
-    github_gql_call_factory.github_config['projectId'] = 'the_project_id'
-    github_gql_call_factory.github_config['sprintFieldId'] = 'the_field_id'
-    error_caught = False
-    try:
-        github_gql_call_factory.set_task_to_current_sprint('app_context', 'the_project_item_id')
-    except ValueError:
-        error_caught = True
-    assert error_caught
-    mock_sendrequest.assert_not_called()
+    with pytest.raises(ValueError):
+        github_gql_call_factory.get_current_sprint_field_value('app_context')
     mock_getsprint.assert_called_once()
 
 
@@ -223,7 +292,7 @@ def test_create_github_task_mandatory(mock_sendrequest):
         Test create_github_task with mandatory fields
     """
     github_gql_call_factory = GithubGQLCallFactory()
-    github_gql_call_factory.github_config['projectId'] = 'the_project_id'
+    github_gql_call_factory.github_config = {**github_gql_call_factory.github_config, 'projectId': 'the_project_id'}
     task_params = {"title": "the_title", "body": "the_body"}
     github_gql_call_factory.create_github_task('app_context', task_params)
     mock_sendrequest.assert_called_once()
@@ -234,7 +303,7 @@ def test_create_github_task_missing_title():
         Test create_github_task with missing mandatory fields
     """
     github_gql_call_factory = GithubGQLCallFactory()
-    github_gql_call_factory.github_config['projectId'] = 'the_project_id'
+    github_gql_call_factory.github_config = {**github_gql_call_factory.github_config, 'projectId': 'the_project_id'}
     task_params = {"body": "the_body"}
     error_caught = False
     try:
@@ -249,7 +318,7 @@ def test_create_github_task_missing_body():
         Test create_github_task with missing mandatory fields
     """
     github_gql_call_factory = GithubGQLCallFactory()
-    github_gql_call_factory.github_config['projectId'] = 'the_project_id'
+    github_gql_call_factory.github_config = {**github_gql_call_factory.github_config, 'projectId': 'the_project_id'}
     task_params = {"title": "the_title"}
     error_caught = False
     try:
@@ -266,7 +335,7 @@ def test_create_github_task_handle_immediately_true(mock_sendrequest):
         Test create_github_task with request to handle immediately
     """
     github_gql_call_factory = GithubGQLCallFactory()
-    github_gql_call_factory.github_config['projectId'] = 'the_project_id'
+    github_gql_call_factory.github_config = {**github_gql_call_factory.github_config, 'projectId': 'the_project_id'}
     task_params = {"title": "the_title", "body": "the_body", "handle_immediately": True}
     github_gql_call_factory.create_github_task('app_context', task_params)
     mock_sendrequest.assert_called_once()
@@ -274,32 +343,28 @@ def test_create_github_task_handle_immediately_true(mock_sendrequest):
 
 @patch.object(GithubGQLCallFactory, "_GithubGQLCallFactory__send_gql_request",
               side_effect=mock_send_gql_request_create_task_mandatory)
-@patch.object(GithubGQLCallFactory, "set_task_to_current_sprint", side_effect=mock_set_task_to_current_sprint)
-def test_create_github_task_handle_immediately_false(mock_setcurrentsprint, mock_sendrequest):
+def test_create_github_task_handle_immediately_false(mock_sendrequest):
     """
         Test create_github_task with missing mandatory fields
     """
     github_gql_call_factory = GithubGQLCallFactory()
-    github_gql_call_factory.github_config['projectId'] = 'the_project_id'
+    github_gql_call_factory.github_config = {**github_gql_call_factory.github_config, 'projectId': 'the_project_id'}
     task_params = {"title": "the_title", "body": "the_body", "handle_immediately": False}
     github_gql_call_factory.create_github_task('app_context', task_params)
     mock_sendrequest.assert_called_once()
-    mock_setcurrentsprint.assert_not_called()
 
 
-@patch.object(GithubGQLCallFactory, "set_task_to_current_sprint", side_effect=mock_set_task_to_current_sprint)
 @patch.object(GithubGQLCallFactory, "_GithubGQLCallFactory__send_gql_request",
               side_effect=mock_send_gql_request_create_task_error)
-def test_create_github_task_handle_immediately_error(mock_sendrequest, mock_setcurrentsprint):
+def test_create_github_task_handle_immediately_error(mock_sendrequest):
     """
         Test create_github_task with request to handle immediately but the task creation fails
     """
     github_gql_call_factory = GithubGQLCallFactory()
-    github_gql_call_factory.github_config['projectId'] = 'the_project_id'
+    github_gql_call_factory.github_config = {**github_gql_call_factory.github_config, 'projectId': 'the_project_id'}
     task_params = {"title": "the_title", "body": "the_body", "handle_immediately": True}
     github_gql_call_factory.create_github_task('app_context', task_params)
     mock_sendrequest.assert_called_once()
-    mock_setcurrentsprint.assert_not_called()
 
 
 @patch.object(GithubGQLCallFactory, "_GithubGQLCallFactory__send_gql_request",
@@ -309,7 +374,7 @@ def test_create_github_task_assignee_filled(mock_sendrequest):
         Test create_github_task with an assignee
     """
     github_gql_call_factory = GithubGQLCallFactory()
-    github_gql_call_factory.github_config['projectId'] = 'the_project_id'
+    github_gql_call_factory.github_config = {**github_gql_call_factory.github_config, 'projectId': 'the_project_id'}
     task_params = {"title": "the_title", "body": "the_body", "assigneeIds": ['the_user_id']}
     github_gql_call_factory.create_github_task('app_context', task_params)
     mock_sendrequest.assert_called_once()
@@ -324,7 +389,7 @@ def test_create_github_task_no_assignee(mock_sendrequest, mock_login):
         Test create_github_task with assignee set to no-assignee
     """
     github_gql_call_factory = GithubGQLCallFactory()
-    github_gql_call_factory.github_config['projectId'] = 'the_project_id'
+    github_gql_call_factory.github_config = {**github_gql_call_factory.github_config, 'projectId': 'the_project_id'}
     task_params = {"title": "the_title", "body": "the_body", "assignee": 'no-assignee'}
     github_gql_call_factory.create_github_task('app_context', task_params)
     mock_sendrequest.assert_called_once()
@@ -399,7 +464,8 @@ def test_set_task_field_value(mock_sendrequest):
         'statusFieldId': status_field_id,
         'initialStatusValue': initial_status_value
     }
-    github_gql_call_factory.set_task_to_initial_status('app_context', project_item_id)
+    github_gql_call_factory.set_task_field_value('app_context', project_item_id,
+                                                 *github_gql_call_factory.get_initial_status_field_value())
 
     expected_params = {
         'fieldMutation': {
@@ -411,3 +477,237 @@ def test_set_task_field_value(mock_sendrequest):
         }
     }
     mock_sendrequest.assert_called_once_with('app_context', ANY, expected_params)
+
+
+@patch("sources.factories.GithubGQLCallFactory.gql.Client")
+@patch("sources.factories.GithubGQLCallFactory.SharedSessionTransport")
+@patch.object(GithubGQLCallFactory, "_GithubGQLCallFactory__get_github_access_token", return_value='the_token')
+def test_send_gql_request_reuses_session(_mock_gettoken, mock_transport, mock_client):
+    """
+        Test that the GQL client and transport are created once and reused for all requests
+    """
+    mock_client.return_value.connect_sync.return_value.execute.return_value = {'user': {'id': 'the_id'}}
+
+    github_gql_call_factory = GithubGQLCallFactory()
+    github_gql_call_factory.get_user_id_from_login('app_context', 'login_1')
+    github_gql_call_factory.get_user_id_from_login('app_context', 'login_2')
+
+    mock_transport.assert_called_once()
+    mock_client.assert_called_once()
+    mock_client.return_value.connect_sync.assert_called_once()
+    assert mock_client.return_value.connect_sync.return_value.execute.call_count == 2
+
+
+@patch("sources.factories.GithubGQLCallFactory.gql.Client")
+@patch("sources.factories.GithubGQLCallFactory.SharedSessionTransport")
+@patch.object(GithubGQLCallFactory, "_GithubGQLCallFactory__get_github_access_token", return_value='the_token')
+def test_send_gql_request_session_per_thread(_mock_gettoken, mock_transport, mock_client):
+    """
+        Test that each thread sends its requests through its own GQL session and transport
+    """
+    mock_client.return_value.connect_sync.return_value.execute.return_value = {'user': {'id': 'the_id'}}
+
+    github_gql_call_factory = GithubGQLCallFactory()
+    github_gql_call_factory.get_user_id_from_login('app_context', 'login_1')
+    thread = threading.Thread(target=github_gql_call_factory.get_user_id_from_login, args=('app_context', 'login_2'))
+    thread.start()
+    thread.join()
+
+    assert mock_transport.call_count == 2
+    assert mock_client.return_value.connect_sync.call_count == 2
+
+
+@patch("sources.factories.GithubGQLCallFactory.gql.Client")
+@patch("sources.factories.GithubGQLCallFactory.SharedSessionTransport")
+@patch.object(GithubGQLCallFactory, "_GithubGQLCallFactory__get_github_access_token", return_value='the_token')
+def test_send_gql_request_reconnects_on_auth_failure(_mock_gettoken, _mock_transport, mock_client):
+    """
+        Test that the GQL session is recreated and the request sent again after an authentication failure
+    """
+    mock_client.return_value.connect_sync.return_value.client = mock_client.return_value
+    mock_client.return_value.connect_sync.return_value.execute.side_effect = [
+        TransportServerError('Bad credentials', 401),
+        {'user': {'id': 'the_id'}}
+    ]
+
+    github_gql_call_factory = GithubGQLCallFactory()
+    result = github_gql_call_factory.get_user_id_from_login('app_context', 'the_login')
+
+    assert result == 'the_id'
+    assert mock_client.call_count == 2
+    mock_client.return_value.close_sync.assert_called_once()
+
+
+@patch("sources.factories.GithubGQLCallFactory.gql.Client")
+@patch("sources.factories.GithubGQLCallFactory.SharedSessionTransport")
+@patch.object(GithubGQLCallFactory, "_GithubGQLCallFactory__get_github_access_token", return_value='the_token')
+def test_send_gql_request_server_error_not_retried(_mock_gettoken, _mock_transport, mock_client):
+    """
+        Test that server errors unrelated to authentication are raised without reconnecting
+    """
+    mock_client.return_value.connect_sync.return_value.execute.side_effect = TransportServerError('Bad gateway', 502)
+
+    github_gql_call_factory = GithubGQLCallFactory()
+    with pytest.raises(TransportServerError):
+        github_gql_call_factory.get_user_id_from_login('app_context', 'the_login')
+    mock_client.assert_called_once()
+
+
+@patch.object(GithubRateLimiter, "acquire")
+@patch.object(GithubRateLimiter, "is_limited", return_value=True)
+@patch("sources.factories.GithubGQLCallFactory.gql.Client")
+@patch("sources.factories.GithubGQLCallFactory.SharedSessionTransport")
+@patch.object(GithubGQLCallFactory, "_GithubGQLCallFactory__get_github_access_token", return_value='the_token')
+def test_send_gql_request_rate_limited(_mock_gettoken, _mock_transport, mock_client, _mock_is_limited, mock_acquire):
+    """
+        Test that a request rejected by the rate limit is sent again once allowed, without reconnecting
+    """
+    mock_client.return_value.connect_sync.return_value.execute.side_effect = [
+        TransportServerError('Rate limited', 403),
+        {'node': {'databaseId': 123}}
+    ]
+
+    github_gql_call_factory = GithubGQLCallFactory()
+    result = github_gql_call_factory.get_project_item_for_update('app_context', 'the_node_id')
+
+    assert result == {'databaseId': 123}
+    mock_client.assert_called_once()
+    assert mock_acquire.call_args_list == [call(PRIORITY_LOW), call(PRIORITY_LOW)]
+
+
+@patch.object(GithubGQLCallFactory, "_GithubGQLCallFactory__send_gql_request")
+def test_set_task_fields_values(mock_sendrequest):
+    """
+        Test that several fields are set with a single aliased mutation
+    """
+    github_gql_call_factory = GithubGQLCallFactory()
+    github_gql_call_factory.github_config = {'projectId': 'the_project_id'}
+    github_gql_call_factory.set_task_fields_values('app_context', 'the_item_id', [
+        ('the_status_field_id', {'singleSelectOptionId': 'the_status_id'}),
+        ('the_sprint_field_id', {'iterationId': 'the_iteration_id'})
+    ])
+
+    expected_params = {
+        'fieldMutation0': {
+            'clientMutationId': 'my_key',
+            'projectId': 'the_project_id',
+            'itemId': 'the_item_id',
+            'fieldId': 'the_status_field_id',
+            'value': {'singleSelectOptionId': 'the_status_id'}
+        },
+        'fieldMutation1': {
+            'clientMutationId': 'my_key',
+            'projectId': 'the_project_id',
+            'itemId': 'the_item_id',
+            'fieldId': 'the_sprint_field_id',
+            'value': {'iterationId': 'the_iteration_id'}
+        }
+    }
+    mock_sendrequest.assert_called_once_with('app_context', ANY, expected_params)
+    mutation = mock_sendrequest.call_args[0][1]
+    assert print_ast(mutation) == print_ast(gql.gql(
+        """
+        mutation SetValuesToProjectV2TaskFields($fieldMutation0: UpdateProjectV2ItemFieldValueInput!,
+                                                $fieldMutation1: UpdateProjectV2ItemFieldValueInput!) {
+            field0: updateProjectV2ItemFieldValue(input: $fieldMutation0) { clientMutationId }
+            field1: updateProjectV2ItemFieldValue(input: $fieldMutation1) { clientMutationId }
+        }
+        """
+    ))
+
+
+@patch.object(GithubGQLCallFactory, "_GithubGQLCallFactory__send_gql_request")
+def test_set_task_fields_values_empty(mock_sendrequest):
+    """
+        Test that no request is sent when there is no field to set
+    """
+    github_gql_call_factory = GithubGQLCallFactory()
+    github_gql_call_factory.set_task_fields_values('app_context', 'the_item_id', [])
+    mock_sendrequest.assert_not_called()
+
+
+@patch.object(GithubGQLCallFactory, "_GithubGQLCallFactory__send_gql_request",
+              side_effect=mock_send_gql_request_get_iterations)
+def test_get_current_sprint_id_cached(mock_sendrequest):
+    """
+        Test that the sprints are retrieved once while the current sprint is not over
+    """
+    github_gql_call_factory = GithubGQLCallFactory()
+    with freeze_time('2023-07-30 20:00:00'):
+        assert '8824dd79' == github_gql_call_factory.get_current_sprint_id('app_context')
+    with freeze_time('2023-07-30 23:59:00'):
+        assert '8824dd79' == github_gql_call_factory.get_current_sprint_id('app_context')
+    mock_sendrequest.assert_called_once()
+
+
+@patch.object(GithubGQLCallFactory, "_GithubGQLCallFactory__send_gql_request",
+              side_effect=mock_send_gql_request_get_iterations)
+def test_get_current_sprint_id_cache_expires_at_sprint_end(mock_sendrequest):
+    """
+        Test that the sprints are retrieved again once the current sprint is over
+    """
+    github_gql_call_factory = GithubGQLCallFactory()
+    with freeze_time('2023-07-30 23:00:00'):
+        assert '8824dd79' == github_gql_call_factory.get_current_sprint_id('app_context')
+    with freeze_time('2023-07-31 00:00:01'):
+        assert 'd8a8bb1d' == github_gql_call_factory.get_current_sprint_id('app_context')
+    assert mock_sendrequest.call_count == 2
+
+
+@patch.object(GithubGQLCallFactory, "_GithubGQLCallFactory__send_gql_request",
+              side_effect=mock_send_gql_request_get_iterations)
+def test_get_current_sprint_id_cache_max_ttl(mock_sendrequest):
+    """
+        Test that the sprints are retrieved again after the maximum TTL, even within the same sprint
+    """
+    github_gql_call_factory = GithubGQLCallFactory()
+    github_gql_call_factory.github_config = {**github_gql_call_factory.github_config, 'sprintCacheMaxTtlSeconds': 3600}
+    with freeze_time('2023-07-27 10:00:00'):
+        github_gql_call_factory.get_current_sprint_id('app_context')
+    with freeze_time('2023-07-27 10:30:00'):
+        github_gql_call_factory.get_current_sprint_id('app_context')
+    mock_sendrequest.assert_called_once()
+    with freeze_time('2023-07-27 11:00:01'):
+        github_gql_call_factory.get_current_sprint_id('app_context')
+    assert mock_sendrequest.call_count == 2
+
+
+@freeze_time('2023-07-27')
+@patch.object(GithubGQLCallFactory, "_GithubGQLCallFactory__send_gql_request",
+              side_effect=mock_send_gql_request_get_iterations)
+def test_invalidate_sprint_cache(mock_sendrequest):
+    """
+        Test that the sprints are cached for all factories, and that invalidating the cache forces them to be
+        retrieved again
+    """
+    GithubGQLCallFactory().get_current_sprint_id('app_context')
+    GithubGQLCallFactory().get_current_sprint_id('app_context')
+    assert mock_sendrequest.call_count == 1
+    GithubGQLCallFactory.invalidate_sprint_cache()
+    GithubGQLCallFactory().get_current_sprint_id('app_context')
+    assert mock_sendrequest.call_count == 2
+
+
+@patch.object(GithubGQLCallFactory, "_GithubGQLCallFactory__send_gql_request",
+              return_value={'toto': 'tata'})
+def test_get_current_sprint_id_error_not_cached(mock_sendrequest):
+    """
+        Test that an unreadable answer from the GitHub API is not cached
+    """
+    github_gql_call_factory = GithubGQLCallFactory()
+    assert github_gql_call_factory.get_current_sprint_id('app_context') is None
+    assert github_gql_call_factory.get_current_sprint_id('app_context') is None
+    assert mock_sendrequest.call_count == 2
+
+
+@freeze_time('2024-07-27')
+@patch.object(GithubGQLCallFactory, "_GithubGQLCallFactory__send_gql_request",
+              side_effect=mock_send_gql_request_get_iterations)
+def test_get_current_sprint_id_no_upcoming_not_cached(mock_sendrequest):
+    """
+        Test that the sprints are not cached when there is no current or upcoming sprint
+    """
+    github_gql_call_factory = GithubGQLCallFactory()
+    assert github_gql_call_factory.get_current_sprint_id('app_context') is None
+    assert github_gql_call_factory.get_current_sprint_id('app_context') is None
+    assert mock_sendrequest.call_count == 2
@@ -0,0 +1,29 @@
+"""
+    Unit tests for the GithubGQLDocuments.py main file
+"""
+import pytest
+from sources.factories import GithubGQLDocuments
+
+
+def test_get_document_parsed_once():
+    """
+        Test that the same parsed document is returned on each call
+    """
+    assert GithubGQLDocuments.get_document("user_id_from_login") is GithubGQLDocuments.get_document("user_id_from_login")
+
+
+def test_preload_documents():
+    """
+        Test that all registered documents are valid GraphQL documents
+    """
+    GithubGQLDocuments.preload_documents()
+    for name in GithubGQLDocuments.GITHUB_GQL_SOURCES:
+        assert GithubGQLDocuments.get_document(name).definitions
+
+
+def test_get_document_unknown():
+    """
+        Test that requesting an unregistered document raises a KeyError
+    """
+    with pytest.raises(KeyError):
+        GithubGQLDocuments.get_document("unknown_document")
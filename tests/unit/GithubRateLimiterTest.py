@@ -0,0 +1,88 @@
+"""
+    Unit tests for the GithubRateLimiter.py main file
+"""
+import time
+from unittest.mock import patch
+import pytest
+from freezegun import freeze_time
+from sources.utils.GithubRateLimiter import GithubRateLimiter, GithubRateLimitedError, PRIORITY_HIGH, PRIORITY_LOW
+
+
+def get_headers(remaining, reset_in=600):
+    """
+        Returns the rate limit headers of a GitHub response
+    """
+    return {
+        "x-ratelimit-limit": "5000",
+        "x-ratelimit-remaining": str(remaining),
+        "x-ratelimit-used": str(5000 - remaining),
+        "x-ratelimit-reset": str(int(time.time()) + reset_in)
+    }
+
+
+@patch.object(time, 'sleep')
+def test_acquire_budget_available(mock_sleep):
+    """
+        Test that no request is delayed while the budget is above the threshold
+    """
+    with freeze_time('2023-07-27 10:00:00'):
+        rate_limiter = GithubRateLimiter(low_priority_threshold=500)
+        rate_limiter.update(get_headers(4000))
+        rate_limiter.acquire(PRIORITY_LOW)
+        rate_limiter.acquire(PRIORITY_HIGH)
+    mock_sleep.assert_not_called()
+    assert rate_limiter.get_stats()["remaining"] == 4000
+
+
+@patch.object(time, 'sleep')
+def test_acquire_low_budget_rejects_low_priority(mock_sleep):
+    """
+        Test that only low priority requests are rejected until the reset when the budget is below the threshold,
+        without waiting
+    """
+    with freeze_time('2023-07-27 10:00:00'):
+        rate_limiter = GithubRateLimiter(low_priority_threshold=500)
+        rate_limiter.update(get_headers(100, reset_in=600))
+        rate_limiter.acquire(PRIORITY_HIGH)
+        with pytest.raises(GithubRateLimitedError) as error:
+            rate_limiter.acquire(PRIORITY_LOW)
+    mock_sleep.assert_not_called()
+    assert error.value.wait == 600
+    assert rate_limiter.get_stats()["throttled"] == 1
+
+
+@patch.object(time, 'sleep')
+def test_acquire_exhausted_budget_delays_all(mock_sleep):
+    """
+        Test that all requests wait for the reset when the budget is exhausted
+    """
+    with freeze_time('2023-07-27 10:00:00'):
+        rate_limiter = GithubRateLimiter()
+        rate_limiter.update(get_headers(0, reset_in=300))
+        assert rate_limiter.is_limited()
+        rate_limiter.acquire(PRIORITY_HIGH)
+    mock_sleep.assert_called_once_with(300)
+
+
+@patch.object(time, 'sleep')
+def test_acquire_retry_after(mock_sleep):
+    """
+        Test that a secondary rate limit delays all requests for its Retry-After duration
+    """
+    with freeze_time('2023-07-27 10:00:00'):
+        rate_limiter = GithubRateLimiter()
+        rate_limiter.update({"Retry-After": "60"})
+        rate_limiter.acquire(PRIORITY_HIGH)
+    mock_sleep.assert_called_once_with(60)
+    assert rate_limiter.get_stats()["secondary_rate_limited"] == 1
+
+
+def test_update_ignores_missing_headers():
+    """
+        Test that responses without rate limit headers leave the state unknown
+    """
+    rate_limiter = GithubRateLimiter()
+    rate_limiter.update({})
+    rate_limiter.update(None)
+    assert rate_limiter.get_stats()["remaining"] is None
+    assert not rate_limiter.is_limited()
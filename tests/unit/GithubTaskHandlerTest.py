@@ -3,11 +3,25 @@
 """
 
 from unittest.mock import patch, call, ANY, Mock
+import pytest
+import requests
+from flask import Flask
 from sources.handlers.GithubTaskHandler import GithubTaskHandler
 from sources.factories.GithubGQLCallFactory import GithubGQLCallFactory
 from sources.models.InitGithubTaskParam import InitGithubTaskParam
 from sources.models.CreatedGithubTaskParam import CreatedGithubTaskParam
 from sources.factories.SlackMessageFactory import SlackMessageFactory
+from sources.utils.EscalationThreadIndex import EscalationThreadIndex
+
+
+@pytest.fixture(autouse=True, name="escalation_thread_index")
+def fixture_escalation_thread_index(tmp_path):
+    """
+        Gives each test an empty escalation thread index
+    """
+    escalation_thread_index = EscalationThreadIndex(tmp_path / "escalation_threads.sqlite3")
+    with patch.object(EscalationThreadIndex, "get_instance", return_value=escalation_thread_index):
+        yield escalation_thread_index
 
 
 # pylint: disable=unused-argument
@@ -26,9 +40,9 @@ def mock_request_search_message_no_match(*args, **kwargs):
 
 @patch.object(GithubGQLCallFactory, "create_github_task",
               return_value=CreatedGithubTaskParam("the_project_item_id", 1234, 104))
-@patch.object(GithubGQLCallFactory, "set_task_to_initial_status")
-@patch.object(GithubGQLCallFactory, "set_task_to_current_sprint")
-def test_init_github_task_mandatory(mock_setsprint, mock_setstatus, mock_createtask):
+@patch.object(GithubGQLCallFactory, "set_task_fields_values")
+@patch.object(GithubGQLCallFactory, "get_current_sprint_id", return_value="the_iteration_id")
+def test_init_github_task_mandatory(mock_getsprint, mock_setfields, mock_createtask):
     """
         Test init_github_task with mandatory fields
     """
@@ -36,15 +50,52 @@ def test_init_github_task_mandatory(mock_setsprint, mock_setstatus, mock_createt
     task_params = InitGithubTaskParam(title="the_title", body="the_body")
     github_task_handler.init_github_task('app_context', task_params)
     mock_createtask.assert_called_once()
-    mock_setstatus.assert_called_once()
-    mock_setsprint.assert_not_called()
+    mock_setfields.assert_called_once()
+    mock_getsprint.assert_not_called()
 
 
+@patch.object(SlackMessageFactory, "post_message")
 @patch.object(GithubGQLCallFactory, "create_github_task",
               return_value=CreatedGithubTaskParam("the_project_item_id", 1234, 104))
-@patch.object(GithubGQLCallFactory, "set_task_to_initial_status")
-@patch.object(GithubGQLCallFactory, "set_task_to_current_sprint")
-def test_init_github_task_missing_title(mock_setsprint, mock_setstatus, mock_createtask):
+@patch.object(GithubGQLCallFactory, "set_task_fields_values")
+def test_init_github_task_on_created(mock_setfields, mock_createtask, mock_post_message):
+    """
+        Test that on_created receives the created task before the Slack notification
+    """
+    github_task_handler = GithubTaskHandler()
+    events = []
+    mock_post_message.side_effect = lambda *args: events.append("post_message")
+    task_params = InitGithubTaskParam(title="the_title", body="the_body", initiator="the_initiator")
+    github_task_handler.init_github_task('app_context', task_params, on_created=events.append)
+
+    assert events == [mock_createtask.return_value, "post_message"]
+    mock_setfields.assert_called_once()
+
+
+@patch.object(SlackMessageFactory, "post_message")
+@patch.object(GithubGQLCallFactory, "create_github_task")
+@patch.object(GithubGQLCallFactory, "set_task_fields_values")
+def test_init_github_task_already_created(mock_setfields, mock_createtask, mock_post_message):
+    """
+        Test that a task already created by a previous attempt is not created again
+    """
+    github_task_handler = GithubTaskHandler()
+    on_created = Mock()
+    task_params = InitGithubTaskParam(title="the_title", body="the_body", initiator="the_initiator")
+    github_task_handler.init_github_task('app_context', task_params,
+                                         CreatedGithubTaskParam("the_project_item_id", 1234, 104), on_created)
+
+    mock_createtask.assert_not_called()
+    on_created.assert_not_called()
+    mock_post_message.assert_called_once()
+    assert mock_setfields.call_args[0][1] == "the_project_item_id"
+
+
+@patch.object(GithubGQLCallFactory, "create_github_task",
+              return_value=CreatedGithubTaskParam("the_project_item_id", 1234, 104))
+@patch.object(GithubGQLCallFactory, "set_task_fields_values")
+@patch.object(GithubGQLCallFactory, "get_current_sprint_id", return_value="the_iteration_id")
+def test_init_github_task_missing_title(mock_getsprint, mock_setfields, mock_createtask):
     """
         Test init_github_task with missing mandatory fields
     """
@@ -57,16 +108,16 @@ def test_init_github_task_missing_title(mock_setsprint, mock_setstatus, mock_cre
         error_caught = True
     assert error_caught
 
-    mock_setsprint.assert_not_called()
-    mock_setstatus.assert_not_called()
+    mock_getsprint.assert_not_called()
+    mock_setfields.assert_not_called()
     mock_createtask.assert_not_called()
 
 
 @patch.object(GithubGQLCallFactory, "create_github_task",
               return_value=CreatedGithubTaskParam("the_project_item_id", 1234, 104))
-@patch.object(GithubGQLCallFactory, "set_task_to_initial_status")
-@patch.object(GithubGQLCallFactory, "set_task_to_current_sprint")
-def test_init_github_task_missing_body(mock_setsprint, mock_setstatus, mock_createtask):
+@patch.object(GithubGQLCallFactory, "set_task_fields_values")
+@patch.object(GithubGQLCallFactory, "get_current_sprint_id", return_value="the_iteration_id")
+def test_init_github_task_missing_body(mock_getsprint, mock_setfields, mock_createtask):
     """
         Test init_github_task with missing mandatory fields
     """
@@ -79,16 +130,16 @@ def test_init_github_task_missing_body(mock_setsprint, mock_setstatus, mock_crea
         error_caught = True
     assert error_caught
 
-    mock_setsprint.assert_not_called()
-    mock_setstatus.assert_not_called()
+    mock_getsprint.assert_not_called()
+    mock_setfields.assert_not_called()
     mock_createtask.assert_not_called()
 
 
 @patch.object(GithubGQLCallFactory, "create_github_task",
               return_value=CreatedGithubTaskParam("the_project_item_id", 1234, 104))
-@patch.object(GithubGQLCallFactory, "set_task_to_initial_status")
-@patch.object(GithubGQLCallFactory, "set_task_to_current_sprint")
-def test_init_github_task_handle_immediately_true(mock_setsprint, mock_setstatus, mock_createtask):
+@patch.object(GithubGQLCallFactory, "set_task_fields_values")
+@patch.object(GithubGQLCallFactory, "get_current_sprint_id", return_value="the_iteration_id")
+def test_init_github_task_handle_immediately_true(mock_getsprint, mock_setfields, mock_createtask):
     """
         Test init_github_task with handle_immetiatley option to True
     """
@@ -96,15 +147,15 @@ def test_init_github_task_handle_immediately_true(mock_setsprint, mock_setstatus
     task_params = InitGithubTaskParam(title='the_title', body='the_body', handle_immediately=True)
     github_task_handler.init_github_task('app_context', task_params)
     mock_createtask.assert_called_once()
-    mock_setstatus.assert_called_once()
-    mock_setsprint.assert_called_once()
+    mock_setfields.assert_called_once()
+    mock_getsprint.assert_called_once()
 
 
 @patch.object(GithubGQLCallFactory, "create_github_task",
               return_value=CreatedGithubTaskParam("the_project_item_id", 1234, 104))
-@patch.object(GithubGQLCallFactory, "set_task_to_initial_status")
-@patch.object(GithubGQLCallFactory, "set_task_to_current_sprint")
-def test_init_github_task_handle_immediately_false(mock_setsprint, mock_setstatus, mock_createtask):
+@patch.object(GithubGQLCallFactory, "set_task_fields_values")
+@patch.object(GithubGQLCallFactory, "get_current_sprint_id", return_value="the_iteration_id")
+def test_init_github_task_handle_immediately_false(mock_getsprint, mock_setfields, mock_createtask):
     """
         Test init_github_task with handle_immetiatley option to True
     """
@@ -112,14 +163,34 @@ def test_init_github_task_handle_immediately_false(mock_setsprint, mock_setstatu
     task_params = InitGithubTaskParam(title='the_title', body='the_body', handle_immediately=False)
     github_task_handler.init_github_task('app_context', task_params)
     mock_createtask.assert_called_once()
-    mock_setstatus.assert_called_once()
-    mock_setsprint.assert_not_called()
+    mock_setfields.assert_called_once()
+    mock_getsprint.assert_not_called()
+
+
+@patch.object(GithubGQLCallFactory, "create_github_task",
+              return_value=CreatedGithubTaskParam("the_project_item_id", 1234, 104))
+@patch.object(GithubGQLCallFactory, "set_task_fields_values")
+@patch.object(GithubGQLCallFactory, "get_current_sprint_id", return_value=None)
+def test_init_github_task_handle_immediately_no_sprint(mock_getsprint, mock_setfields, mock_createtask):
+    """
+        Test init_github_task with handle_immediately option to True but no current sprint:
+        the initial status must still be set, then the error is raised.
+    """
+    github_task_handler = GithubTaskHandler()
+    task_params = InitGithubTaskParam(title='the_title', body='the_body', handle_immediately=True)
+    app = Flask('test')
+    with pytest.raises(ValueError):
+        github_task_handler.init_github_task(app.app_context(), task_params)
+    github_config = github_task_handler.github_config
+    mock_setfields.assert_called_once_with(ANY, "the_project_item_id", [
+        (github_config['statusFieldId'], {'singleSelectOptionId': github_config['initialStatusValue']})
+    ])
 
 
 @patch.object(GithubGQLCallFactory, "create_github_task", return_value=None)
-@patch.object(GithubGQLCallFactory, "set_task_to_initial_status")
-@patch.object(GithubGQLCallFactory, "set_task_to_current_sprint")
-def test_init_github_task_handle_immediately_error(mock_setsprint, mock_setstatus, mock_createtask):
+@patch.object(GithubGQLCallFactory, "set_task_fields_values")
+@patch.object(GithubGQLCallFactory, "get_current_sprint_id", return_value="the_iteration_id")
+def test_init_github_task_handle_immediately_error(mock_getsprint, mock_setfields, mock_createtask):
     """
         Test init_github_task with request to handle immediately but the task creation fails
     """
@@ -127,16 +198,16 @@ def test_init_github_task_handle_immediately_error(mock_setsprint, mock_setstatu
     task_params = InitGithubTaskParam(title='the_title', body='the_body', handle_immediately=True)
     github_task_handler.init_github_task('app_context', task_params)
     mock_createtask.assert_called_once()
-    mock_setsprint.assert_not_called()
-    mock_setstatus.assert_not_called()
+    mock_getsprint.assert_not_called()
+    mock_setfields.assert_not_called()
 
 
 @patch.object(GithubGQLCallFactory, "create_github_task",
               return_value=CreatedGithubTaskParam("the_project_item_id", 1234, 104))
-@patch.object(GithubGQLCallFactory, "set_task_to_initial_status")
-@patch.object(GithubGQLCallFactory, "set_task_to_current_sprint")
+@patch.object(GithubGQLCallFactory, "set_task_fields_values")
+@patch.object(GithubGQLCallFactory, "get_current_sprint_id", return_value="the_iteration_id")
 @patch.object(GithubGQLCallFactory, "get_user_id_from_login", return_value='the_user_id')
-def test_init_github_task_assignee_filled(mock_getuser, mock_setsprint, mock_setstatus, mock_createtask):
+def test_init_github_task_assignee_filled(mock_getuser, mock_getsprint, mock_setfields, mock_createtask):
     """
         Test init_github_task with an assignee
     """
@@ -144,17 +215,17 @@ def test_init_github_task_assignee_filled(mock_getuser, mock_setsprint, mock_set
     task_params = InitGithubTaskParam(title='the_title', body='the_body', assignee='the_assignee')
     github_task_handler.init_github_task('app_context', task_params)
     mock_createtask.assert_called_once()
-    mock_setstatus.assert_called_once()
-    mock_setsprint.assert_not_called()
+    mock_setfields.assert_called_once()
+    mock_getsprint.assert_not_called()
     mock_getuser.assert_called_once()
 
 
 @patch.object(GithubGQLCallFactory, "create_github_task",
               return_value=CreatedGithubTaskParam("the_project_item_id", 1234, 104))
-@patch.object(GithubGQLCallFactory, "set_task_to_initial_status")
-@patch.object(GithubGQLCallFactory, "set_task_to_current_sprint")
+@patch.object(GithubGQLCallFactory, "set_task_fields_values")
+@patch.object(GithubGQLCallFactory, "get_current_sprint_id", return_value="the_iteration_id")
 @patch.object(GithubGQLCallFactory, "get_user_id_from_login", return_value='the_user_id')
-def test_init_github_task_no_assignee(mock_getuser, mock_setsprint, mock_setstatus, mock_createtask):
+def test_init_github_task_no_assignee(mock_getuser, mock_getsprint, mock_setfields, mock_createtask):
     """
         Test init_github_task with specifically no assignees
     """
@@ -162,18 +233,18 @@ def test_init_github_task_no_assignee(mock_getuser, mock_setsprint, mock_setstat
     task_params = InitGithubTaskParam(title="the_title", body="the_body", assignee='no-assignee')
     github_task_handler.init_github_task('app_context', task_params)
     mock_createtask.assert_called_once()
-    mock_setstatus.assert_called_once()
-    mock_setsprint.assert_not_called()
+    mock_setfields.assert_called_once()
+    mock_getsprint.assert_not_called()
     mock_getuser.assert_not_called()
 
 
 @patch.object(GithubGQLCallFactory, "create_github_task",
               return_value=CreatedGithubTaskParam("the_project_item_id", 1234, 104))
-@patch.object(GithubGQLCallFactory, "set_task_to_initial_status")
-@patch.object(GithubGQLCallFactory, "set_task_to_current_sprint")
+@patch.object(GithubGQLCallFactory, "set_task_fields_values")
+@patch.object(GithubGQLCallFactory, "get_current_sprint_id", return_value="the_iteration_id")
 @patch.object(GithubGQLCallFactory, "get_user_id_from_login", return_value='the_user_id')
 @patch.object(SlackMessageFactory, "post_message")
-def test_init_github_task_dm_initiator(mock_post_message, mock_getuser, mock_setsprint, mock_setstatus, mock_createtask):
+def test_init_github_task_dm_initiator(mock_post_message, mock_getuser, mock_getsprint, mock_setfields, mock_createtask):
     """
         Test init_github_task with an initiator so that he is DMed
     """
@@ -185,11 +256,11 @@ def test_init_github_task_dm_initiator(mock_post_message, mock_getuser, mock_set
 
 @patch.object(GithubGQLCallFactory, "create_github_task",
               return_value=CreatedGithubTaskParam("the_project_item_id", 1234, 104))
-@patch.object(GithubGQLCallFactory, "set_task_to_initial_status")
-@patch.object(GithubGQLCallFactory, "set_task_to_current_sprint")
+@patch.object(GithubGQLCallFactory, "set_task_fields_values")
+@patch.object(GithubGQLCallFactory, "get_current_sprint_id", return_value="the_iteration_id")
 @patch.object(GithubGQLCallFactory, "get_user_id_from_login", return_value='the_user_id')
 @patch.object(SlackMessageFactory, "post_message")
-def test_init_github_task_no_initiator(mock_post_message, mock_getuser, mock_setsprint, mock_setstatus, mock_createtask):
+def test_init_github_task_no_initiator(mock_post_message, mock_getuser, mock_getsprint, mock_setfields, mock_createtask):
     """
         Test init_github_task with specifically no initiator
     """
@@ -201,10 +272,9 @@ def test_init_github_task_no_initiator(mock_post_message, mock_getuser, mock_set
 
 @patch.object(GithubGQLCallFactory, "create_github_task",
               return_value=CreatedGithubTaskParam("the_project_item_id", 1234, 104))
-@patch.object(GithubGQLCallFactory, "set_task_to_initial_status")
-@patch.object(GithubGQLCallFactory, "set_task_to_current_sprint")
+@patch.object(GithubGQLCallFactory, "set_task_fields_values")
+@patch.object(GithubGQLCallFactory, "get_current_sprint_id", return_value="the_iteration_id")
 @patch.object(GithubGQLCallFactory, "get_user_id_from_login", return_value='the_user_id')
-@patch.object(GithubGQLCallFactory, "set_task_to_dev_team_escalation_type")
 @patch.object(SlackMessageFactory, "post_message", return_value={
                                                                 "ok": True,
                                                                 "channel": "C123ABC456",
@@ -228,8 +298,8 @@ def test_init_github_task_no_initiator(mock_post_message, mock_getuser, mock_set
 @patch.object(SlackMessageFactory, "post_reply")
 @patch.object(SlackMessageFactory, "get_channel", return_value='the_escalation_channel')
 # pylint: disable-next=too-many-arguments
-def test_init_github_task_dev_team_escalation(mock_getchannel, mock_post_reply, mock_post_message, mock_settasktype,
-                                              mock_getuser, mock_setsprint, mock_setstatus, mock_createtask):
+def test_init_github_task_dev_team_escalation(mock_getchannel, mock_post_reply, mock_post_message,
+                                              mock_getuser, mock_getsprint, mock_setfields, mock_createtask):
     """
         Test init_github_task with the dev-team-escalation flow ot check the type is set
         and the public message is sent on Slack
@@ -245,17 +315,25 @@ def test_init_github_task_dev_team_escalation(mock_getchannel, mock_post_reply,
     call_post_reply = [call('app_context', 'C123ABC456', "1503435956.000247", "the_body")]
     mock_post_reply.assert_has_calls(call_post_reply)
 
-    call_set_task_type = [call('app_context', "the_project_item_id")]
-    mock_settasktype.assert_has_calls(call_set_task_type)
+    github_config = github_task_handler.github_config
+    mock_setfields.assert_called_once_with('app_context', "the_project_item_id", [
+        (github_config['statusFieldId'], {'singleSelectOptionId': github_config['initialStatusValue']}),
+        (github_config['sprintFieldId'], {'iterationId': 'the_iteration_id'}),
+        (github_config['typeFieldId'], {'singleSelectOptionId': github_config['dev-team-escalationStatusValue']})
+    ])
+
+    assert github_task_handler.escalation_thread_index.get("the_project_item_id") == {
+        "channel": "C123ABC456", "ts": "1503435956.000247", "text": "Here's a message for you"}
 
     mock_createtask.assert_called_once()
-    mock_setstatus.assert_called_once()
-    mock_setsprint.assert_called_once()
+    mock_getsprint.assert_called_once()
 
 
-@patch.object(GithubGQLCallFactory, "get_project_item_for_update", return_value={"typeField": {"name": "dev-team-escalation"}})
-@patch.object(GithubGQLCallFactory, "get_dev_team_escalation_item_update",
+@patch.object(GithubGQLCallFactory, "get_project_item_for_update",
               return_value={
+                "typeField": {
+                    "name": "dev-team-escalation"
+                },
                 "column": {
                     "name": "In Progress"
                 },
@@ -318,7 +396,6 @@ def test_init_github_task_dev_team_escalation(mock_getchannel, mock_post_reply,
 @patch.object(SlackMessageFactory, 'post_reply')
 # pylint: disable-next=too-many-arguments
 def test_process_update_dev_team_escalation_full(mock_post_reply, mock_edit_message, mock_search_message,
-                                                 mock_get_dev_team_escalation_item_update,
                                                  mock_get_project_item_for_update):
     """
         Test process_update with the dev-team-escalation flow
@@ -326,9 +403,8 @@ def test_process_update_dev_team_escalation_full(mock_post_reply, mock_edit_mess
     github_task_handler = GithubTaskHandler()
     github_task_handler.process_update('app_context', ('the_node_id'))
 
-    call_get_project_item = [call('app_context', 'the_node_id')]
-    mock_get_project_item_for_update.assert_has_calls(call_get_project_item)
-    mock_get_dev_team_escalation_item_update.assert_has_calls(call_get_project_item)
+    # A single GitHub read for the flow selection and the flow itself
+    mock_get_project_item_for_update.assert_called_once_with('app_context', 'the_node_id')
     call_search_message = [call('app_context', 'itemId=123456 in:wpmedia_dev-team-escalation from:tbtt')]
     mock_search_message.assert_has_calls(call_search_message)
     call_edit_message = [call('app_context', 'C12345678', '1508795665.000236',
@@ -337,9 +413,11 @@ def test_process_update_dev_team_escalation_full(mock_post_reply, mock_edit_mess
     mock_post_reply.assert_called_once()
 
 
-@patch.object(GithubGQLCallFactory, "get_project_item_for_update", return_value={"typeField": {"name": "dev-team-escalation"}})
-@patch.object(GithubGQLCallFactory, "get_dev_team_escalation_item_update",
+@patch.object(GithubGQLCallFactory, "get_project_item_for_update",
               return_value={
+                "typeField": {
+                    "name": "dev-team-escalation"
+                },
                 "column": {
                     "name": "In Progress"
                 },
@@ -402,7 +480,6 @@ def test_process_update_dev_team_escalation_full(mock_post_reply, mock_edit_mess
 @patch.object(SlackMessageFactory, 'post_reply')
 # pylint: disable-next=too-many-arguments
 def test_process_update_dev_team_escalation_no_update(mock_post_reply, mock_edit_message, mock_search_message,
-                                                      mock_get_dev_team_escalation_item_update,
                                                       mock_get_project_item_for_update):
     """
         Test process_update with the dev-team-escalation flow
@@ -412,7 +489,6 @@ def test_process_update_dev_team_escalation_no_update(mock_post_reply, mock_edit
 
     call_get_project_item = [call('app_context', 'the_node_id')]
     mock_get_project_item_for_update.assert_has_calls(call_get_project_item)
-    mock_get_dev_team_escalation_item_update.assert_has_calls(call_get_project_item)
     call_search_message = [call('app_context', 'itemId=123456 in:wpmedia_dev-team-escalation from:tbtt')]
     mock_search_message.assert_has_calls(call_search_message)
 
@@ -421,9 +497,11 @@ def test_process_update_dev_team_escalation_no_update(mock_post_reply, mock_edit
     """
 
 
-@patch.object(GithubGQLCallFactory, "get_project_item_for_update", return_value={"typeField": {"name": "dev-team-escalation"}})
-@patch.object(GithubGQLCallFactory, "get_dev_team_escalation_item_update",
+@patch.object(GithubGQLCallFactory, "get_project_item_for_update",
               return_value={
+                "typeField": {
+                    "name": "dev-team-escalation"
+                },
                 "column": {
                     "name": "In Progress"
                 },
@@ -483,7 +561,6 @@ def test_process_update_dev_team_escalation_no_update(mock_post_reply, mock_edit
 @patch.object(SlackMessageFactory, 'post_reply')
 # pylint: disable-next=too-many-arguments
 def test_process_update_dev_team_escalation_no_assignees(mock_post_reply, mock_edit_message, mock_search_message,
-                                                         mock_get_dev_team_escalation_item_update,
                                                          mock_get_project_item_for_update):
     """
         Test process_update with the dev-team-escalation flow
@@ -493,7 +570,6 @@ def test_process_update_dev_team_escalation_no_assignees(mock_post_reply, mock_e
 
     call_get_project_item = [call('app_context', 'the_node_id')]
     mock_get_project_item_for_update.assert_has_calls(call_get_project_item)
-    mock_get_dev_team_escalation_item_update.assert_has_calls(call_get_project_item)
     call_search_message = [call('app_context', 'itemId=123456 in:wpmedia_dev-team-escalation from:tbtt')]
     mock_search_message.assert_has_calls(call_search_message)
     call_edit_message = [call('app_context', 'C12345678', '1508795665.000236',
@@ -502,9 +578,11 @@ def test_process_update_dev_team_escalation_no_assignees(mock_post_reply, mock_e
     mock_post_reply.assert_called_once()
 
 
-@patch.object(GithubGQLCallFactory, "get_project_item_for_update", return_value={"typeField": {"name": "dev-team-escalation"}})
-@patch.object(GithubGQLCallFactory, "get_dev_team_escalation_item_update",
+@patch.object(GithubGQLCallFactory, "get_project_item_for_update",
               return_value={
+                "typeField": {
+                    "name": "dev-team-escalation"
+                },
                 "column": {
                     "name": "In Progress"
                 },
@@ -515,18 +593,18 @@ def test_process_update_dev_team_escalation_no_assignees(mock_post_reply, mock_e
                     }
                 }
               })
-@patch('sources.factories.SlackMessageFactory.requests')
+@patch.object(requests.Session, 'post')
 @patch.object(SlackMessageFactory, '_get_slack_user_token', return_value='the_token')
 @patch.object(SlackMessageFactory, 'edit_message')
 @patch.object(SlackMessageFactory, 'post_reply')
 # pylint: disable-next=too-many-arguments
 def test_process_update_dev_team_escalation_no_messages(mock_post_reply, mock_edit_message, mock_slack_user_token,
-                                                        mock_request, mock_get_dev_team_escalation_item_update,
+                                                        mock_request,
                                                         mock_get_project_item_for_update):
     """
         Test process_update with the dev-team-escalation flow
     """
-    mock_request.post.side_effect = mock_request_search_message_no_match
+    mock_request.side_effect = mock_request_search_message_no_match
 
     github_task_handler = GithubTaskHandler()
     error_caught = False
@@ -538,8 +616,164 @@ def test_process_update_dev_team_escalation_no_messages(mock_post_reply, mock_ed
 
     call_get_project_item = [call('app_context', 'the_node_id')]
     mock_get_project_item_for_update.assert_has_calls(call_get_project_item)
-    mock_get_dev_team_escalation_item_update.assert_has_calls(call_get_project_item)
-    mock_request.post.assert_called_once()
+    mock_request.assert_called_once()
     mock_edit_message.assert_not_called()
     mock_post_reply.assert_not_called()
+
+
+@patch.object(GithubGQLCallFactory, "get_project_item_for_update",
+              return_value={
+                "typeField": {
+                    "name": "dev-team-escalation"
+                },
+                "column": {
+                    "name": "In Progress"
+                },
+                "databaseId": 123456,
+                "draftIssue": {
+                    "assignees": {
+                        "nodes": None
+                    }
+                }
+              })
+@patch.object(SlackMessageFactory, 'search_message')
+@patch.object(SlackMessageFactory, 'edit_message')
+@patch.object(SlackMessageFactory, 'post_reply')
+# pylint: disable-next=too-many-arguments
+def test_process_update_dev_team_escalation_indexed(mock_post_reply, mock_edit_message, mock_search_message,
+                                                    mock_get_project_item_for_update, escalation_thread_index):
+    """
+        Test process_update with the dev-team-escalation flow when the thread is in the index: Slack is not searched
+    """
+    escalation_thread_index.record('the_node_id', 123456, 'C12345678', '1508795665.000236',
+                                   'The first line\nStatus: Todo\nAssignees: No one.')
+
+    github_task_handler = GithubTaskHandler()
+    app_context = Flask('test').app_context()
+    github_task_handler.process_update(app_context, ('the_node_id'))
+    github_task_handler.process_update(app_context, ('the_node_id'))
+
+    mock_search_message.assert_not_called()
+    mock_edit_message.assert_called_once_with(app_context, 'C12345678', '1508795665.000236',
+                                              'The first line\nStatus: In Progress\nAssignees: No one.')
+    mock_post_reply.assert_called_once()
+    assert escalation_thread_index.get('the_node_id')['text'] == 'The first line\nStatus: In Progress\nAssignees: No one.'
+
+
+@patch.object(GithubGQLCallFactory, "get_project_item_for_update",
+              return_value={
+                "typeField": {
+                    "name": "dev-team-escalation"
+                },
+                "column": {
+                    "name": "In Progress"
+                },
+                "databaseId": 123456,
+                "draftIssue": {
+                    "assignees": {
+                        "nodes": None
+                    }
+                }
+              })
+@patch.object(GithubTaskHandler, 'get_escalation_thread',
+              return_value={"channel": "C12345678", "ts": "1508795665.000236",
+                            "text": "The first line\nStatus: Todo\nAssignees: No one."})
+@patch.object(SlackMessageFactory, 'edit_message')
+@patch.object(SlackMessageFactory, 'post_reply')
+# pylint: disable-next=too-many-arguments
+def test_process_update_dev_team_escalation_already_sent(mock_post_reply, mock_edit_message, _mock_get_thread,
+                                                         _mock_get_project_item_for_update, escalation_thread_index):
+    """
+        Test process_update with the dev-team-escalation flow when another instance already sent the update after the
+        thread was read: the message is not edited nor replied to again
+    """
+    escalation_thread_index.record('the_node_id', 123456, 'C12345678', '1508795665.000236',
+                                   'The first line\nStatus: In Progress\nAssignees: No one.')
+
+    github_task_handler = GithubTaskHandler()
+    github_task_handler.process_update(Flask('test').app_context(), ('the_node_id'))
+
+    mock_edit_message.assert_not_called()
+    mock_post_reply.assert_not_called()
+
+
+@patch.object(GithubGQLCallFactory, "get_project_item_for_update",
+              return_value={
+                "typeField": {
+                    "name": "dev-team-escalation"
+                },
+                "column": {
+                    "name": "In Progress"
+                },
+                "databaseId": 123456,
+                "draftIssue": {
+                    "assignees": {
+                        "nodes": None
+                    }
+                }
+              })
+@patch.object(SlackMessageFactory, 'edit_message', side_effect=ValueError('Slack error'))
+@patch.object(SlackMessageFactory, 'post_reply')
+def test_process_update_dev_team_escalation_edit_failed(mock_post_reply, _mock_edit_message,
+                                                        _mock_get_project_item_for_update, escalation_thread_index):
+    """
+        Test process_update with the dev-team-escalation flow when the edit fails: the indexed text is restored, so that
+        the next update edits the message
+    """
+    escalation_thread_index.record('the_node_id', 123456, 'C12345678', '1508795665.000236',
+                                   'The first line\nStatus: Todo\nAssignees: No one.')
+
+    github_task_handler = GithubTaskHandler()
+    with pytest.raises(ValueError):
+        github_task_handler.process_update(Flask('test').app_context(), ('the_node_id'))
+
+    mock_post_reply.assert_not_called()
+    assert escalation_thread_index.get('the_node_id')['text'] == 'The first line\nStatus: Todo\nAssignees: No one.'
+
+
+@patch.object(GithubGQLCallFactory, "get_project_item_for_update",
+              return_value={
+                "typeField": {
+                    "name": "dev-team-escalation"
+                },
+                "column": {
+                    "name": "In Progress"
+                },
+                "databaseId": 123456,
+                "draftIssue": {
+                    "assignees": {
+                        "nodes": None
+                    }
+                }
+              })
+@patch.object(SlackMessageFactory, 'search_message',
+              return_value={
+                "messages": {
+                    "matches": [
+                        {
+                            "channel": {"id": "C12345678"},
+                            "text": "The first line\nStatus: Todo\nAssignees: No one.",
+                            "ts": "1508795665.000236"
+                        }
+                    ],
+                    "total": 1
+                },
+                "ok": True
+              })
+@patch.object(SlackMessageFactory, 'edit_message')
+@patch.object(SlackMessageFactory, 'post_reply')
+# pylint: disable-next=too-many-arguments
+def test_process_update_dev_team_escalation_search_indexed(mock_post_reply, mock_edit_message, mock_search_message,
+                                                           mock_get_project_item_for_update):
+    """
+        Test process_update with the dev-team-escalation flow: a thread found by search is indexed for the next updates
+    """
+    github_task_handler = GithubTaskHandler()
+    app_context = Flask('test').app_context()
+    github_task_handler.process_update(app_context, ('the_node_id'))
+    github_task_handler.process_update(app_context, ('the_node_id'))
+
+    mock_search_message.assert_called_once()
+    mock_edit_message.assert_called_once()
+    mock_post_reply.assert_called_once()
 # pylint: enable=unused-argument
@@ -1,16 +1,37 @@
 """
     Unit tests for the GithubWebhookHandler.py main file
 """
-from threading import Thread
-from unittest.mock import patch
+import threading
+import time
+from unittest.mock import Mock, patch
+import pytest
 from flask import Flask
+from sources.factories.GithubGQLCallFactory import GithubGQLCallFactory
+from sources.factories.NotionFactory import NotionFactory
+from sources.factories.SlackMessageFactory import SlackMessageFactory
+from sources.handlers.GithubTaskHandler import GithubTaskHandler
 from sources.handlers.GithubWebhookHandler import GithubWebhookHandler
+from sources.utils.GithubRateLimiter import GithubRateLimiter, PRIORITY_HIGH
+from sources.utils.JobJournal import JobJournal
+from sources.utils.SlackRateLimiter import SlackRateLimitedError
+from sources.utils.WorkerPool import WorkerPool
+from tests.utils.SynchronousWorkerPool import SynchronousWorkerPool
+from tests.utils.TemporaryStorage import temporary_storage
 
 # pylint: disable=unused-argument
 
 
-@patch.object(Thread, 'start')
-def test_process_project_item_v2_assignee_update(mock_thread_start):
+@pytest.fixture(autouse=True)
+def fixture_storage(tmp_path):
+    """
+        Gives each test an empty job journal and escalation thread index, instead of the ones of the app
+    """
+    with temporary_storage(tmp_path):
+        yield
+
+
+@patch.object(JobJournal, "submit")
+def test_process_project_item_v2_assignee_update(mock_submit):
     """
         Test that an incoming webhook for updated assignee of a project item v2 is processed
     """
@@ -91,11 +112,11 @@ def test_process_project_item_v2_assignee_update(mock_thread_start):
     app = Flask('test')
     with app.app_context():
         github_webhook_handler.process(payload)
-    mock_thread_start.assert_called_once()
+    mock_submit.assert_called_once()
 
 
-@patch.object(Thread, 'start')
-def test_process_project_item_v2_status_update(mock_thread_start):
+@patch.object(JobJournal, "submit")
+def test_process_project_item_v2_status_update(mock_submit):
     """
         Test that an incoming webhook for updated status of a project item v2 is processed
     """
@@ -176,11 +197,11 @@ def test_process_project_item_v2_status_update(mock_thread_start):
     app = Flask('test')
     with app.app_context():
         github_webhook_handler.process(payload)
-    mock_thread_start.assert_called_once()
+    mock_submit.assert_called_once()
 
 
-@patch.object(Thread, 'start')
-def test_process_project_item_v2_irrelevant_update(mock_thread_start):
+@patch.object(JobJournal, "submit")
+def test_process_project_item_v2_irrelevant_update(mock_submit):
     """
         Test that an incoming webhook for update of a not used field of a project item v2 is not processed
     """
@@ -261,11 +282,11 @@ def test_process_project_item_v2_irrelevant_update(mock_thread_start):
     app = Flask('test')
     with app.app_context():
         github_webhook_handler.process(payload)
-    mock_thread_start.assert_not_called()
+    mock_submit.assert_not_called()
 
 
-@patch.object(Thread, 'start')
-def test_process_project_item_v2_creation(mock_thread_start):
+@patch.object(JobJournal, "submit")
+def test_process_project_item_v2_creation(mock_submit):
     """
         Test that an incoming webhook for update of a not used field of a project item v2 is not processed
     """
@@ -340,4 +361,145 @@ def test_process_project_item_v2_creation(mock_thread_start):
     app = Flask('test')
     with app.app_context():
         github_webhook_handler.process(payload)
-    mock_thread_start.assert_not_called()
+    mock_submit.assert_not_called()
+
+
+def get_assignee_update_payload(node_id):
+    """
+        Returns a minimal webhook payload for an updated assignee of a project item v2
+    """
+    return {
+        "action": "edited",
+        "projects_v2_item": {"node_id": node_id},
+        "changes": {"field_value": {"field_node_id": "PVTF_lADOAMEyYM4ASOQZzgLoyz4", "field_type": "assignees"}}
+    }
+
+
+@patch.object(JobJournal, "submit")
+def test_process_duplicated_delivery(mock_submit):
+    """
+        Test that a webhook delivery received twice is processed only once
+    """
+    github_webhook_handler = GithubWebhookHandler()
+    app = Flask('test')
+    with app.app_context():
+        github_webhook_handler.process(get_assignee_update_payload("PVTI_1"), "delivery-1")
+        github_webhook_handler.process(get_assignee_update_payload("PVTI_1"), "delivery-1")
+        github_webhook_handler.process(get_assignee_update_payload("PVTI_2"), "delivery-2")
+    assert mock_submit.call_count == 2
+
+
+@patch.object(JobJournal, "submit")
+def test_process_failed_delivery_can_be_redelivered(mock_submit):
+    """
+        Test that a delivery whose processing failed is processed again when redelivered
+    """
+    github_webhook_handler = GithubWebhookHandler()
+    mock_submit.side_effect = [ValueError('Failure'), 1]
+    app = Flask('test')
+    with app.app_context():
+        with pytest.raises(ValueError):
+            github_webhook_handler.process(get_assignee_update_payload("PVTI_1"), "delivery-1")
+        github_webhook_handler.process(get_assignee_update_payload("PVTI_1"), "delivery-1")
+    assert mock_submit.call_count == 2
+
+
+@patch.object(GithubTaskHandler, "process_update")
+@patch.object(JobJournal, "submit")
+def test_process_project_item_updates_debounced(mock_submit, mock_process_update):
+    """
+        Test that the job of an item is delayed by the debounce window, and that the updates received until it starts
+        are coalesced with it
+    """
+    github_webhook_handler = GithubWebhookHandler()
+    github_webhook_handler.project_item_debounce_seconds = 5
+    app = Flask('test')
+    with app.app_context():
+        github_webhook_handler.process(get_assignee_update_payload("PVTI_1"), "delivery-1")
+        github_webhook_handler.process(get_assignee_update_payload("PVTI_1"), "delivery-2")
+        github_webhook_handler.process(get_assignee_update_payload("PVTI_2"), "delivery-3")
+        assert mock_submit.call_count == 2
+        assert mock_submit.call_args.kwargs["delay"] == 5
+
+        github_webhook_handler.process_project_item_update_job("app_context", "PVTI_1")
+        mock_process_update.assert_called_once_with("app_context", "PVTI_1")
+        github_webhook_handler.process(get_assignee_update_payload("PVTI_1"), "delivery-4")
+    assert mock_submit.call_count == 3
+
+
+@patch.object(GithubTaskHandler, "process_update")
+@patch.object(JobJournal, "submit")
+def test_process_project_item_update_serialized(mock_submit, mock_process_update):
+    """
+        Test that an update received while the job of its item runs does not start another job at the same time,
+        and is processed by a new job once the running one is done
+    """
+    github_webhook_handler = GithubWebhookHandler()
+    app = Flask('test')
+    with app.app_context():
+        mock_process_update.side_effect = lambda *_: github_webhook_handler.process(
+            get_assignee_update_payload("PVTI_1"), "delivery-2")
+        github_webhook_handler.process_project_item_update_job("app_context", "PVTI_1")
+        mock_submit.assert_called_once_with("app_context", 'github_project_item_update', {"node_id": "PVTI_1"},
+                                            delay=github_webhook_handler.project_item_debounce_seconds)
+
+        mock_process_update.side_effect = None
+        github_webhook_handler.process_project_item_update_job("app_context", "PVTI_1")
+        github_webhook_handler.process(get_assignee_update_payload("PVTI_1"), "delivery-3")
+    assert mock_submit.call_count == 2
+    assert mock_process_update.call_count == 2
+
+
+@patch.object(GithubGQLCallFactory, "_GithubGQLCallFactory__get_github_gql_session", return_value=Mock())
+def test_project_item_update_throttled_frees_worker(mock_session, tmp_path):
+    """
+        Test that a project item update throttled by the GitHub rate limit is submitted again after the wait instead
+        of holding the worker, so that a high priority job still runs
+    """
+    job_journal = JobJournal(tmp_path / "journal.sqlite3", WorkerPool(max_workers=1, queue_depth=10))
+    rate_limiter = GithubRateLimiter(low_priority_threshold=500)
+    rate_limiter.update({"x-ratelimit-limit": "5000", "x-ratelimit-remaining": "100",
+                         "x-ratelimit-reset": str(int(time.time()) + 600)})
+    high_priority_done = threading.Event()
+
+    def create_task():
+        rate_limiter.acquire(PRIORITY_HIGH)
+        high_priority_done.set()
+
+    with patch.object(JobJournal, "get_instance", return_value=job_journal), \
+         patch.object(GithubRateLimiter, "get_instance", return_value=rate_limiter):
+        GithubWebhookHandler()
+        app_context = Flask('test').app_context()
+        job_journal.submit(app_context, 'github_project_item_update', {"node_id": "PVTI_1"})
+        job_journal.worker_pool.submit('github_task_creation', create_task)
+        assert high_priority_done.wait(timeout=5)
+
+    mock_session.return_value.execute.assert_not_called()
+    assert [(job_type, params) for _, job_type, params in job_journal.get_pending_jobs()] == [
+        ('github_project_item_update', {"node_id": "PVTI_1"})
+    ]
+    assert rate_limiter.get_stats()["throttled"] == 1
+
+
+@patch.object(NotionFactory, "create_release_note", return_value="https://notion.so/the_release_note")
+@patch.object(SlackMessageFactory, "post_message")
+def test_process_release_job_rate_limited(mock_post_message, mock_create_release_note, tmp_path):
+    """
+        Test that a release job delayed by the Slack rate limit is submitted again after the wait, and that the release
+        note created by the first attempt is not created again
+    """
+    job_journal = JobJournal(tmp_path / "journal.sqlite3", worker_pool=SynchronousWorkerPool())
+    with patch.object(JobJournal, "get_instance", return_value=job_journal):
+        github_webhook_handler = GithubWebhookHandler()
+    mock_post_message.side_effect = [SlackRateLimitedError('chat.postMessage', 30), None]
+    release_params = {"repository_name": "TB-TT", "version": "v1.0.0", "body": "the_body"}
+
+    with patch.object(JobJournal, "_JobJournal__schedule_recorded_job") as mock_schedule:
+        job_journal.submit('app_context', 'github_release', release_params)
+    (_, job, delay), _ = mock_schedule.call_args
+    assert job[2] == {**release_params, "notion_url": "https://notion.so/the_release_note"}
+    assert delay == 30
+
+    github_webhook_handler.process_release_job('app_context', **job[2])
+    mock_create_release_note.assert_called_once()
+    assert mock_post_message.call_count == 2
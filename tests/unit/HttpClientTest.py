@@ -0,0 +1,23 @@
+"""
+    Unit tests for the HttpClient.py main file
+"""
+from sources.utils.HttpClient import HttpClient
+
+
+def test_get_session_shared():
+    """
+        Test that the same session is returned to all callers, so that connections are reused
+    """
+    assert HttpClient.get_session() is HttpClient.get_session()
+
+
+def test_create_session_pool_size():
+    """
+        Test that the created session uses connection pools of the requested size for HTTP and HTTPS
+    """
+    # pylint: disable=protected-access
+    session = HttpClient.create_session(3, 7)
+    for prefix in ('https://', 'http://'):
+        adapter = session.get_adapter(prefix + 'slack.com')
+        assert adapter._pool_connections == 3
+        assert adapter._pool_maxsize == 7
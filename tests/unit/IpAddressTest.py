@@ -0,0 +1,46 @@
+"""
+    Unit tests for the IpAddress.py main file
+"""
+from ipaddress import ip_network
+from sources.utils import IpAddress
+
+
+def test_valid_ip_address():
+    """
+        Test the detection of the IP version
+    """
+    assert IpAddress.valid_ip_address("46.30.211.168") == IpAddress.IP_ADDRESS_IPV4
+    assert IpAddress.valid_ip_address("2a02:2350:4:200::1") == IpAddress.IP_ADDRESS_IPV6
+    assert IpAddress.valid_ip_address("not an IP") == "Invalid"
+
+
+def test_parse_ip_networks():
+    """
+        Test that addresses and ranges are split by IP version, and invalid lines are reported
+    """
+    ipv4_networks, ipv6_networks, invalid_lines = IpAddress.parse_ip_networks(
+        "46.30.211.168\n2400:cb00::/32\n\n173.245.48.1/20\nError: Unable to reach CloudFlare.\n")
+
+    assert ipv4_networks == [ip_network("46.30.211.168/32"), ip_network("173.245.48.0/20")]
+    assert ipv6_networks == [ip_network("2400:cb00::/32")]
+    assert invalid_lines == ["Error: Unable to reach CloudFlare."]
+
+
+def test_collapse_ip_networks():
+    """
+        Test that duplicated, overlapping and adjacent networks are merged and sorted
+    """
+    networks = [ip_network("10.0.1.0/24"), ip_network("5.0.0.1/32"), ip_network("10.0.0.0/24"),
+                ip_network("10.0.1.128/25"), ip_network("5.0.0.1/32")]
+
+    assert IpAddress.collapse_ip_networks(networks) == [ip_network("5.0.0.1/32"), ip_network("10.0.0.0/23")]
+
+
+def test_format_ip_networks():
+    """
+        Test that single hosts are written as addresses and ranges in CIDR notation
+    """
+    networks = [ip_network("5.0.0.1/32"), ip_network("10.0.0.0/23"), ip_network("2a02:2350::1/128")]
+
+    assert IpAddress.format_ip_networks(networks) == "5.0.0.1\n10.0.0.0/23\n2a02:2350::1\n"
+    assert IpAddress.format_ip_networks([]) == ""
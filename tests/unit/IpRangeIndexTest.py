@@ -0,0 +1,45 @@
+"""
+    Unit tests for the IpRangeIndex.py main file
+"""
+from ipaddress import ip_network
+from sources.utils.IpRangeIndex import IpRangeIndex
+
+
+def get_index():
+    """
+        Returns an index over a few IPv4 and IPv6 ranges
+    """
+    return IpRangeIndex([ip_network("173.245.48.0/20"), ip_network("46.30.211.168/32"), ip_network("46.30.211.169/32")],
+                        [ip_network("2400:cb00::/32")])
+
+
+def test_lookup_listed():
+    """
+        Test that addresses within a range are found, including at the range boundaries
+    """
+    ip_range_index = get_index()
+
+    assert ip_range_index.lookup("173.245.48.0") == {"ip": "173.245.48.0", "version": "IPv4", "listed": True,
+                                                     "range": "173.245.48.0/20"}
+    assert ip_range_index.lookup("173.245.63.255")["listed"]
+    assert ip_range_index.lookup("46.30.211.169")["range"] == "46.30.211.168/31"
+    assert ip_range_index.lookup(" 2400:cb00::1 ")["range"] == "2400:cb00::/32"
+
+
+def test_lookup_not_listed():
+    """
+        Test that addresses outside the ranges, of the other IP version, or invalid are not found
+    """
+    ip_range_index = get_index()
+
+    assert not ip_range_index.lookup("173.245.64.0")["listed"]
+    assert not ip_range_index.lookup("1.1.1.1")["listed"]
+    assert not ip_range_index.lookup("::ffff:ad f5:3000")["listed"]
+    assert ip_range_index.lookup("not an IP") == {"ip": "not an IP", "version": "Invalid", "listed": False, "range": None}
+
+
+def test_lookup_empty_index():
+    """
+        Test that an empty index answers without errors
+    """
+    assert not IpRangeIndex([], []).lookup("46.30.211.168")["listed"]
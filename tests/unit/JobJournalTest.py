@@ -0,0 +1,189 @@
+"""
+    Unit tests for the JobJournal.py main file
+"""
+import threading
+from unittest.mock import Mock
+import pytest
+from sources.utils.JobJournal import JobJournal
+from sources.utils.WorkerPool import WorkerPoolSaturatedError
+from tests.utils.SynchronousWorkerPool import SynchronousWorkerPool
+
+
+def test_submit_marks_job_done(tmp_path):
+    """
+        Test that a submitted job is run with its parameters and is not pending anymore afterwards
+    """
+    job_journal = JobJournal(tmp_path / "journal.sqlite3", worker_pool=SynchronousWorkerPool())
+    runner = Mock()
+    job_journal.register_runner('the_job', runner)
+
+    job_journal.submit('app_context', 'the_job', {"node_id": "the_node_id"})
+
+    runner.assert_called_once_with('app_context', node_id='the_node_id')
+    assert job_journal.get_pending_jobs() == []
+
+
+def test_submit_failed_job_not_pending(tmp_path):
+    """
+        Test that a job raising an error is marked failed, and is not replayed
+    """
+    job_journal = JobJournal(tmp_path / "journal.sqlite3", worker_pool=SynchronousWorkerPool())
+    job_journal.register_runner('the_job', Mock(side_effect=ValueError('the_error')))
+
+    with pytest.raises(ValueError):
+        job_journal.submit('app_context', 'the_job', {})
+    assert job_journal.get_pending_jobs() == []
+
+
+def test_submit_unknown_job_type(tmp_path):
+    """
+        Test that a job without registered runner is rejected before being recorded
+    """
+    job_journal = JobJournal(tmp_path / "journal.sqlite3", worker_pool=SynchronousWorkerPool())
+    with pytest.raises(ValueError):
+        job_journal.submit('app_context', 'the_job', {})
+    assert job_journal.get_pending_jobs() == []
+
+
+def test_submit_saturated_job_not_pending(tmp_path):
+    """
+        Test that a job refused by the worker pool is marked failed, so that it is not replayed after the caller retried
+    """
+    worker_pool = Mock()
+    worker_pool.submit.side_effect = WorkerPoolSaturatedError('saturated')
+    job_journal = JobJournal(tmp_path / "journal.sqlite3", worker_pool=worker_pool)
+    job_journal.register_runner('the_job', Mock())
+
+    with pytest.raises(WorkerPoolSaturatedError):
+        job_journal.submit('app_context', 'the_job', {"node_id": "the_node_id"})
+    assert job_journal.get_pending_jobs() == []
+
+
+def test_submit_delayed_job(tmp_path):
+    """
+        Test that a delayed job is recorded right away and run once its delay expired
+    """
+    job_journal = JobJournal(tmp_path / "journal.sqlite3", worker_pool=SynchronousWorkerPool())
+    job_run = threading.Event()
+    runner = Mock(side_effect=lambda app_context, **params: job_run.set())
+    job_journal.register_runner('the_job', runner)
+
+    job_journal.submit('app_context', 'the_job', {"node_id": "the_node_id"}, delay=0.05)
+    runner.assert_not_called()
+    assert len(job_journal.get_pending_jobs()) == 1
+
+    assert job_run.wait(5)
+    runner.assert_called_once_with('app_context', node_id='the_node_id')
+
+
+def test_replay_pending_jobs(tmp_path):
+    """
+        Test that jobs recorded but never executed by a previous instance are replayed by a new one
+    """
+    previous_journal = JobJournal(tmp_path / "journal.sqlite3", worker_pool=Mock(), lease_seconds=0)
+    previous_journal.register_runner('the_job', Mock())
+    previous_journal.submit('app_context', 'the_job', {"node_id": "node_1"})
+    previous_journal.submit('app_context', 'the_job', {"node_id": "node_2"})
+    previous_journal.record('unknown_job', {})
+
+    job_journal = JobJournal(tmp_path / "journal.sqlite3", worker_pool=SynchronousWorkerPool())
+    runner = Mock()
+    job_journal.register_runner('the_job', runner)
+    replayed = job_journal.replay_pending_jobs('new_app_context')
+
+    assert replayed == 2
+    assert runner.call_count == 2
+    runner.assert_any_call('new_app_context', node_id='node_1')
+    runner.assert_any_call('new_app_context', node_id='node_2')
+    assert [job_type for _, job_type, _ in job_journal.get_pending_jobs()] == ['unknown_job']
+
+
+def test_checkpoint(tmp_path):
+    """
+        Test that the values checkpointed by a running job are recorded with its parameters, and that nothing is
+        recorded outside of a job
+    """
+    job_journal = JobJournal(tmp_path / "journal.sqlite3", worker_pool=SynchronousWorkerPool())
+    recorded_params = []
+
+    def runner(_app_context, **params):
+        job_journal.checkpoint(project_item={"item_id": "the_item_id"})
+        recorded_params.extend(params for _, _, params in job_journal.get_pending_jobs())
+
+    job_journal.register_runner('the_job', runner)
+    job_journal.checkpoint(project_item={"item_id": "the_other_item_id"})
+    job_journal.submit('app_context', 'the_job', {"node_id": "the_node_id"})
+
+    assert recorded_params == [{"node_id": "the_node_id", "project_item": {"item_id": "the_item_id"}}]
+
+
+def test_resubmit(tmp_path):
+    """
+        Test that a running job can be submitted again with its checkpointed values, and that it is done afterwards
+    """
+    job_journal = JobJournal(tmp_path / "journal.sqlite3", worker_pool=SynchronousWorkerPool())
+    runs = []
+
+    def runner(app_context, **params):
+        runs.append(params)
+        if "project_item" not in params:
+            job_journal.checkpoint(project_item={"item_id": "the_item_id"})
+            job_journal.resubmit(app_context)
+
+    job_journal.register_runner('the_job', runner)
+    job_journal.submit('app_context', 'the_job', {"node_id": "the_node_id"})
+
+    assert runs == [{"node_id": "the_node_id"},
+                    {"node_id": "the_node_id", "project_item": {"item_id": "the_item_id"}}]
+    assert job_journal.get_pending_jobs() == []
+    with pytest.raises(ValueError):
+        job_journal.resubmit('app_context')
+
+
+def test_replay_leased_jobs_skipped(tmp_path):
+    """
+        Test that the jobs leased by a running instance are not replayed, and that a job is claimed only once
+    """
+    running_journal = JobJournal(tmp_path / "journal.sqlite3", worker_pool=Mock())
+    running_journal.register_runner('the_job', Mock())
+    running_journal.submit('app_context', 'the_job', {"node_id": "node_1"})
+    stopped_journal = JobJournal(tmp_path / "journal.sqlite3", worker_pool=Mock(), lease_seconds=0)
+    job_id = stopped_journal.record('the_job', {"node_id": "node_2"})
+
+    journals = [JobJournal(tmp_path / "journal.sqlite3", worker_pool=SynchronousWorkerPool()) for _ in range(2)]
+    runners = [Mock(), Mock()]
+    for journal, runner in zip(journals, runners):
+        journal.register_runner('the_job', runner)
+
+    assert [journal.replay_pending_jobs('app_context') for journal in journals] == [1, 0]
+    runners[0].assert_called_once_with('app_context', node_id='node_2')
+    runners[1].assert_not_called()
+    assert not journals[1].claim(job_id)
+    assert [params for _, _, params in running_journal.get_pending_jobs()] == [{"node_id": "node_1"}]
+
+
+def test_renew_leases(tmp_path):
+    """
+        Test that the renewed leases of an instance keep its pending jobs from being claimed
+    """
+    job_journal = JobJournal(tmp_path / "journal.sqlite3", worker_pool=Mock(), lease_seconds=0)
+    job_id = job_journal.record('the_job', {})
+    job_journal.lease_seconds = 60
+    job_journal.renew_leases()
+
+    assert not JobJournal(tmp_path / "journal.sqlite3", worker_pool=Mock()).claim(job_id)
+
+
+def test_replay_saturated_job_released(tmp_path):
+    """
+        Test that a replayed job refused by a saturated worker pool can be claimed again
+    """
+    JobJournal(tmp_path / "journal.sqlite3", worker_pool=Mock(), lease_seconds=0).record('the_job', {})
+    worker_pool = Mock()
+    worker_pool.submit.side_effect = WorkerPoolSaturatedError('saturated')
+    job_journal = JobJournal(tmp_path / "journal.sqlite3", worker_pool=worker_pool)
+    job_journal.register_runner('the_job', Mock())
+
+    assert job_journal.replay_pending_jobs('app_context') == 0
+    job_journal.worker_pool = SynchronousWorkerPool()
+    assert job_journal.replay_pending_jobs('app_context') == 1
@@ -0,0 +1,69 @@
+"""
+    Unit tests for the MetricsListener.py main file
+"""
+from unittest.mock import patch
+from flask import Flask
+from sources.FlaskAppWrapper import FlaskAppWrapper
+from sources.listeners.MetricsListener import MetricsListener
+from sources.utils.GithubRateLimiter import GithubRateLimiter
+from sources.utils.Metrics import Metrics
+from sources.utils.SlackRateLimiter import SlackRateLimiter
+from sources.utils.WorkerPool import WorkerPool
+
+# pylint: disable=unused-argument
+
+
+def dispatch(app, path):
+    """
+        Processes a request through the hooks of the app, and returns its response
+    """
+    with app.test_request_context(path):
+        return app.full_dispatch_request()
+
+
+WORKER_POOL_STATS = {"max_workers": 8, "queue_depth": 100, "queue_length": 3, "in_flight": 2,
+                     "in_flight_by_type": {"github_webhook": 2}, "held_back": 1,
+                     "held_back_by_type": {"github_project_item_update": 1}}
+SLACK_STATS = {"chat.postMessage": {"calls": 5, "delayed": 1, "delay_seconds": 0.5, "rate_limited": 0,
+                                    "deferred": 0}}
+GITHUB_STATS = {"limit": 5000, "remaining": 4000, "used": 1000, "reset_at": None, "throttled": 0,
+                "throttle_seconds": 0.0, "secondary_rate_limited": 0}
+
+
+@patch.object(WorkerPool, "get_stats", return_value=WORKER_POOL_STATS)
+@patch.object(SlackRateLimiter, "get_stats", return_value=SLACK_STATS)
+@patch.object(GithubRateLimiter, "get_stats", return_value=GITHUB_STATS)
+def test_metrics(mock_github_stats, mock_slack_stats, mock_pool_stats):
+    """
+        Test that the endpoint renders the request metrics and the state of the components
+    """
+    metrics = Metrics()
+    with patch.object(Metrics, "get_instance", return_value=metrics):
+        wrapper = FlaskAppWrapper(Flask('test'))
+        wrapper.add_endpoint("/metrics", endpoint_name='metrics', handler=MetricsListener(), methods=['GET'])
+        dispatch(wrapper.app, "/metrics")
+        response = dispatch(wrapper.app, "/metrics")
+
+    body = response.get_data(as_text=True)
+    assert response.status_code == 200
+    assert response.content_type == 'text/plain; version=0.0.4; charset=utf-8'
+    assert 'tbtt_http_responses_total{endpoint="metrics",listener="MetricsListener",status="200"} 1\n' in body
+    assert 'tbtt_http_request_duration_seconds_count{endpoint="metrics",listener="MetricsListener"} 1\n' in body
+    assert 'tbtt_worker_pool_active_workers 2\n' in body
+    assert 'tbtt_worker_pool_in_flight_jobs{job_type="github_webhook"} 2\n' in body
+    assert 'tbtt_worker_pool_held_back_jobs{job_type="github_project_item_update"} 1\n' in body
+    assert 'tbtt_slack_api_delay_seconds_total{method="chat.postMessage"} 0.5\n' in body
+    assert 'tbtt_github_rate_limit_remaining 4000\n' in body
+    assert 'tbtt_github_rate_limit_reset_timestamp_seconds' not in body
+
+
+def test_unknown_endpoint():
+    """
+        Test that requests to unregistered urls are not recorded
+    """
+    metrics = Metrics()
+    with patch.object(Metrics, "get_instance", return_value=metrics):
+        wrapper = FlaskAppWrapper(Flask('test'))
+        response = dispatch(wrapper.app, "/unknown")
+    assert response.status_code == 404
+    assert metrics.render() == "\n"
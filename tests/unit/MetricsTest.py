@@ -0,0 +1,70 @@
+"""
+    Unit tests for the Metrics.py utility
+"""
+import pytest
+from sources.utils.Metrics import Metrics, METRIC_TYPE_GAUGE, time_outbound_call
+
+
+def test_render_counter():
+    """
+        Test that counters are summed per label set, and rendered with escaped labels
+    """
+    metrics = Metrics()
+    metrics.increment_counter("responses_total", "Responses.", {"status": "200", "endpoint": "a"})
+    metrics.increment_counter("responses_total", "Responses.", {"endpoint": "a", "status": "200"}, 2)
+    metrics.increment_counter("responses_total", "Responses.", {"endpoint": 'b"\n', "status": "500"})
+    assert metrics.render() == (
+        "# HELP responses_total Responses.\n"
+        "# TYPE responses_total counter\n"
+        'responses_total{endpoint="a",status="200"} 3\n'
+        'responses_total{endpoint="b\\"\\n",status="500"} 1\n'
+    )
+
+
+def test_render_histogram():
+    """
+        Test that histograms are rendered with cumulative buckets, sum and count
+    """
+    metrics = Metrics(buckets=(0.1, 1))
+    metrics.observe_histogram("duration_seconds", "Duration.", {"method": "m"}, 0.05)
+    metrics.observe_histogram("duration_seconds", "Duration.", {"method": "m"}, 0.5)
+    metrics.observe_histogram("duration_seconds", "Duration.", {"method": "m"}, 2)
+    assert metrics.render() == (
+        "# HELP duration_seconds Duration.\n"
+        "# TYPE duration_seconds histogram\n"
+        'duration_seconds_bucket{method="m",le="0.1"} 1\n'
+        'duration_seconds_bucket{method="m",le="1"} 2\n'
+        'duration_seconds_bucket{method="m",le="+Inf"} 3\n'
+        'duration_seconds_sum{method="m"} 2.55\n'
+        'duration_seconds_count{method="m"} 3\n'
+    )
+
+
+def test_render_collected():
+    """
+        Test that metrics collected at rendering time are rendered and not stored
+    """
+    metrics = Metrics()
+    assert metrics.render([("workers", METRIC_TYPE_GAUGE, "Workers.", {}, 4)]) == (
+        "# HELP workers Workers.\n"
+        "# TYPE workers gauge\n"
+        "workers 4\n"
+    )
+    assert metrics.render() == "\n"
+
+
+def test_time_outbound_call_error():
+    """
+        Test that outbound calls are timed, and errors counted and raised again
+    """
+    metrics = Metrics()
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        monkeypatch.setattr(Metrics, "get_instance", lambda: metrics)
+        with time_outbound_call("slack", "chat.postMessage"):
+            pass
+        with pytest.raises(ValueError):
+            with time_outbound_call("slack", "chat.postMessage"):
+                raise ValueError("failed")
+    rendered = metrics.render()
+    assert 'tbtt_outbound_call_duration_seconds_count{method="chat.postMessage",service="slack"} 2\n' in rendered
+    assert 'tbtt_outbound_call_errors_total{method="chat.postMessage",service="slack"} 1\n' in rendered
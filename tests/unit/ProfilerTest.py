@@ -0,0 +1,91 @@
+"""
+    Unit tests for the Profiler.py utility
+"""
+import pstats
+from unittest.mock import patch
+from flask import Flask
+from sources.FlaskAppWrapper import FlaskAppWrapper
+from sources.utils.Profiler import PROFILE_HEADER, Profiler, profile_requested
+import sources.utils.Constants as cst
+
+
+def profiled_function():
+    """
+        Function called while profiling
+    """
+    return sum(range(10))
+
+
+class ProfiledListener():
+    """
+        Listener calling the profiled function
+    """
+
+    def __call__(self):
+        return str(profiled_function())
+
+
+def test_disabled(tmp_path):
+    """
+        Test that nothing is profiled when the profiler is disabled and no profile was requested
+    """
+    profiler = Profiler(tmp_path)
+    assert profiler.start() is None
+    profiler.stop(None, "job-test")
+    assert not list(tmp_path.iterdir())
+
+
+def test_enabled(tmp_path):
+    """
+        Test that an enabled profiler writes pstats files
+    """
+    profiler = Profiler(tmp_path)
+    profiler.set_enabled(True)
+    profile = profiler.start()
+    profiled_function()
+    profiler.stop(profile, "SlackCommandListener-slack_command")
+
+    profile_path, = tmp_path.glob("*-SlackCommandListener-slack_command.prof")
+    functions = [function for _, _, function in pstats.Stats(str(profile_path)).stats]
+    assert "profiled_function" in functions
+    assert profiler.get_status() == {"enabled": True, "directory": str(tmp_path), "profiles": 1}
+
+
+def test_requested(tmp_path):
+    """
+        Test that a disabled profiler profiles the contexts where a profile was requested
+    """
+    profiler = Profiler(tmp_path)
+    token = profile_requested.set(True)
+    try:
+        profile = profiler.start()
+    finally:
+        profile_requested.reset(token)
+    assert profile is not None
+    profiler.stop(profile, "job-test")
+    assert len(list(tmp_path.glob("*.prof"))) == 1
+
+
+def test_rotation(tmp_path):
+    """
+        Test that only the max_files most recent profiles are kept
+    """
+    profiler = Profiler(tmp_path, enabled=True, max_files=2)
+    for name in ("first", "second", "third"):
+        profiler.stop(profiler.start(), name)
+    assert sorted(path.name.split("-", 1)[1] for path in tmp_path.glob("*.prof")) == ["second.prof", "third.prof"]
+
+
+def test_profile_header(tmp_path):
+    """
+        Test that requests carrying the admin token in the profile header are profiled
+    """
+    wrapper = FlaskAppWrapper(Flask('test'))
+    wrapper.app.config[cst.APP_CONFIG_TOKEN_ADMIN_TOKEN] = 'the_token'
+    wrapper.add_endpoint("/test", endpoint_name='test', handler=ProfiledListener(), methods=['GET'])
+    with patch.object(Profiler, "get_instance", return_value=Profiler(tmp_path)):
+        for headers in ({}, {PROFILE_HEADER: 'other_token'}, {PROFILE_HEADER: 'the_token'}):
+            with wrapper.app.test_request_context("/test", headers=headers):
+                wrapper.app.full_dispatch_request()
+            assert profile_requested.get() is False
+    assert len(list(tmp_path.glob("*-ProfiledListener-test.prof"))) == 1
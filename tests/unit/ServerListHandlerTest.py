@@ -2,11 +2,15 @@
     Unit tests for the ServerListHandler.py main file
 """
 
+import json
 from unittest.mock import Mock, patch
 
+import pytest
 import requests
+from freezegun import freeze_time
 
-from sources.handlers.ServerListHandler import ServerListHandler
+from sources.handlers.ServerListHandler import IpSourceUnavailableError, ServerListHandler
+from sources.utils.ConfigRegistry import ConfigRegistry
 
 # pylint: disable=unused-argument
 
@@ -23,6 +27,7 @@ def mock_cloudflare_ipv4_response(*args, **kwargs):
 
         status_code = 200
         text = "173.245.48.0/20\n103.21.244.0/22\n103.22.200.0/22"
+        headers = {}
 
     return RequestReturn()
 
@@ -39,6 +44,7 @@ def mock_cloudflare_ipv6_response(*args, **kwargs):
 
         status_code = 200
         text = "2400:cb00::/32\n2606:4700::/32\n2803:f800::/32"
+        headers = {}
 
     return RequestReturn()
 
@@ -59,7 +65,7 @@ def mock_cloudflare_error_response(*args, **kwargs):
 
 
 @patch(
-    "sources.handlers.ServerListHandler.requests.get",
+    "requests.Session.get",
     side_effect=mock_cloudflare_ipv4_response,
 )
 def test_get_cloudflare_proxy_ipv4(mock_requests):
@@ -75,7 +81,7 @@ def test_get_cloudflare_proxy_ipv4(mock_requests):
 
 
 @patch(
-    "sources.handlers.ServerListHandler.requests.get",
+    "requests.Session.get",
     side_effect=mock_cloudflare_ipv6_response,
 )
 def test_get_cloudflare_proxy_ipv6(mock_requests):
@@ -91,7 +97,7 @@ def test_get_cloudflare_proxy_ipv6(mock_requests):
 
 
 @patch(
-    "sources.handlers.ServerListHandler.requests.get",
+    "requests.Session.get",
     side_effect=mock_cloudflare_error_response,
 )
 def test_get_cloudflare_proxy_ips_error(mock_requests):
@@ -105,7 +111,7 @@ def test_get_cloudflare_proxy_ips_error(mock_requests):
     mock_requests.assert_called_once()
 
 
-@patch("sources.handlers.ServerListHandler.requests.get")
+@patch("requests.Session.get")
 def test_get_cloudflare_proxy_ips_exception(mock_requests):
     """
     Tests the get_cloudflare_proxy_ips method handles request exceptions
@@ -192,7 +198,7 @@ def test_get_groupone_ipv6():
 
 
 @patch(
-    "sources.handlers.ServerListHandler.requests.get",
+    "requests.Session.get",
     side_effect=mock_cloudflare_ipv4_response,
 )
 def test_generate_wp_rocket_ips_human_readable(mock_requests):
@@ -222,21 +228,29 @@ def test_generate_wp_rocket_ips_human_readable(mock_requests):
 
 
 @patch(
-    "sources.handlers.ServerListHandler.requests.get",
+    "requests.Session.get",
     side_effect=mock_cloudflare_ipv4_response,
 )
-@patch("sources.utils.Duplication.remove_duplicated_lines")
-def test_generate_wp_rocket_ipv4_machine_readable(mock_dedup, mock_requests):
+def test_generate_wp_rocket_ipv4_machine_readable(mock_requests):
     """
     Tests the generate_wp_rocket_ipv4_machine_readable method
     """
-    mock_dedup.return_value = "173.245.48.0/20\n46.30.211.168\n"
-
     handler = ServerListHandler()
     result = handler.generate_wp_rocket_ipv4_machine_readable()
 
-    # Verify deduplication was called
-    mock_dedup.assert_called_once()
+    # Verify adjacent addresses are merged into ranges, and the list is sorted
+    assert result == (
+        "5.249.224.8/30\n"
+        "46.30.211.69\n"
+        "46.30.211.168\n"
+        "46.30.211.203\n"
+        "46.30.211.236\n"
+        "46.30.212.76/30\n"
+        "46.30.212.200/29\n"
+        "103.21.244.0/22\n"
+        "103.22.200.0/22\n"
+        "173.245.48.0/20\n"
+    )
 
     # Verify the result is machine-readable (no text headers)
     assert "List of IPs" not in result
@@ -244,21 +258,18 @@ def test_generate_wp_rocket_ipv4_machine_readable(mock_dedup, mock_requests):
 
 
 @patch(
-    "sources.handlers.ServerListHandler.requests.get",
+    "requests.Session.get",
     side_effect=mock_cloudflare_ipv6_response,
 )
-@patch("sources.utils.Duplication.remove_duplicated_lines")
-def test_generate_wp_rocket_ipv6_machine_readable(mock_dedup, mock_requests):
+def test_generate_wp_rocket_ipv6_machine_readable(mock_requests):
     """
     Tests the generate_wp_rocket_ipv6_machine_readable method
     """
-    mock_dedup.return_value = "2400:cb00::/32\n2a02:2350:4:200::/55\n"
-
     handler = ServerListHandler()
     result = handler.generate_wp_rocket_ipv6_machine_readable()
 
-    # Verify deduplication was called
-    mock_dedup.assert_called_once()
+    # Verify the list is deduplicated and sorted
+    assert result == "2400:cb00::/32\n2606:4700::/32\n2803:f800::/32\n2a02:2350:4:200::/55\n"
 
     # Verify the result is machine-readable (no text headers)
     assert "List of IPs" not in result
@@ -266,7 +277,7 @@ def test_generate_wp_rocket_ipv6_machine_readable(mock_dedup, mock_requests):
 
 
 @patch(
-    "sources.handlers.ServerListHandler.requests.get",
+    "requests.Session.get",
     side_effect=mock_cloudflare_ipv4_response,
 )
 def test_send_wp_rocket_ips_to_slack(mock_requests):
@@ -305,3 +316,186 @@ def test_get_groupone_ipv4_no_ranges():
     for line in result.split("\n"):
         if line:
             assert "/" not in line, f"Line should not contain CIDR notation: {line}"
+
+
+@patch(
+    "requests.Session.get",
+    side_effect=mock_cloudflare_ipv4_response,
+)
+def test_get_cloudflare_proxy_ips_cached(mock_requests):
+    """
+    Tests that CloudFlare IPs are fetched once per IP version, then served from memory
+    """
+    handler = ServerListHandler()
+    handler.generate_wp_rocket_ips_human_readable()
+    handler.generate_wp_rocket_ips_human_readable()
+
+    assert mock_requests.call_count == 2
+
+
+@patch.object(ConfigRegistry, "add_reload_listener")
+@patch(
+    "requests.Session.get",
+    side_effect=mock_cloudflare_ipv4_response,
+)
+def test_reload_cloudflare_ips_config(mock_requests, mock_add_reload_listener):
+    """
+    Tests that a configuration reload applies the new TTLs to the CloudFlare IPs already in memory
+    """
+    with freeze_time("2023-07-27 10:00:00") as frozen_time:
+        handler = ServerListHandler()
+        handler.get_cloudflare_proxy_ipv4()
+        reload_listener = next(item.args[0] for item in mock_add_reload_listener.call_args_list
+                               if getattr(item.args[0], "__self__", None) is handler)
+        with patch.object(ConfigRegistry, "get",
+                          return_value={"cloudflareIps": {"ttlSeconds": 60, "staleWhileRevalidateSeconds": 0}}):
+            reload_listener()
+        frozen_time.tick(120)
+        handler.get_cloudflare_proxy_ipv4()
+
+    assert mock_requests.call_count == 2
+
+
+@freeze_time("2023-07-27 10:00:00")
+@patch("requests.Session.get")
+def test_get_cloudflare_proxy_ips_last_known(mock_requests):
+    """
+    Tests that the last retrieved CloudFlare IPs are returned when CloudFlare cannot be reached anymore
+    """
+    mock_requests.side_effect = [
+        mock_cloudflare_ipv4_response(),
+        requests.exceptions.RequestException("Connection timeout"),
+    ]
+    handler = ServerListHandler()
+    handler.get_cloudflare_proxy_ipv4()
+
+    # Beyond the stale period, CloudFlare is requested before answering
+    with freeze_time("2023-07-30 10:00:00"):
+        result = handler.get_cloudflare_proxy_ipv4()
+
+    assert result == "173.245.48.0/20\n103.21.244.0/22\n103.22.200.0/22\n"
+    assert mock_requests.call_count == 2
+
+
+@patch(
+    "requests.Session.get",
+    side_effect=mock_cloudflare_ipv4_response,
+)
+@patch("sources.utils.IpAddress.parse_ip_networks", return_value=([], [], []))
+def test_get_wp_rocket_ips_snapshot_reused(mock_parse, mock_requests):
+    """
+    Tests that the snapshot is rendered once, and served again while its sources do not change
+    """
+    handler = ServerListHandler()
+    snapshot = handler.get_wp_rocket_ips_snapshot()
+    parse_count = mock_parse.call_count
+    handler.generate_wp_rocket_ips_human_readable()
+    handler.generate_wp_rocket_ipv4_machine_readable()
+
+    assert handler.get_wp_rocket_ips_snapshot() is snapshot
+    assert mock_parse.call_count == parse_count
+
+
+@patch("requests.Session.get")
+def test_get_wp_rocket_ips_snapshot_new_version(mock_requests):
+    """
+    Tests that a new snapshot version is rendered when the CloudFlare IPs change
+    """
+    mock_requests.side_effect = [
+        mock_cloudflare_ipv4_response(),
+        mock_cloudflare_ipv6_response(),
+        mock_cloudflare_ipv6_response(),
+        mock_cloudflare_ipv6_response(),
+    ]
+    with freeze_time("2023-07-27 10:00:00") as frozen_time:
+        handler = ServerListHandler()
+        snapshot = handler.get_wp_rocket_ips_snapshot()
+        frozen_time.tick(200000)
+        new_snapshot = handler.get_wp_rocket_ips_snapshot()
+
+    assert new_snapshot.version != snapshot.version
+    assert new_snapshot.get_etag("ipv4") != snapshot.get_etag("ipv4")
+    assert "173.245.48.0/20" not in new_snapshot.human_readable
+
+
+@patch(
+    "requests.Session.get",
+    side_effect=mock_cloudflare_error_response,
+)
+def test_generate_wp_rocket_ipv4_machine_readable_error(mock_requests):
+    """
+    Tests that no list is generated without the CloudFlare IPs
+    """
+    handler = ServerListHandler()
+    with pytest.raises(IpSourceUnavailableError, match="Status code: 404"):
+        handler.generate_wp_rocket_ipv4_machine_readable()
+
+
+@patch("requests.Session.get")
+def test_generate_wp_rocket_ipv4_machine_readable_invalid(mock_requests):
+    """
+    Tests that no list is generated from a CloudFlare answer that is not a list of IPs
+    """
+    mock_requests.return_value = Mock(status_code=200, text="<html>Maintenance</html>", headers={})
+    handler = ServerListHandler()
+    with pytest.raises(IpSourceUnavailableError, match="<html>Maintenance</html>"):
+        handler.generate_wp_rocket_ipv4_machine_readable()
+
+
+@patch(
+    "requests.Session.get",
+    side_effect=mock_cloudflare_error_response,
+)
+def test_send_wp_rocket_ips_to_slack_error(mock_requests):
+    """
+    Tests that the error is sent in the Slack DM when the CloudFlare IPs are unavailable
+    """
+    handler = ServerListHandler()
+    handler.slack_message_factory.post_message = Mock()
+
+    handler.send_wp_rocket_ips_to_slack(Mock(), "U123456")
+
+    text = handler.slack_message_factory.post_message.call_args[0][2]
+    assert text == "Error: Unable to fetch CloudFlare IPs. Status code: 404"
+
+
+@patch(
+    "requests.Session.get",
+    side_effect=mock_cloudflare_ipv4_response,
+)
+def test_check_wp_rocket_ips(mock_requests):
+    """
+    Tests that IPs are checked against the CloudFlare and group.One ranges
+    """
+    handler = ServerListHandler()
+    results = handler.check_wp_rocket_ips(["103.21.245.1", "46.30.212.78", "2a02:2350:4:2ff::1", "8.8.8.8", "invalid"])
+
+    assert [result["listed"] for result in results] == [True, True, True, False, False]
+    assert results[1]["range"] == "46.30.212.76/30"
+
+
+@patch(
+    "requests.Session.get",
+    side_effect=mock_cloudflare_ipv4_response,
+)
+def test_get_wp_rocket_ips_snapshot_structured(mock_requests):
+    """
+    Tests the JSON and CSV renderings, grouped by service, source and family
+    """
+    snapshot = ServerListHandler().get_wp_rocket_ips_snapshot()
+
+    services = json.loads(snapshot.get_rendering("human_readable", "json"))["services"]
+    assert [service["service"] for service in services] == ["license", "cpcss", "rucss", "dynamic_lists", "rocketcdn"]
+    assert services[0]["source"] == "cloudflare"
+    assert services[0]["ips"]["ipv4"] == ["103.21.244.0/22", "103.22.200.0/22", "173.245.48.0/20"]
+    assert services[1]["ips"]["ipv6"] == ["2a02:2350:4:200::/55"]
+    assert len(services[2]["userAgents"]) == 2
+
+    ipv6_services = json.loads(snapshot.get_rendering("ipv6", "json"))["services"]
+    assert "ipv4" not in ipv6_services[0]["ips"]
+
+    csv_lines = snapshot.get_rendering("ipv4", "csv").splitlines()
+    assert csv_lines[0] == "service,url,source,family,ip"
+    assert csv_lines[1] == "license,https://wp-rocket.me,cloudflare,ipv4,103.21.244.0/22"
+    assert "rucss,,groupone,ipv4,5.249.224.8/30" in csv_lines
+    assert all(",ipv6," not in line for line in csv_lines)
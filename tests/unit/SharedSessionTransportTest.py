@@ -0,0 +1,56 @@
+"""
+    Unit tests for the SharedSessionTransport.py main file
+"""
+from unittest.mock import patch
+import pytest
+import requests
+import gql
+from gql.transport.exceptions import TransportAlreadyConnected
+from sources.utils.HttpClient import HttpClient
+from sources.utils.SharedSessionTransport import SharedSessionTransport
+
+
+def test_connect_uses_shared_session():
+    """
+        Test that transports send their requests through the shared session
+    """
+    transport_1 = SharedSessionTransport(url='https://api.github.com/graphql')
+    transport_2 = SharedSessionTransport(url='https://api.github.com/graphql')
+    transport_1.connect()
+    transport_2.connect()
+
+    assert transport_1.session is HttpClient.get_session()
+    assert transport_2.session is HttpClient.get_session()
+    with pytest.raises(TransportAlreadyConnected):
+        transport_1.connect()
+
+
+@patch.object(requests.Session, "close")
+def test_close_keeps_shared_session_open(mock_close):
+    """
+        Test that closing a transport detaches it without closing the shared session
+    """
+    transport = SharedSessionTransport(url='https://api.github.com/graphql')
+    transport.connect()
+    transport.close()
+
+    assert transport.session is None
+    mock_close.assert_not_called()
+
+
+@patch.object(requests.Session, "request")
+def test_execute_clears_previous_headers(mock_request):
+    """
+        Test that the headers of a previous response are not kept when a request fails without response
+    """
+    mock_request.return_value.headers = {'x-ratelimit-remaining': '4999'}
+    mock_request.return_value.json.return_value = {'data': {'viewer': {'login': 'the_login'}}}
+    transport = SharedSessionTransport(url='https://api.github.com/graphql')
+    transport.connect()
+    transport.execute(gql.gql('query { viewer { login } }'))
+    assert transport.response_headers == {'x-ratelimit-remaining': '4999'}
+
+    mock_request.side_effect = requests.exceptions.ConnectionError()
+    with pytest.raises(requests.exceptions.ConnectionError):
+        transport.execute(gql.gql('query { viewer { login } }'))
+    assert transport.response_headers is None
@@ -0,0 +1,91 @@
+"""
+    Unit tests for the SlackDispatchHandler.py main file
+"""
+
+from unittest.mock import patch, Mock, ANY
+import pytest
+from flask import Flask
+from sources.handlers.SlackCommandHandler import SlackCommandHandler
+from sources.handlers.SlackDispatchHandler import SlackDispatchHandler
+from sources.factories.SlackMessageFactory import SlackMessageFactory
+from sources.factories.SlackModalFactory import SlackModalFactory
+from sources.utils.WorkerPool import WorkerPool
+
+RESPONSE_URL = 'https://hooks.slack.com/commands/the_url'
+
+
+@patch.object(WorkerPool, "submit")
+def test_dispatch(mock_submit):
+    """
+        Test that the processing is submitted to the worker pool instead of being run
+    """
+    process = Mock()
+    slack_dispatch_handler = SlackDispatchHandler()
+    with Flask('test').app_context():
+        slack_dispatch_handler.dispatch('slack_command', process, {"command": "/the_command"})
+
+    process.assert_not_called()
+    mock_submit.assert_called_once_with('slack_command', slack_dispatch_handler.process_deferred, app_context=ANY,
+                                        process=process, payload_json={"command": "/the_command"})
+
+
+@patch.object(SlackMessageFactory, "post_response")
+def test_process_deferred_result(mock_post_response):
+    """
+        Test that a processing result with a text is sent to the response URL
+    """
+    process = Mock(return_value={"text": "the_result"})
+    SlackDispatchHandler().process_deferred(Flask('test').app_context(), process, {"response_url": RESPONSE_URL})
+
+    process.assert_called_once_with({"response_url": RESPONSE_URL})
+    mock_post_response.assert_called_once_with(RESPONSE_URL, "the_result")
+
+
+@patch.object(SlackMessageFactory, "post_response")
+def test_process_deferred_empty_result(mock_post_response):
+    """
+        Test that nothing is sent when the processing has no result to show
+    """
+    SlackDispatchHandler().process_deferred(Flask('test').app_context(), Mock(return_value={}),
+                                            {"response_url": RESPONSE_URL})
+
+    mock_post_response.assert_not_called()
+
+
+@patch.object(SlackMessageFactory, "post_response")
+def test_process_deferred_error(mock_post_response):
+    """
+        Test that processing errors are sent to the response URL, then raised
+    """
+    process = Mock(side_effect=ValueError('Unknown command.'))
+    with pytest.raises(ValueError):
+        SlackDispatchHandler().process_deferred(Flask('test').app_context(), process, {"response_url": RESPONSE_URL})
+
+    mock_post_response.assert_called_once_with(RESPONSE_URL, "Sorry, your request failed: Unknown command.")
+
+
+@patch.object(SlackMessageFactory, "post_response")
+def test_process_deferred_error_without_response_url(mock_post_response):
+    """
+        Test that processing errors of payloads without response URL, like shortcuts, are only raised
+    """
+    with pytest.raises(KeyError):
+        SlackDispatchHandler().process_deferred(Flask('test').app_context(), Mock(side_effect=KeyError('trigger_id')), {})
+
+    mock_post_response.assert_not_called()
+
+
+@patch.object(WorkerPool, "submit")
+@patch.object(SlackModalFactory, "dev_team_escalation_modal", side_effect=ValueError('invalid_trigger_id'))
+@patch.object(SlackMessageFactory, "post_response")
+def test_process_deferred_command_modal_error(mock_post_response, mock_modal, mock_submit):
+    """
+        Test that a command modal is opened in the deferred job, so that its errors are sent to the response URL
+    """
+    payload_json = {"command": "/dev-team-escalation", "trigger_id": "the_trigger_id", "response_url": RESPONSE_URL}
+    with pytest.raises(ValueError):
+        SlackDispatchHandler().process_deferred(Flask('test').app_context(), SlackCommandHandler().process, payload_json)
+
+    mock_modal.assert_called_once_with(ANY, "the_trigger_id")
+    mock_submit.assert_not_called()
+    mock_post_response.assert_called_once_with(RESPONSE_URL, "Sorry, your request failed: invalid_trigger_id")
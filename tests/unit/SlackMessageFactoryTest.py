@@ -4,6 +4,8 @@
 
 
 from unittest.mock import patch, Mock
+import pytest
+import requests
 from sources.factories.SlackMessageFactory import SlackMessageFactory
 
 # pylint: disable=unused-argument
@@ -58,6 +60,7 @@ def mock_request_post_reply_check_params(*args, **kwargs):
     assert 'https://slack.com/api/chat.postMessage' == kwargs['url']
     assert {"Content-type": "application/json", "Authorization": "Bearer " + 'the_token'} == kwargs['headers']
     assert {"channel": "the_channel", "thread_ts": "the_ts", "text": "the_text"} == kwargs['json']
+    return Mock(status_code=200, json=lambda: {"ok": True})
 
 
 def mock_request_edit_message_check_params(*args, **kwargs):
@@ -67,6 +70,7 @@ def mock_request_edit_message_check_params(*args, **kwargs):
     assert 'https://slack.com/api/chat.update' == kwargs['url']
     assert {"Content-type": "application/json", "Authorization": "Bearer " + 'the_token'} == kwargs['headers']
     assert {"channel": "the_channel", "ts": "the_ts", "text": "the_text"} == kwargs['json']
+    return Mock(status_code=200, json=lambda: {"ok": True})
 
 
 def mock_request_search_message_default_check_params(*args, **kwargs):
@@ -176,71 +180,110 @@ def mock_request_search_message_count_check_params(*args, **kwargs):
                 })
 
 
-@patch('sources.factories.SlackMessageFactory.requests')
+@patch.object(requests.Session, 'post')
 @patch.object(SlackMessageFactory, '_get_slack_bot_user_token', return_value='the_token')
-def test_post_message(mock_get_token, mock_requests):
+def test_post_message(mock_get_token, mock_post):
     """
         Checks that the correct parameters are sent to the slack API for post message
     """
-    mock_requests.post.side_effect = mock_request_post_message_check_params
+    mock_post.side_effect = mock_request_post_message_check_params
 
     slack_message_factory = SlackMessageFactory()
     slack_message_factory.post_message('app_context', 'the_channel', 'the_text')
 
-    mock_requests.post.assert_called_once()
+    mock_post.assert_called_once()
 
 
-@patch('sources.factories.SlackMessageFactory.requests')
+@patch.object(requests.Session, 'post')
 @patch.object(SlackMessageFactory, '_get_slack_bot_user_token', return_value='the_token')
-def test_post_reply(mock_get_token, mock_requests):
+def test_post_reply(mock_get_token, mock_post):
     """
         Checks that the correct parameters are sent to the slack API for post reply
     """
-    mock_requests.post.side_effect = mock_request_post_reply_check_params
+    mock_post.side_effect = mock_request_post_reply_check_params
 
     slack_message_factory = SlackMessageFactory()
     slack_message_factory.post_reply('app_context', 'the_channel', 'the_ts', 'the_text')
 
-    mock_requests.post.assert_called_once()
+    mock_post.assert_called_once()
 
 
-@patch('sources.factories.SlackMessageFactory.requests')
+@patch.object(requests.Session, 'post')
 @patch.object(SlackMessageFactory, '_get_slack_bot_user_token', return_value='the_token')
-def test_edit_message(mock_get_token, mock_requests):
+def test_edit_message(mock_get_token, mock_post):
     """
         Checks that the correct parameters are sent to the slack API for edit message
     """
-    mock_requests.post.side_effect = mock_request_edit_message_check_params
+    mock_post.side_effect = mock_request_edit_message_check_params
 
     slack_message_factory = SlackMessageFactory()
     slack_message_factory.edit_message('app_context', 'the_channel', 'the_ts', 'the_text')
 
-    mock_requests.post.assert_called_once()
+    mock_post.assert_called_once()
 
 
-@patch('sources.factories.SlackMessageFactory.requests')
+@patch.object(requests.Session, 'post')
 @patch.object(SlackMessageFactory, '_get_slack_user_token', return_value='the_token')
-def test_search_message_default(mock_get_token, mock_requests):
+def test_search_message_default(mock_get_token, mock_post):
     """
         Checks that the correct parameters are sent to the slack API for search message
     """
-    mock_requests.post.side_effect = mock_request_search_message_default_check_params
+    mock_post.side_effect = mock_request_search_message_default_check_params
 
     slack_message_factory = SlackMessageFactory()
     slack_message_factory.search_message('app_context', 'the_query')
 
-    mock_requests.post.assert_called_once()
+    mock_post.assert_called_once()
 
 
-@patch('sources.factories.SlackMessageFactory.requests')
+@patch.object(requests.Session, 'post')
 @patch.object(SlackMessageFactory, '_get_slack_user_token', return_value='the_token')
-def test_search_message_count_param(mock_get_token, mock_requests):
+def test_search_message_count_param(mock_get_token, mock_post):
     """
         Checks that the correct parameters are sent to the slack API for search message with count param
     """
-    mock_requests.post.side_effect = mock_request_search_message_count_check_params
+    mock_post.side_effect = mock_request_search_message_count_check_params
 
     slack_message_factory = SlackMessageFactory()
     slack_message_factory.search_message('app_context', 'the_query', count=123)
 
-    mock_requests.post.assert_called_once()
+    mock_post.assert_called_once()
+
+
+@patch.object(requests.Session, 'post', return_value=Mock(status_code=200))
+def test_post_response(mock_post):
+    """
+        Test post_response sends the message to the response URL, without token
+    """
+    slack_message_factory = SlackMessageFactory()
+    slack_message_factory.post_response('https://hooks.slack.com/commands/the_url', 'the_text')
+
+    mock_post.assert_called_once_with(url='https://hooks.slack.com/commands/the_url',
+                                      headers={"Content-type": "application/json"},
+                                      json={"response_type": "ephemeral", "text": "the_text"}, timeout=3000)
+
+
+@patch.object(requests.Session, 'post')
+def test_post_response_not_slack(mock_post):
+    """
+        Test post_response refuses URLs outside of Slack
+    """
+    slack_message_factory = SlackMessageFactory()
+    error_caught = False
+    try:
+        slack_message_factory.post_response('https://example.com/the_url', 'the_text')
+    except ValueError:
+        error_caught = True
+    assert error_caught
+    mock_post.assert_not_called()
+
+
+@patch.object(requests.Session, 'post', return_value=Mock(status_code=200, json=lambda: {"ok": False}))
+@patch.object(SlackMessageFactory, '_get_slack_bot_user_token', return_value='the_token')
+def test_post_reply_not_completed(mock_get_token, mock_post):
+    """
+        Checks that a reply refused by the Slack API raises an error
+    """
+    slack_message_factory = SlackMessageFactory()
+    with pytest.raises(ValueError):
+        slack_message_factory.post_reply('app_context', 'the_channel', 'the_ts', 'the_text')
@@ -2,13 +2,14 @@
     Unit tests for the SlackModalFactoryTest.py main file
 """
 import json
-from unittest.mock import patch, mock_open
+from unittest.mock import patch
 from sources.factories.SlackModalFactory import SlackModalFactory
+from sources.utils.ConfigRegistry import ConfigRegistry, freeze
 
 # pylint: disable=protected-access
 
 
-@patch("builtins.open", new_callable=mock_open, read_data='{"toto": "tata"}')
+@patch.object(ConfigRegistry, "get", return_value=freeze(json.loads('{"toto": "tata"}')))
 def test_get_assignee_list_not_exist(mock):
     """
         Test __get_assignee_list when the assigneeList key does not exist in the config file.
@@ -26,7 +27,7 @@ def test_get_assignee_list_not_exist(mock):
                             }]
 
 
-@patch("builtins.open", new_callable=mock_open, read_data='{"toto": "tata", "assignee_list":{ }}')
+@patch.object(ConfigRegistry, "get", return_value=freeze(json.loads('{"toto": "tata", "assignee_list":{ }}')))
 def test_get_assignee_list_empty(mock):
     """
         Test __get_assignee_list when the assigneeList key has an empty value
@@ -44,8 +45,8 @@ def test_get_assignee_list_empty(mock):
                             }]
 
 
-@patch("builtins.open", new_callable=mock_open,
-       read_data='{"toto": "tata", "assigneeList":{"name1":"value1","name2":"value2"} }')
+@patch.object(ConfigRegistry, "get",
+              return_value=freeze(json.loads('{"toto": "tata", "assigneeList":{"name1":"value1","name2":"value2"} }')))
 def test_get_assignee_list_data(mock):
     """
         Test __get_assignee_list when the assigneeList key has values
@@ -76,12 +77,12 @@ def test_get_assignee_list_data(mock):
                             }]
 
 
-@patch("builtins.open", new_callable=mock_open,
-       read_data='{"toto": "tata", "assigneeList":{"name1":"value1","name2":"value2"} }')
+@patch.object(ConfigRegistry, "get",
+              return_value=freeze(json.loads('{"toto": "tata", "assigneeList":{"name1":"value1","name2":"value2"} }')))
 def test_get_assignee_list_multiple_calls(mock):
     """
         Test __get_assignee_list when the assigneeList key has values and is called several times.
-        The assignee_list must be stored so that the config file is only read once.
+        The assignee_list must be stored so that the config is only read once.
     """
     slack_modal_factory = SlackModalFactory()
 
@@ -169,9 +170,9 @@ def send_modal_data_validation(*args, **kwargs):
 # pylint: enable=unused-argument
 
 
-@patch("requests.post", side_effect=mock_requests_post_create_github_task_modal)
-@patch("builtins.open", new_callable=mock_open,
-       read_data='{"toto": "tata", "assigneeList":{"name1":"value1","name2":"value2"} }')
+@patch("requests.Session.post", side_effect=mock_requests_post_create_github_task_modal)
+@patch.object(ConfigRegistry, "get",
+              return_value=freeze(json.loads('{"toto": "tata", "assigneeList":{"name1":"value1","name2":"value2"} }')))
 @patch.object(SlackModalFactory, "_get_slack_bot_user_token", side_effect=mock_get_slack_bot_user_token)
 def test_create_github_task_modal(mock_gettoken, mock_openfile, mock_postrequest):
     """
@@ -184,7 +185,7 @@ def test_create_github_task_modal(mock_gettoken, mock_openfile, mock_postrequest
     mock_gettoken.assert_called_once()
 
 
-@patch("requests.post", side_effect=mock_dev_team_escalation_modal)
+@patch("requests.Session.post", side_effect=mock_dev_team_escalation_modal)
 @patch.object(SlackModalFactory, "_get_slack_bot_user_token", side_effect=mock_get_slack_bot_user_token)
 def test_dev_team_escalation_modal(mock_gettoken, mock_postrequest):
     """
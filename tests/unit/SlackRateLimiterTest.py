@@ -0,0 +1,117 @@
+"""
+    Unit tests for the SlackRateLimiter.py main file
+"""
+import time
+from unittest.mock import patch, Mock
+from freezegun import freeze_time
+import pytest
+from sources.utils.SlackRateLimiter import SlackRateLimiter, SlackRateLimitedError, TokenBucket
+
+
+def test_token_bucket_burst_then_delay():
+    """
+        Test that calls beyond the burst are delayed at the bucket rate, in reservation order
+    """
+    with freeze_time('2023-07-27 10:00:00') as frozen_time:
+        bucket = TokenBucket(rate=1, burst=2)
+        assert bucket.reserve() == 0
+        assert bucket.reserve() == 0
+        assert bucket.reserve() == 1
+        assert bucket.reserve() == 2
+        frozen_time.tick(10)
+        assert bucket.reserve() == 0
+
+
+def test_token_bucket_block():
+    """
+        Test that a blocked bucket delays all calls until the end of the block
+    """
+    with freeze_time('2023-07-27 10:00:00'):
+        bucket = TokenBucket(rate=1, burst=5)
+        bucket.block(30)
+        assert bucket.reserve() == 30
+
+
+@patch.object(time, 'sleep')
+def test_call_delays_calls_over_limit(mock_sleep):
+    """
+        Test that calls over the limit of a method are delayed and counted, without affecting the other methods
+    """
+    with freeze_time('2023-07-27 10:00:00'):
+        rate_limiter = SlackRateLimiter({"chat.update": {"perMinute": 60, "burst": 1}})
+        response = Mock(status_code=200)
+        assert rate_limiter.call('chat.update', lambda: response) is response
+        rate_limiter.call('chat.update', lambda: response)
+        rate_limiter.call('chat.postMessage', lambda: response)
+
+    mock_sleep.assert_called_once_with(1)
+    assert rate_limiter.get_stats() == {
+        "chat.update": {"calls": 2, "delayed": 1, "delay_seconds": 1, "rate_limited": 0, "deferred": 0},
+        "chat.postMessage": {"calls": 1, "delayed": 0, "delay_seconds": 0, "rate_limited": 0, "deferred": 0}
+    }
+
+
+@patch.object(time, 'sleep')
+def test_call_retries_after_429(mock_sleep):
+    """
+        Test that a call rejected with a 429 is sent again after the Retry-After delay
+    """
+    with freeze_time('2023-07-27 10:00:00'):
+        rate_limiter = SlackRateLimiter()
+        responses = [Mock(status_code=429, headers={"Retry-After": "30"}), Mock(status_code=200)]
+        send = Mock(side_effect=responses)
+        assert rate_limiter.call('chat.postMessage', send) is responses[1]
+
+    assert send.call_count == 2
+    mock_sleep.assert_called_once_with(30)
+    assert rate_limiter.get_stats()["chat.postMessage"]["rate_limited"] == 1
+
+
+@patch.object(time, 'sleep')
+def test_call_gives_up_after_max_retries(_mock_sleep):
+    """
+        Test that the 429 response is returned once max_retries is reached
+    """
+    rate_limiter = SlackRateLimiter(max_retries=2)
+    response = Mock(status_code=429, headers={})
+    send = Mock(return_value=response)
+    assert rate_limiter.call('chat.postMessage', send) is response
+    assert send.call_count == 3
+
+
+@patch.object(time, 'sleep')
+def test_call_deferrable_over_limit(mock_sleep):
+    """
+        Test that a deferrable call over the limit raises with the wait instead of sleeping, and gives its token back
+    """
+    with freeze_time('2023-07-27 10:00:00'):
+        rate_limiter = SlackRateLimiter({"chat.update": {"perMinute": 60, "burst": 1}})
+        response = Mock(status_code=200)
+        send = Mock(return_value=response)
+        with SlackRateLimiter.deferrable():
+            rate_limiter.call('chat.update', send)
+            with pytest.raises(SlackRateLimitedError) as error:
+                rate_limiter.call('chat.update', send)
+        assert error.value.wait == 1
+        # Outside of the deferrable block, the call waits for the token not taken by the deferred call
+        rate_limiter.call('chat.update', send)
+
+    assert send.call_count == 2
+    mock_sleep.assert_called_once_with(1)
+    assert rate_limiter.get_stats()["chat.update"]["deferred"] == 1
+
+
+@patch.object(time, 'sleep')
+def test_call_deferrable_after_429(mock_sleep):
+    """
+        Test that a deferrable call rejected with a 429 raises with the Retry-After delay instead of sending it again
+    """
+    with freeze_time('2023-07-27 10:00:00'):
+        rate_limiter = SlackRateLimiter()
+        send = Mock(return_value=Mock(status_code=429, headers={"Retry-After": "30"}))
+        with SlackRateLimiter.deferrable(), pytest.raises(SlackRateLimitedError) as error:
+            rate_limiter.call('chat.postMessage', send)
+
+    assert error.value.wait == 30
+    send.assert_called_once()
+    mock_sleep.assert_not_called()
@@ -2,12 +2,30 @@
     Unit tests for the SlackViewSubmissionHandler.py main file
 """
 
+from unittest.mock import patch
+import pytest
+from sources.handlers.GithubTaskHandler import GithubTaskHandler
 from sources.handlers.SlackViewSubmissionHandler import SlackViewSubmissionHandler
+from sources.models.CreatedGithubTaskParam import CreatedGithubTaskParam
+from sources.models.InitGithubTaskParam import InitGithubTaskParam
+from sources.utils.JobJournal import JobJournal
+from sources.utils.SlackRateLimiter import SlackRateLimitedError
 from tests.utils.SlackModalSubmissions import SlackModalSubmissionRequestRepo
+from tests.utils.SynchronousWorkerPool import SynchronousWorkerPool
+from tests.utils.TemporaryStorage import temporary_storage
 
 # pylint: disable=protected-access
 
 
+@pytest.fixture(autouse=True)
+def fixture_storage(tmp_path):
+    """
+        Gives each test an empty job journal and escalation thread index, instead of the ones of the app
+    """
+    with temporary_storage(tmp_path):
+        yield
+
+
 def test_create_github_task_modal_retrieve_params():
     """
         Test __get_assignee_list when the assigneeList key does not exist in the config file.
@@ -39,3 +57,53 @@ def test_dev_team_escalation_modal_retrieve_params():
     assert "Task submitted by mathieu.lamiot through TBTT.\n\n**Description of the issue:**\nb\n\n**Investigation performed:**\nc\n\n**How to reproduce:**\nd\n\nHelpscout link:d\n" == task_param_uut.body # noqa
     assert task_param_uut.handle_immediately
     assert 'dev-team-escalation' == task_param_uut.flow
+
+
+@patch.object(GithubTaskHandler, "init_github_task")
+def test_init_github_task_job_checkpoint(mock_init, tmp_path):
+    """
+        Test that the task created by a github_task_init job is stored in the journal, and passed to the replayed job
+        so that it is not created again
+    """
+    job_journal = JobJournal(tmp_path / "journal.sqlite3", worker_pool=SynchronousWorkerPool())
+    with patch.object(JobJournal, "get_instance", return_value=job_journal):
+        slack_view_submission_handler = SlackViewSubmissionHandler()
+    project_item = CreatedGithubTaskParam("the_item_id", 1234, 104)
+    pending_params = []
+
+    def init_github_task(_app_context, _task_params, _project_item, on_created):
+        on_created(project_item)
+        pending_params.extend(params for _, _, params in job_journal.get_pending_jobs())
+
+    mock_init.side_effect = init_github_task
+    job_journal.submit('app_context', 'github_task_init', {"title": "the_title", "body": "the_body"})
+    assert pending_params[0]["project_item"] == {"item_id": "the_item_id", "item_database_id": 1234,
+                                                 "project_number": 104}
+
+    mock_init.side_effect = None
+    slack_view_submission_handler.init_github_task_job('app_context', **pending_params[0])
+    assert mock_init.call_args[0][:3] == ('app_context', InitGithubTaskParam("the_title", "the_body"), project_item)
+
+
+@patch.object(GithubTaskHandler, "init_github_task")
+def test_init_github_task_job_rate_limited(mock_init, tmp_path):
+    """
+        Test that a github_task_init job delayed by the Slack rate limit is submitted again after the wait, with the
+        created task so that it is not created again
+    """
+    job_journal = JobJournal(tmp_path / "journal.sqlite3", worker_pool=SynchronousWorkerPool())
+    with patch.object(JobJournal, "get_instance", return_value=job_journal):
+        SlackViewSubmissionHandler()
+
+    def init_github_task(_app_context, _task_params, _project_item, on_created):
+        on_created(CreatedGithubTaskParam("the_item_id", 1234, 104))
+        raise SlackRateLimitedError('chat.postMessage', 30)
+
+    mock_init.side_effect = init_github_task
+    with patch.object(JobJournal, "_JobJournal__schedule_recorded_job") as mock_schedule:
+        job_journal.submit('app_context', 'github_task_init', {"title": "the_title", "body": "the_body"})
+
+    (_, (_, job_type, params), delay), _ = mock_schedule.call_args
+    assert (job_type, delay) == ('github_task_init', 30)
+    assert params["project_item"] == {"item_id": "the_item_id", "item_database_id": 1234, "project_number": 104}
+    assert [job[2] for job in job_journal.get_pending_jobs()] == [params]
@@ -0,0 +1,181 @@
+"""
+    Unit tests for the SupportListener.py main file
+"""
+from unittest.mock import patch
+from flask import Flask
+from sources.listeners.SupportListener import SupportListener
+from sources.handlers.ServerListHandler import IpSourceUnavailableError, ServerListHandler
+from sources.models.IpListSnapshot import IpListSnapshot
+from sources.utils.ConfigRegistry import ConfigRegistry
+
+SNAPSHOT = IpListSnapshot("the_version", "the_human_readable_list", "the_ipv4_list", "the_ipv6_list")
+
+
+@patch.object(ServerListHandler, "get_wp_rocket_ips_snapshot", return_value=SNAPSHOT)
+def test_get_wprocket_ipv4_machine_readable(_mock_snapshot):
+    """
+        Test that the list is served with its ETag and Cache-Control headers
+    """
+    support_listener = SupportListener()
+    with Flask('test').test_request_context('/support/wprocket-ips/ipv4'):
+        response = support_listener.get_wprocket_ipv4_machine_readable()
+
+    assert response.status_code == 200
+    assert response.get_data(as_text=True) == "the_ipv4_list"
+    assert response.headers['ETag'] == '"the_version-ipv4"'
+    assert response.cache_control.public
+    assert response.cache_control.max_age == support_listener.cache_max_age
+
+
+@patch.object(ServerListHandler, "get_wp_rocket_ips_snapshot", return_value=SNAPSHOT)
+def test_get_wprocket_ips_not_modified(_mock_snapshot):
+    """
+        Test that a request with the current ETag gets a 304 without body
+    """
+    support_listener = SupportListener()
+    headers = {'If-None-Match': '"the_version-human_readable"'}
+    with Flask('test').test_request_context('/support/wprocket-ips', headers=headers):
+        response = support_listener.get_wprocket_ips_human_readable()
+
+    assert response.status_code == 304
+    assert response.get_data(as_text=True) == ""
+    assert response.headers['ETag'] == '"the_version-human_readable"'
+
+
+@patch.object(ServerListHandler, "get_wp_rocket_ips_snapshot", return_value=SNAPSHOT)
+def test_get_wprocket_ipv6_modified(_mock_snapshot):
+    """
+        Test that a request with an outdated ETag gets the current list
+    """
+    support_listener = SupportListener()
+    with Flask('test').test_request_context('/support/wprocket-ips/ipv6', headers={'If-None-Match': '"old_version-ipv6"'}):
+        response = support_listener.get_wprocket_ipv6_machine_readable()
+
+    assert response.status_code == 200
+    assert response.get_data(as_text=True) == "the_ipv6_list"
+
+
+@patch.object(ServerListHandler, "get_wp_rocket_ips_snapshot",
+              side_effect=IpSourceUnavailableError("Unable to reach CloudFlare."))
+def test_get_wprocket_ips_source_unavailable(_mock_snapshot):
+    """
+        Test that a 503 without ETag nor Cache-Control is returned when a source list is unavailable
+    """
+    support_listener = SupportListener()
+    app = Flask('test')
+    with app.test_request_context('/support/wprocket-ips/ipv4'):
+        response = app.make_response(support_listener.get_wprocket_ipv4_machine_readable())
+
+    assert response.status_code == 503
+    assert response.get_json() == {"error": "Unable to reach CloudFlare."}
+    assert 'ETag' not in response.headers
+    assert 'Cache-Control' not in response.headers
+
+
+@patch.object(ServerListHandler, "check_wp_rocket_ips", return_value=[{"ip": "1.1.1.1", "listed": False}])
+def test_check_wprocket_ip(mock_check):
+    """
+        Test that the IP of the query string is checked
+    """
+    support_listener = SupportListener()
+    with Flask('test').test_request_context('/support/wprocket-ips/check?ip=1.1.1.1'):
+        response = support_listener.check_wprocket_ip()
+
+    assert response == ({"ip": "1.1.1.1", "listed": False}, 200)
+    mock_check.assert_called_once_with(["1.1.1.1"])
+
+
+@patch.object(ServerListHandler, "check_wp_rocket_ips", side_effect=IpSourceUnavailableError("Unable to reach CloudFlare."))
+def test_check_wprocket_ips_source_unavailable(_mock_check):
+    """
+        Test that checks return a 503 when a source list is unavailable
+    """
+    support_listener = SupportListener()
+    app = Flask('test')
+    with app.test_request_context('/support/wprocket-ips/check?ip=1.1.1.1'):
+        assert support_listener.check_wprocket_ip() == ({"error": "Unable to reach CloudFlare."}, 503)
+    with app.test_request_context('/support/wprocket-ips/check', method='POST', json=["1.1.1.1"]):
+        assert support_listener.check_wprocket_ips_bulk()[1] == 503
+
+
+def test_check_wprocket_ip_missing():
+    """
+        Test that a check without IP is rejected
+    """
+    support_listener = SupportListener()
+    with Flask('test').test_request_context('/support/wprocket-ips/check'):
+        response = support_listener.check_wprocket_ip()
+
+    assert response[1] == 400
+
+
+@patch.object(ServerListHandler, "check_wp_rocket_ips", return_value=[])
+def test_check_wprocket_ips_bulk(mock_check):
+    """
+        Test that bulk checks accept JSON objects, JSON lists and plain text
+    """
+    support_listener = SupportListener()
+    app = Flask('test')
+    with app.test_request_context('/support/wprocket-ips/check', method='POST', json={"ips": ["1.1.1.1", "::1"]}):
+        assert support_listener.check_wprocket_ips_bulk() == ({"results": []}, 200)
+    with app.test_request_context('/support/wprocket-ips/check', method='POST', json=["1.1.1.1"]):
+        support_listener.check_wprocket_ips_bulk()
+    with app.test_request_context('/support/wprocket-ips/check', method='POST', data="1.1.1.1\n\n2.2.2.2\n"):
+        support_listener.check_wprocket_ips_bulk()
+
+    assert mock_check.call_args_list[0][0][0] == ["1.1.1.1", "::1"]
+    assert mock_check.call_args_list[1][0][0] == ["1.1.1.1"]
+    assert mock_check.call_args_list[2][0][0] == ["1.1.1.1", "2.2.2.2"]
+
+
+def test_check_wprocket_ips_bulk_invalid():
+    """
+        Test that bulk checks with an invalid body or too many IPs are rejected
+    """
+    support_listener = SupportListener()
+    support_listener.max_bulk_check_ips = 2
+    app = Flask('test')
+    with app.test_request_context('/support/wprocket-ips/check', method='POST', json={"ips": "1.1.1.1"}):
+        assert support_listener.check_wprocket_ips_bulk()[1] == 400
+    with app.test_request_context('/support/wprocket-ips/check', method='POST', json=["1.1.1.1", "1.1.1.2", "1.1.1.3"]):
+        assert support_listener.check_wprocket_ips_bulk()[1] == 413
+
+
+@patch.object(ServerListHandler, "get_wp_rocket_ips_snapshot", return_value=IpListSnapshot(
+    "the_version", "the_human_readable_list", "the_ipv4_list", "the_ipv6_list",
+    renderings={("ipv4", "json"): '{"services": []}', ("ipv4", "csv"): "service,url,source,family,ip\n"}))
+def test_get_wprocket_ipv4_formats(_mock_snapshot):
+    """
+        Test that the format query parameter selects the structured rendering, with its own content type and ETag
+    """
+    support_listener = SupportListener()
+    app = Flask('test')
+    with app.test_request_context('/support/wprocket-ips/ipv4?format=json'):
+        response = support_listener.get_wprocket_ipv4_machine_readable()
+    assert response.get_json() == {"services": []}
+    assert response.headers['ETag'] == '"the_version-ipv4-json"'
+
+    with app.test_request_context('/support/wprocket-ips/ipv4?format=csv'):
+        response = support_listener.get_wprocket_ipv4_machine_readable()
+    assert response.mimetype == "text/csv"
+    assert response.get_data(as_text=True) == "service,url,source,family,ip\n"
+
+    with app.test_request_context('/support/wprocket-ips/ipv4?format=xml'):
+        response = support_listener.get_wprocket_ipv4_machine_readable()
+    assert response[1] == 400
+
+
+@patch.object(ConfigRegistry, "add_reload_listener")
+def test_reload_config(mock_add_reload_listener):
+    """
+        Test that a configuration reload applies the new cache max age and bulk check limit
+    """
+    support_listener = SupportListener()
+    reload_listener = next(item.args[0] for item in mock_add_reload_listener.call_args_list
+                           if getattr(item.args[0], "__self__", None) is support_listener)
+    support_config = {"supportEndpoints": {"cacheMaxAgeSeconds": 60, "maxBulkCheckIps": 2}}
+    with patch.object(ConfigRegistry, "get", return_value=support_config):
+        reload_listener()
+
+    assert support_listener.cache_max_age == 60
+    assert support_listener.max_bulk_check_ips == 2
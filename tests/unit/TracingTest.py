@@ -0,0 +1,101 @@
+"""
+    Unit tests for the Tracing.py utility
+"""
+import json
+import threading
+from unittest.mock import Mock, patch
+import pytest
+from sources.utils.Tracing import Tracer, current_span, record_response_status, start_span, traced
+from sources.utils.WorkerPool import WorkerPool
+
+
+def read_spans(path):
+    """
+        Returns the spans exported to the file at path
+    """
+    with open(path, encoding='utf-8') as file_traces:
+        return [json.loads(line) for line in file_traces]
+
+
+def test_disabled():
+    """
+        Test that no span is created when tracing is disabled
+    """
+    with patch.object(Tracer, "get_instance", return_value=Tracer()):
+        with start_span("operation") as span:
+            assert span is None
+            assert current_span.get() is None
+
+
+def test_spans_exported(tmp_path):
+    """
+        Test that nested spans share their trace, and are exported with their parent and status
+    """
+    path = tmp_path / "traces.jsonl"
+    with patch.object(Tracer, "get_instance", return_value=Tracer(path)):
+        with start_span("request", **{"http.route": "/slack/interaction"}) as request_span:
+            with pytest.raises(ValueError):
+                with start_span("slack chat.postMessage"):
+                    raise ValueError("channel_not_found")
+        assert current_span.get() is None
+
+    child, parent = read_spans(path)
+    assert parent["name"] == "request"
+    assert parent["spanId"] == request_span.context.span_id
+    assert parent["parentSpanId"] is None
+    assert parent["status"] == "ok"
+    assert parent["attributes"]["http.route"] == "/slack/interaction"
+    assert parent["endTimeUnixNano"] >= parent["startTimeUnixNano"]
+    assert child["traceId"] == parent["traceId"]
+    assert child["parentSpanId"] == parent["spanId"]
+    assert child["status"] == "error"
+    assert child["attributes"]["error.type"] == "ValueError"
+
+
+def test_traced(tmp_path):
+    """
+        Test that a decorated function runs in a span named after it
+    """
+    path = tmp_path / "traces.jsonl"
+
+    @traced()
+    def init_task(value):
+        return value
+
+    with patch.object(Tracer, "get_instance", return_value=Tracer(path)):
+        assert init_task('the_value') == 'the_value'
+    assert read_spans(path)[0]["name"] == "test_traced.<locals>.init_task"
+
+
+def test_propagated_to_worker_pool(tmp_path):
+    """
+        Test that the span of a job is a child of the span current when the job was submitted
+    """
+    worker_pool = WorkerPool(max_workers=1, queue_depth=10)
+    done = threading.Event()
+    job_spans = []
+
+    def job():
+        job_spans.append(current_span.get())
+        done.set()
+
+    with patch.object(Tracer, "get_instance", return_value=Tracer(tmp_path / "traces.jsonl")):
+        with start_span("request") as request_span:
+            worker_pool.submit('test_job', job)
+        assert done.wait(timeout=5)
+
+    assert job_spans[0].name == "job test_job"
+    assert job_spans[0].context.trace_id == request_span.context.trace_id
+    assert job_spans[0].parent == request_span.context
+    assert job_spans[0].attributes["thread.name"].startswith("tbtt-worker-")
+
+
+def test_record_response_status(tmp_path):
+    """
+        Test that the status code of a response is added to the current span
+    """
+    with patch.object(Tracer, "get_instance", return_value=Tracer(tmp_path / "traces.jsonl")):
+        with start_span("slack chat.postMessage") as span:
+            record_response_status(Mock(status_code=429))
+    assert span.attributes["http.status_code"] == 429
+    assert span.status == "error"
@@ -0,0 +1,105 @@
+"""
+    Unit tests for the TtlCache.py file
+"""
+
+from freezegun import freeze_time
+from sources.utils.TtlCache import TtlCache
+
+
+def test_get_and_set():
+    """
+        Test that cached values are returned, and misses return the default value
+    """
+    cache = TtlCache(max_size=10, ttl=60)
+    cache.set('key', None)
+    assert cache.get('key', 'missing') is None
+    assert cache.get('other_key', 'missing') == 'missing'
+
+
+def test_entries_expire():
+    """
+        Test that entries expire after the default TTL or their own TTL
+    """
+    with freeze_time('2023-07-27 10:00:00') as frozen_time:
+        cache = TtlCache(max_size=10, ttl=60)
+        cache.set('key', 'value')
+        cache.set('short_key', 'value', ttl=10)
+        frozen_time.tick(30)
+        assert cache.get('key') == 'value'
+        assert cache.get('short_key') is None
+        frozen_time.tick(30)
+        assert cache.get('key') is None
+        assert len(cache) == 0
+
+
+def test_least_recently_used_evicted():
+    """
+        Test that the least recently used entry is evicted when the cache is full
+    """
+    cache = TtlCache(max_size=2, ttl=60)
+    cache.set('key_1', 1)
+    cache.set('key_2', 2)
+    cache.get('key_1')
+    cache.set('key_3', 3)
+    assert cache.get('key_1') == 1
+    assert cache.get('key_2') is None
+    assert cache.get('key_3') == 3
+
+
+def test_delete_and_clear():
+    """
+        Test that entries can be removed individually or all at once
+    """
+    cache = TtlCache(max_size=10, ttl=60)
+    cache.set('key_1', 1)
+    cache.set('key_2', 2)
+    cache.delete('key_1')
+    cache.delete('unknown_key')
+    assert cache.get('key_1') is None
+    cache.clear()
+    assert len(cache) == 0
+
+
+def test_add():
+    """
+        Test that add only caches missing or expired keys
+    """
+    with freeze_time('2023-07-27 10:00:00') as frozen_time:
+        cache = TtlCache(max_size=10, ttl=60)
+        assert cache.add('key', 1)
+        assert not cache.add('key', 2)
+        assert cache.get('key') == 1
+        frozen_time.tick(60)
+        assert cache.add('key', 3)
+        assert cache.get('key') == 3
+
+
+def test_replace():
+    """
+        Test that replace only caches keys already cached and not expired
+    """
+    with freeze_time('2023-07-27 10:00:00') as frozen_time:
+        cache = TtlCache(max_size=10, ttl=60)
+        assert not cache.replace('key', 1)
+        assert cache.get('key') is None
+        cache.set('key', 1)
+        assert cache.replace('key', 2)
+        assert cache.get('key') == 2
+        frozen_time.tick(60)
+        assert not cache.replace('key', 3)
+        assert cache.get('key') is None
+
+
+def test_pop():
+    """
+        Test that pop removes the key and returns its value, unless it expired
+    """
+    with freeze_time('2023-07-27 10:00:00') as frozen_time:
+        cache = TtlCache(max_size=10, ttl=60)
+        cache.set('key', 1)
+        assert cache.pop('key') == 1
+        assert cache.pop('key', 'missing') == 'missing'
+        cache.set('key', 2)
+        frozen_time.tick(60)
+        assert cache.pop('key', 'missing') == 'missing'
+        assert len(cache) == 0
@@ -0,0 +1,142 @@
+"""
+    Unit tests for the WorkerPool.py main file
+"""
+import threading
+import time
+import pytest
+from sources.utils.WorkerPool import WorkerPool, WorkerPoolSaturatedError
+
+
+def test_submit_runs_job():
+    """
+        Test that a submitted job is executed by a worker with its keyword arguments
+    """
+    worker_pool = WorkerPool(max_workers=2, queue_depth=10)
+    done = threading.Event()
+    results = []
+
+    def job(value):
+        results.append(value)
+        done.set()
+
+    worker_pool.submit('test_job', job, value='the_value')
+    assert done.wait(timeout=5)
+    assert results == ['the_value']
+
+
+def test_submit_saturated():
+    """
+        Test that submitting a job while the queue is full raises WorkerPoolSaturatedError
+    """
+    worker_pool = WorkerPool(max_workers=1, queue_depth=1)
+    started = threading.Event()
+    release = threading.Event()
+
+    def blocking_job():
+        started.set()
+        release.wait(timeout=5)
+
+    worker_pool.submit('test_job', blocking_job)
+    assert started.wait(timeout=5)
+    worker_pool.submit('test_job', blocking_job)
+    with pytest.raises(WorkerPoolSaturatedError):
+        worker_pool.submit('test_job', blocking_job)
+    release.set()
+
+
+def test_job_type_limit():
+    """
+        Test that jobs of a limited type never run above their concurrency limit
+    """
+    worker_pool = WorkerPool(max_workers=4, queue_depth=10, job_type_limits={'limited_job': 1})
+    lock = threading.Lock()
+    running = []
+    max_running = []
+    finished = []
+    all_finished = threading.Event()
+
+    def limited_job():
+        with lock:
+            running.append(1)
+            max_running.append(len(running))
+        time.sleep(0.05)
+        with lock:
+            running.pop()
+            finished.append(1)
+            if len(finished) == 3:
+                all_finished.set()
+
+    for _ in range(3):
+        worker_pool.submit('limited_job', limited_job)
+    assert all_finished.wait(timeout=5)
+    assert max(max_running) == 1
+
+
+def test_job_type_limit_frees_workers():
+    """
+        Test that jobs held back by their type limit do not keep workers busy, and run once a slot is free
+    """
+    worker_pool = WorkerPool(max_workers=4, queue_depth=10, job_type_limits={'slow_job': 2})
+    release = threading.Event()
+    fast_done = threading.Event()
+    slow_finished = []
+    all_slow_finished = threading.Event()
+
+    def slow_job():
+        release.wait(timeout=5)
+        slow_finished.append(1)
+        if len(slow_finished) == 6:
+            all_slow_finished.set()
+
+    for _ in range(6):
+        worker_pool.submit('slow_job', slow_job)
+    worker_pool.submit('fast_job', fast_done.set)
+    assert fast_done.wait(timeout=1)
+    stats = worker_pool.get_stats()
+    release.set()
+
+    assert stats['in_flight_by_type'] == {'slow_job': 2}
+    assert stats['held_back'] == 4
+    assert stats['held_back_by_type'] == {'slow_job': 4}
+    assert all_slow_finished.wait(timeout=5)
+    assert worker_pool.get_stats()['held_back'] == 0
+
+
+def test_submit_saturated_held_back():
+    """
+        Test that held back jobs count in the queue depth
+    """
+    worker_pool = WorkerPool(max_workers=2, queue_depth=2, job_type_limits={'slow_job': 1})
+    release = threading.Event()
+    for _ in range(3):
+        worker_pool.submit('slow_job', release.wait, timeout=5)
+        time.sleep(0.05)
+    assert worker_pool.get_stats()['held_back'] == 2
+    with pytest.raises(WorkerPoolSaturatedError):
+        worker_pool.submit('slow_job', release.wait, timeout=5)
+    release.set()
+
+
+def test_get_stats():
+    """
+        Test that the stats expose the queue length and the in-flight jobs per type
+    """
+    worker_pool = WorkerPool(max_workers=1, queue_depth=5)
+    started = threading.Event()
+    release = threading.Event()
+
+    def blocking_job():
+        started.set()
+        release.wait(timeout=5)
+
+    worker_pool.submit('blocking_job', blocking_job)
+    assert started.wait(timeout=5)
+    worker_pool.submit('blocking_job', blocking_job)
+    stats = worker_pool.get_stats()
+    release.set()
+
+    assert stats['max_workers'] == 1
+    assert stats['queue_depth'] == 5
+    assert stats['queue_length'] == 1
+    assert stats['in_flight'] == 1
+    assert stats['in_flight_by_type'] == {'blocking_job': 1}
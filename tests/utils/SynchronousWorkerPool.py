@@ -0,0 +1,18 @@
+"""
+    Worker pool test double running the submitted jobs in the calling thread
+"""
+
+
+class SynchronousWorkerPool():
+    """
+        Worker pool running the submitted jobs immediately, in the calling thread
+    """
+    def __init__(self):
+        self.submitted_jobs = 0
+
+    def submit(self, _job_type, target, /, **kwargs):
+        """
+            Runs the job right away
+        """
+        self.submitted_jobs += 1
+        target(**kwargs)
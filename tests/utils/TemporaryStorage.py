@@ -0,0 +1,20 @@
+"""
+    Replaces the SQLite storage shared by the app with empty files in a temporary directory
+"""
+from contextlib import contextmanager
+from unittest.mock import patch
+from sources.utils.EscalationThreadIndex import EscalationThreadIndex
+from sources.utils.JobJournal import JobJournal
+
+
+@contextmanager
+def temporary_storage(directory):
+    """
+        Makes JobJournal.get_instance and EscalationThreadIndex.get_instance return new instances stored in directory,
+        so that tests neither write to the data folder of the checkout nor replay its jobs
+    """
+    job_journal = JobJournal(directory / "journal.sqlite3")
+    escalation_thread_index = EscalationThreadIndex(directory / "escalation_threads.sqlite3")
+    with patch.object(JobJournal, "get_instance", return_value=job_journal), \
+         patch.object(EscalationThreadIndex, "get_instance", return_value=escalation_thread_index):
+        yield job_journal, escalation_thread_index